@@ -1,17 +1,1560 @@
 #!/usr/bin/env python3
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk, Gdk, GLib, GdkPixbuf
+from gi.repository import Gtk, Gdk, GLib, GdkPixbuf, Gio, GObject
 import xml.etree.ElementTree as ET
 import os
 import uuid
 from datetime import datetime
-import shutil
 import tempfile
 import subprocess  # Added for launching processes
+import argparse
+import bisect
+import heapq
+import time
+import pickle
+import csv
+import json
+import contextlib
+import itertools
+import operator
+import re
+import sqlite3
+import hashlib
+import threading
+import multiprocessing
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Minimum number of record files before startup parsing is spread over a process pool
+PARALLEL_LOAD_THRESHOLD = 2000
+# Number of record files handed to a worker process at once
+PARALLEL_LOAD_CHUNK_SIZE = 500
+# Bulk import: rows per writer task and default number of writer threads
+IMPORT_CHUNK_SIZE = 500
+IMPORT_WORKERS = 4
+# Schema migrations: record files per worker task; checkpoints live in RECORD_CACHE_DIR/MIGRATION_DIR
+MIGRATION_CHUNK_SIZE = 500
+MIGRATION_DIR = 'migrations'
+# Deleted entity directories are moved here (inside RECORD_CACHE_DIR) and removed in the background
+TRASH_DIR = 'trash'
+# File name of the optional SQLite mirror, inside RECORD_CACHE_DIR
+RECORD_MIRROR_FILE = 'records.sqlite3'
+# Record files of this many bytes or more are parsed with the streaming reader
+STREAMING_PARSE_THRESHOLD = 256 * 1024
+# Parsed-record caches live in this hidden directory inside the data directory
+RECORD_CACHE_DIR = '.cache'
+# Bump when the cached record layout changes
+RECORD_CACHE_VERSION = 1
+# RecordStore compacts its columns once this many removed rows make up half of them
+RECORD_STORE_COMPACT_MIN = 1024
+# Fields of entities with at least CATEGORY_DETECT_MIN_ROWS records whose distinct values are at most
+# CATEGORY_DETECT_RATIO of the records are dictionary encoded (besides declared and pagination.xml ones)
+CATEGORY_DETECT_MIN_ROWS = 1000
+CATEGORY_DETECT_RATIO = 0.01
+# luassg pagination settings inside the data directory (fieldAsCategory, includeCategory)
+PAGINATION_FILE = 'pagination.xml'
+# Trigram indexes are kept for entities with at least this many records (smaller ones are scanned)
+TRIGRAM_INDEX_MIN_RECORDS = 5000
+# Bump when the persisted trigram index layout changes
+TRIGRAM_INDEX_VERSION = 1
+# File watcher: poll interval (ms) while events are pending, quiet period and
+# maximum delay (seconds) before a burst of events is applied as one batch
+WATCH_POLL_MS = 100
+WATCH_QUIET_SECONDS = 0.3
+WATCH_MAX_DELAY_SECONDS = 2.0
+# Detach the tab model from its TreeView while applying more changes than this
+WATCH_DETACH_THRESHOLD = 200
+# Tab filter: refilter once typing has paused this long (ms)
+FILTER_DEBOUNCE_MS = 150
+# Recent filter results remembered per tab, to refine while typing and serve backspacing
+FILTER_CACHE_SIZE = 16
+# Fuzzy search: results kept, minimum score shown, rows ranked between cancellation checks and
+# minimum interval (seconds) between result updates sent to the view
+FUZZY_TOP_K = 100
+FUZZY_MIN_SCORE = 0.5
+FUZZY_CHUNK_SIZE = 5000
+FUZZY_UPDATE_INTERVAL = 0.1
+# Field choice added to the filter's field list in fuzzy mode
+FUZZY_ALL_FIELDS = "All Fields"
+# Tabs with at least POPULATE_CHUNK_MIN_RECORDS records are filled in idle callbacks, each
+# appending rows for at most POPULATE_FRAME_BUDGET seconds so the window keeps drawing
+POPULATE_CHUNK_MIN_RECORDS = 2000
+POPULATE_FRAME_BUDGET = 0.008
+# Seconds between checks for entity tabs unused for EntityCRUDApp.idle_tab_seconds
+IDLE_TAB_CHECK_SECONDS = 60
+# Per-entity state of a built tab (widgets, models, filter state), dropped when the tab is torn down
+ENTITY_TAB_KEYS = ('tab_built', 'treeview', 'list_store', 'filter_model', 'field_combo', 'filter_entry', 'columns',
+                   'sort_order', 'filter_query', 'filter_matches', 'structured_query', 'filter_error',
+                   'filter_explain', 'shown_filter_explain', 'filter_timeout', 'fuzzy_toggle', 'fuzzy_store',
+                   'fuzzy_search', 'loading_spinner', 'row_count_label', 'scrolled_window', 'row_iters',
+                   'virtual_order', 'population')
+# Tabs of entities with at least this many records show them through a RecordListModel
+VIRTUAL_MODEL_MIN_RECORDS = 20000
+# Files modified this recently (in ns) are not cached, their mtime may not change on the next write
+RECORD_CACHE_RACY_NS = 2_000_000_000
+
+
+def list_entity_record_files(entity_dir, entity_name):
+    """List record files of an entity with a single os.scandir pass
+
+    Returns (filename, file_record_id, stat_key) tuples in directory order,
+    where stat_key is (inode, mtime_ns, size) and identifies the file version.
+    """
+    record_files = []
+    with os.scandir(entity_dir) as entries:
+        for entry in entries:
+            filename = entry.name
+            if filename.endswith('.xml'):
+                # Check if filename matches pattern: entity-id.xml
+                # Remove .xml extension
+                basename = filename[:-4]
+                if '-' in basename:
+                    file_entity_name, file_record_id = basename.split('-', 1)
+
+                    # Only process files for this entity
+                    if file_entity_name == entity_name:
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            # File vanished between readdir and stat
+                            continue
+                        stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                        record_files.append((filename, file_record_id, stat_key))
+    return record_files
+
+
+def file_stat_key(path):
+    """(inode, mtime_ns, size) version key of a file, or None if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def stat_record_files(entity_dir, entity_name, filenames):
+    """Stat the given record files of an entity, in the format of list_entity_record_files
+
+    Files that don't exist (anymore) or don't follow the entity-id.xml
+    pattern are left out.
+    """
+    record_files = []
+    for filename in filenames:
+        basename = filename[:-4]
+        if not filename.endswith('.xml') or '-' not in basename:
+            continue
+        file_entity_name, file_record_id = basename.split('-', 1)
+        if file_entity_name != entity_name:
+            continue
+        stat_key = file_stat_key(os.path.join(entity_dir, filename))
+        if stat_key is not None:
+            record_files.append((filename, file_record_id, stat_key))
+    return record_files
+
+
+def diff_record_files(entity_dir, entity_name, field_names, old_state, current_files, checked_filenames=None,
+                      preview_limit=None):
+    """Diff listed record files against the file state of the last load and parse changed files
+
+    old_state maps filename -> (stat_key, record_id). checked_filenames limits
+    removal detection to the given files (None means current_files is a full
+    directory listing). Returns a dict with the parse results of changed files,
+    the record IDs to drop and the file state updates (None marks a removed file).
+    """
+    state_updates = {}
+    removed_ids = []
+    changed_files = []
+    for filename, file_record_id, stat_key in current_files:
+        old_entry = old_state.get(filename)
+        if old_entry is None or old_entry[0] != stat_key:
+            changed_files.append((filename, file_record_id, stat_key))
+            if old_entry is not None and old_entry[1] is not None:
+                # The modified file may now hold a different record ID
+                removed_ids.append(old_entry[1])
+
+    current_filenames = {filename for filename, _, _ in current_files}
+    candidates = old_state if checked_filenames is None else [f for f in checked_filenames if f in old_state]
+    for filename in candidates:
+        if filename not in current_filenames:
+            state_updates[filename] = None
+            if old_state[filename][1] is not None:
+                removed_ids.append(old_state[filename][1])
+
+    results = []
+    for filename, file_record_id, stat_key in changed_files:
+        result = parse_record_file(os.path.join(entity_dir, filename), entity_name, field_names, file_record_id,
+                                   preview_limit)
+        results.append(result)
+        state_updates[filename] = (stat_key, result[0])
+
+    return {'results': results, 'removed_ids': removed_ids, 'state_updates': state_updates}
+
+
+class PartialRecord(dict):
+    """Record dict holding truncated previews of long field values (lazy field loading)
+
+    The full values are read from the record file by get_record_data.
+    """
+
+
+def make_record_preview(record_data, preview_limit):
+    """Cut field values down to preview_limit characters
+
+    Returns a PartialRecord if anything was cut, the record itself otherwise.
+    """
+    preview = {}
+    truncated = False
+    for field_name, value in record_data.items():
+        if field_name != 'id' and value is not None and len(value) > preview_limit:
+            value = value[:preview_limit]
+            truncated = True
+        preview[field_name] = value
+    return PartialRecord(preview) if truncated else record_data
+
+
+# Marks a key a record doesn't have in the RecordStore columns
+MISSING = object()
+
+
+class DictionaryColumn:
+    """Dictionary-encoded RecordStore column for low-cardinality fields
+
+    Each distinct value is stored once; rows hold integer codes in an array
+    of 1 byte per row, widened to 2 and 4 bytes past 256 and 65536
+    distinct values. Code 0 is MISSING.
+    """
+
+    def __init__(self, values=()):
+        self.values = [MISSING]
+        self.value_codes = {MISSING: 0}
+        self.codes = array('B')
+        for value in values:
+            self.append(value)
+
+    def code(self, value):
+        """Code of a value, adding it to the dictionary if it is new"""
+        code = self.value_codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.value_codes[value] = code
+            if code > 0xFF and self.codes.typecode == 'B':
+                self.codes = array('H', self.codes)
+            elif code > 0xFFFF and self.codes.typecode == 'H':
+                self.codes = array('I', self.codes)
+        return code
+
+    def row_mask(self, matching_codes):
+        """Per-row truth values: whether the code of the row is in matching_codes"""
+        if self.codes.typecode == 'B':
+            # One C-level pass over the code bytes
+            table = bytes(1 if code in matching_codes else 0 for code in range(256))
+            return self.codes.tobytes().translate(table)
+        return map(matching_codes.__contains__, self.codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+    def __setitem__(self, row, value):
+        self.codes[row] = self.code(value)
+
+    def append(self, value):
+        # code() may widen the array, look it up afterwards
+        code = self.code(value)
+        self.codes.append(code)
+
+    def take(self, rows):
+        """New column with the given rows, in that order"""
+        column = DictionaryColumn()
+        column.values = self.values[:]
+        column.value_codes = dict(self.value_codes)
+        column.codes = array(self.codes.typecode, (self.codes[row] for row in rows))
+        return column
+
+
+# Tab filter query language: [field:][=]word | "phrase" | /regex/, word* for prefixes, AND / NOT
+QUERY_SYNTAX_RE = re.compile(r'(^|\s)(AND|NOT)(\s|$)|^\S+:|\s\S+:|"|(^|\s)/\S.*/(\s|$)|\*(\s|$)|(^|\s|:)=')
+QUERY_TERM_RE = re.compile(r"""
+    (?:(?P<field>[^\s:"/=]+):)?
+    (?P<exact>=)?
+    (?:"(?P<quoted>[^"]*)"? | /(?P<regex>(?:[^/\\]|\\.)*)/ | (?P<word>[^\s"]+))
+""", re.VERBOSE)
+
+
+def is_structured_query(text):
+    """Whether filter text uses the query language; plain text keeps the substring filter"""
+    return QUERY_SYNTAX_RE.search(text) is not None
+
+
+def parse_filter_query(text, field_names, default_field):
+    """Parse a filter query into a list of terms that must all match
+
+    Terms are dicts with 'field' (a field name, None for the record ID),
+    'op' ('substring', 'prefix', 'exact' or 'regex'), the lowercase 'value'
+    and 'negated'. Terms without field: use default_field. Raises
+    ValueError for malformed queries.
+    """
+    fields_by_name = {name.lower(): name for name in field_names}
+    terms = []
+    negate = False
+    position = 0
+    while position < len(text):
+        if text[position].isspace():
+            position += 1
+            continue
+        start = position
+        match = QUERY_TERM_RE.match(text, start)
+        if match is None or match.end() == start:
+            raise ValueError(f"Can't parse the query at: {text[start:]}")
+        position = match.end()
+        field, word = match.group('field'), match.group('word')
+
+        if field is None and not match.group('exact') and word in ('AND', 'NOT'):
+            if word == 'NOT':
+                negate = not negate
+            continue
+
+        if field is None:
+            column = default_field
+        elif field.lower() == 'id':
+            column = None
+        elif field.lower() in fields_by_name:
+            column = fields_by_name[field.lower()]
+        else:
+            # Not a field (e.g. a URL): search the whole word as text
+            position = start
+            while position < len(text) and not text[position].isspace():
+                position += 1
+            terms.append({'field': default_field, 'negated': negate, 'op': 'substring',
+                          'value': text[start:position].lower()})
+            negate = False
+            continue
+
+        term = {'field': column, 'negated': negate}
+        negate = False
+        if match.group('regex') is not None:
+            try:
+                term.update(op='regex', value=match.group('regex'),
+                            pattern=re.compile(match.group('regex'), re.IGNORECASE))
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression /{match.group('regex')}/: {e}")
+        else:
+            value = match.group('quoted') if match.group('quoted') is not None else word
+            if match.group('exact'):
+                term.update(op='exact', value=value.lower())
+            elif match.group('quoted') is None and value.endswith('*'):
+                term.update(op='prefix', value=value[:-1].lower())
+            else:
+                term.update(op='substring', value=value.lower())
+        terms.append(term)
+
+    if negate:
+        raise ValueError("NOT at the end of the query")
+    if not terms:
+        raise ValueError("Empty query")
+    return terms
+
+
+def match_query_term(term, value):
+    """Whether a field value satisfies a query term (ignoring case and negation)"""
+    if term['op'] == 'regex':
+        return value is not None and term['pattern'].search(value) is not None
+    value = lower_value(value)
+    if term['op'] == 'substring':
+        return term['value'] in value
+    if term['op'] == 'prefix':
+        return value.startswith(term['value'])
+    return value == term['value']
+
+
+def describe_query_term(term):
+    """Readable form of a query term for the explain output"""
+    field = 'ID' if term['field'] is None else term['field']
+    if term['op'] == 'regex':
+        text = f"{field} matches /{term['value']}/"
+    else:
+        verb = {'substring': 'contains', 'prefix': 'starts with', 'exact': 'equals'}[term['op']]
+        text = f"{field} {verb} '{term['value']}'"
+    return f"NOT {text}" if term['negated'] else text
+
+
+def query_matches(terms, record_id, field_value):
+    """Whether a record satisfies every term of a query; field_value(name) returns a field of the record"""
+    for term in terms:
+        value = record_id if term['field'] is None else field_value(term['field'])
+        if match_query_term(term, value) == term['negated']:
+            return False
+    return True
+
+
+def format_query_plan(terms, plan):
+    """Explain output of a planned (and possibly executed) query"""
+    lines = [f"Plan: {plan['description']} (~{plan['estimated_rows']} rows to check)",
+             f"Check: {' AND '.join(describe_query_term(term) for term in terms)}",
+             f"Estimated cost: {plan['cost']} term checks"]
+    if 'rows' in plan:
+        lines.append(f"Result: {plan['rows']} rows in {plan['seconds'] * 1000:.1f} ms")
+    return "\n".join(lines)
+
+
+FUZZY_TOKEN_RE = re.compile(r'\w+')
+
+
+def bounded_edit_distance(a, b, max_distance):
+    """Levenshtein distance of a and b, or max_distance + 1 as soon as it must exceed max_distance"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def token_similarity(query_token, token):
+    """Similarity (0..1) of a query word to a word of a record; a word the query is a prefix of scores 1"""
+    if token.startswith(query_token):
+        return 1.0
+    max_distance = max(1, len(query_token) // 3)
+    # Each query character missing from the word costs an edit: a cheap bound that rejects most words
+    if sum(char not in token for char in query_token) > max_distance:
+        return 0.0
+    distance = bounded_edit_distance(query_token, token, max_distance)
+    if distance > max_distance:
+        return 0.0
+    return 1.0 - distance / max(len(query_token), len(token))
+
+
+def fuzzy_text_score(query, query_tokens, text, memos):
+    """Score (0..1) of a lowercased text for a query: 1 for a substring match, else the mean best word similarity
+
+    memos holds one {word: similarity} dict per query word, shared across
+    records since words repeat a lot.
+    """
+    if query in text:
+        return 1.0
+    tokens = FUZZY_TOKEN_RE.findall(text)
+    if not tokens:
+        return 0.0
+    total = 0.0
+    for query_token, memo in zip(query_tokens, memos):
+        for token in tokens:
+            if token not in memo:
+                memo[token] = token_similarity(query_token, token)
+        total += max(map(memo.__getitem__, tokens))
+    # Below a substring match
+    return 0.99 * total / len(query_tokens)
+
+
+def fuzzy_search(query, record_ids, columns, limit=FUZZY_TOP_K, cancelled=None, on_update=None):
+    """Rank records by fuzzy similarity to a query; returns [(score, record_id)], best first
+
+    columns are sequences of lowercased texts parallel to record_ids (None
+    IDs are skipped), searched together. Records are ranked in chunks of
+    FUZZY_CHUNK_SIZE: between chunks the search stops (returning None) once
+    the cancelled event is set, and on_update(results) receives the current
+    top results when they changed, at most every FUZZY_UPDATE_INTERVAL.
+    """
+    query = query.strip().lower()
+    query_tokens = FUZZY_TOKEN_RE.findall(query)
+    if not query_tokens:
+        return []
+
+    memos = [{} for _ in query_tokens]
+    heap = []
+    last_update = time.perf_counter()
+    pending_update = False
+    for start in range(0, len(record_ids), FUZZY_CHUNK_SIZE):
+        if cancelled is not None and cancelled.is_set():
+            return None
+        for row in range(start, min(start + FUZZY_CHUNK_SIZE, len(record_ids))):
+            record_id = record_ids[row]
+            if record_id is None:
+                continue
+            text = columns[0][row] if len(columns) == 1 else ' '.join(column[row] for column in columns)
+            score = fuzzy_text_score(query, query_tokens, text, memos)
+            if score < FUZZY_MIN_SCORE:
+                continue
+            # Ties keep the earlier record
+            item = (score, -row, record_id)
+            if len(heap) < limit:
+                heapq.heappush(heap, item)
+                pending_update = True
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+                pending_update = True
+
+        if on_update is not None and pending_update and time.perf_counter() - last_update >= FUZZY_UPDATE_INTERVAL:
+            on_update([(score, record_id) for score, _, record_id in sorted(heap, reverse=True)])
+            last_update = time.perf_counter()
+            pending_update = False
+    return [(score, record_id) for score, _, record_id in sorted(heap, reverse=True)]
+
+
+def lower_value(value):
+    """Lowercased text of a field value for the filter, '' for missing values"""
+    return value.lower() if isinstance(value, str) else ''
+
+
+class RecordStore(MutableMapping):
+    """Compact column-wise storage of the records of one entity
+
+    Field values live in one list per column, indexed by row number, with
+    an ID -> row map, instead of one dict per record. The store is used as
+    the {record_id: record_dict} mapping it replaces: store[record_id]
+    builds the record dict on access (a PartialRecord when the row holds
+    previews), so changing a returned dict doesn't change the store; assign
+    the record again instead. Keys that aren't columns are kept per row.
+    Removed rows are left as holes, keeping insertion order, and squeezed
+    out once they make up half of the store. Columns named in categorical
+    are dictionary encoded (see DictionaryColumn).
+    """
+
+    def __init__(self, column_names, records=None, categorical=()):
+        self.columns = {name: DictionaryColumn() if name in categorical else [] for name in column_names}
+        self.ids = []
+        self.rows = {}
+        self.extra = {}
+        self.partial_rows = set()
+        self.holes = 0
+        # Lowercased copies of the columns the filter has used (None: record IDs)
+        self.lower_columns = {}
+        if records is not None:
+            self.update(records)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, record_id):
+        return record_id in self.rows
+
+    def __iter__(self):
+        return (record_id for record_id in self.ids if record_id is not None)
+
+    def __getitem__(self, record_id):
+        row = self.rows[record_id]
+        record = {}
+        for name, column in self.columns.items():
+            value = column[row]
+            if value is not MISSING:
+                record[name] = value
+        if row in self.extra:
+            record.update(self.extra[row])
+        return PartialRecord(record) if row in self.partial_rows else record
+
+    def __setitem__(self, record_id, record):
+        row = self.rows.get(record_id)
+        if row is None:
+            row = len(self.ids)
+            self.ids.append(record_id)
+            self.rows[record_id] = row
+            for column in self.columns.values():
+                column.append(MISSING)
+            for lowered in self.lower_columns.values():
+                lowered.append('')
+        else:
+            self.extra.pop(row, None)
+        for name, lowered in self.lower_columns.items():
+            lowered[row] = lower_value(record_id if name is None else record.get(name))
+
+        for name, column in self.columns.items():
+            column[row] = record.get(name, MISSING)
+        extra = {key: value for key, value in record.items() if key not in self.columns}
+        if extra:
+            self.extra[row] = extra
+        if isinstance(record, PartialRecord):
+            self.partial_rows.add(row)
+        else:
+            self.partial_rows.discard(row)
+
+    def __delitem__(self, record_id):
+        row = self.rows.pop(record_id)
+        self.ids[row] = None
+        for column in self.columns.values():
+            column[row] = MISSING
+        self.extra.pop(row, None)
+        self.partial_rows.discard(row)
+        for lowered in self.lower_columns.values():
+            lowered[row] = ''
+        self.holes += 1
+        if self.holes >= RECORD_STORE_COMPACT_MIN and self.holes * 2 >= len(self.ids):
+            self.compact()
+
+    def value(self, record_id, name, default=None):
+        """One field of a record, without building the record dict"""
+        row = self.rows[record_id]
+        if name in self.columns:
+            value = self.columns[name][row]
+        else:
+            value = self.extra.get(row, {}).get(name, MISSING)
+        return default if value is MISSING else value
+
+    def compact(self):
+        """Drop the holes left by removed records"""
+        kept_rows = [row for row, record_id in enumerate(self.ids) if record_id is not None]
+        for name, column in self.columns.items():
+            if isinstance(column, DictionaryColumn):
+                self.columns[name] = column.take(kept_rows)
+            else:
+                self.columns[name] = [column[row] for row in kept_rows]
+        new_rows = {old_row: new_row for new_row, old_row in enumerate(kept_rows)}
+        self.extra = {new_rows[row]: extra for row, extra in self.extra.items()}
+        self.partial_rows = {new_rows[row] for row in self.partial_rows}
+        self.lower_columns = {name: [lowered[row] for row in kept_rows]
+                              for name, lowered in self.lower_columns.items()}
+        self.ids = [self.ids[row] for row in kept_rows]
+        self.rows = {record_id: row for row, record_id in enumerate(self.ids)}
+        self.holes = 0
+
+    def is_categorical(self, name):
+        """Whether a column is dictionary encoded"""
+        return isinstance(self.columns.get(name), DictionaryColumn)
+
+    def encode_column(self, name):
+        """Switch a column to dictionary encoding"""
+        if not self.is_categorical(name):
+            self.columns[name] = DictionaryColumn(self.columns[name])
+
+    def detect_categorical(self, ratio):
+        """Dictionary encode the columns with at most ratio * len(self) distinct values; returns their names"""
+        limit = max(1, int(len(self) * ratio))
+        encoded = []
+        for name, column in list(self.columns.items()):
+            if name == 'id' or isinstance(column, DictionaryColumn):
+                continue
+            distinct = set()
+            for value in column:
+                distinct.add(value)
+                if len(distinct) > limit + 1:
+                    # + 1: holes are MISSING
+                    break
+            else:
+                self.encode_column(name)
+                encoded.append(name)
+        return encoded
+
+    def lower_column(self, name):
+        """Lowercased copy of a column (None: the record IDs) by row, kept up to date once built"""
+        lowered = self.lower_columns.get(name)
+        if lowered is None:
+            if name is None:
+                values = self.ids
+            elif name in self.columns:
+                values = self.columns[name]
+            else:
+                values = (self.extra.get(row, {}).get(name) for row in range(len(self.ids)))
+            lowered = [lower_value(value) for value in values]
+            self.lower_columns[name] = lowered
+        return lowered
+
+    def ids_containing(self, name, text):
+        """IDs of the records whose field (None: the record ID) contains lowercase text, ignoring case"""
+        if not text:
+            return list(self)
+        if name is not None and self.is_categorical(name):
+            return self.ids_matching(name, lambda value: contains_ignore_case(value, text))
+        # Holes are '' and never match a non-empty text
+        return list(itertools.compress(self.ids, map(operator.contains, self.lower_column(name),
+                                                     itertools.repeat(text))))
+
+    def ids_matching(self, name, predicate):
+        """IDs of the records whose field satisfies predicate(value)
+
+        On encoded columns the predicate runs once per distinct value and the
+        rows are matched by code.
+        """
+        column = self.columns.get(name)
+        if column is None:
+            return [record_id for record_id in self if predicate(self.value(record_id, name))]
+        ids = self.ids
+        if isinstance(column, DictionaryColumn):
+            codes = {code for code, value in enumerate(column.values) if value is not MISSING and predicate(value)}
+            return list(itertools.compress(ids, column.row_mask(codes)))
+        return [ids[row] for row, value in enumerate(column) if value is not MISSING and predicate(value)]
+
+
+def text_trigrams(text):
+    """Distinct 3-character substrings of a (lowercased) text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def sorted_array_contains(values, value):
+    """Membership test on a sorted array by bisection"""
+    index = bisect.bisect_left(values, value)
+    return index < len(values) and values[index] == value
+
+
+class TrigramIndex:
+    """Trigram inverted index over the fields of one entity's records
+
+    Every indexed field (None stands for the record ID) maps each trigram
+    of its lowercased values to the documents containing it. Documents are
+    numbered in insertion order, so posting lists are append-only, sorted
+    arrays of 4-byte numbers. Updating a record retires its old document
+    and appends a new one; retired documents are dropped by compact().
+    candidates() narrows a substring query down to the records containing
+    all of its trigrams, the caller still checks the substring itself.
+    """
+
+    def __init__(self, field_names):
+        self.field_names = list(field_names)
+        self.postings = {name: {} for name in self.field_names}
+        self.doc_ids = []
+        self.docs = {}
+        self.retired = 0
+        self.dirty = True
+
+    def add(self, record_id, record_data):
+        """Index a new or changed record"""
+        self.remove(record_id)
+        doc = len(self.doc_ids)
+        self.doc_ids.append(record_id)
+        self.docs[record_id] = doc
+        for name in self.field_names:
+            field_postings = self.postings[name]
+            value = record_id if name is None else record_data.get(name)
+            for trigram in text_trigrams(lower_value(value)):
+                postings = field_postings.get(trigram)
+                if postings is None:
+                    postings = field_postings[trigram] = array('I')
+                postings.append(doc)
+        self.dirty = True
+
+    def remove(self, record_id):
+        """Forget a deleted (or replaced) record"""
+        doc = self.docs.pop(record_id, None)
+        if doc is not None:
+            self.doc_ids[doc] = None
+            self.retired += 1
+            self.dirty = True
+
+    def estimate(self, name, text):
+        """Upper bound of candidates() for text: the length of the shortest posting list, None when unusable"""
+        trigrams = text_trigrams(text)
+        if not trigrams or name not in self.postings:
+            return None
+        field_postings = self.postings[name]
+        return min(len(field_postings.get(trigram, ())) for trigram in trigrams)
+
+    def candidates(self, name, text):
+        """IDs of the records whose field holds every trigram of text, None when text is too short to use the index"""
+        trigrams = text_trigrams(text)
+        if not trigrams or name not in self.postings:
+            return None
+        field_postings = self.postings[name]
+        posting_lists = [field_postings.get(trigram) for trigram in trigrams]
+        if any(postings is None for postings in posting_lists):
+            return []
+
+        # Intersect starting from the rarest trigram; probe long lists by bisection
+        posting_lists.sort(key=len)
+        docs = set(posting_lists[0])
+        for postings in posting_lists[1:]:
+            if not docs:
+                break
+            if len(docs) * 16 < len(postings):
+                docs = {doc for doc in docs if sorted_array_contains(postings, doc)}
+            else:
+                docs.intersection_update(postings)
+        doc_ids = self.doc_ids
+        return [doc_ids[doc] for doc in docs if doc_ids[doc] is not None]
+
+    def compact(self):
+        """Renumber the live documents and drop retired ones from the posting lists"""
+        if not self.retired:
+            return
+        new_docs = {}
+        for old_doc, record_id in enumerate(self.doc_ids):
+            if record_id is not None:
+                new_docs[old_doc] = len(new_docs)
+        for name, field_postings in self.postings.items():
+            self.postings[name] = {
+                trigram: compacted
+                for trigram, compacted in (
+                    (trigram, array('I', (new_docs[doc] for doc in postings if doc in new_docs)))
+                    for trigram, postings in field_postings.items())
+                if compacted
+            }
+        self.doc_ids = [record_id for record_id in self.doc_ids if record_id is not None]
+        self.docs = {record_id: doc for doc, record_id in enumerate(self.doc_ids)}
+        self.retired = 0
+        self.dirty = True
+
+    def to_state(self):
+        """Plain data for pickling (independent of the module the class is defined in)"""
+        self.compact()
+        return {'field_names': self.field_names, 'postings': self.postings, 'doc_ids': self.doc_ids}
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an index from to_state() data"""
+        index = cls(state['field_names'])
+        index.postings = state['postings']
+        index.doc_ids = state['doc_ids']
+        index.docs = {record_id: doc for doc, record_id in enumerate(index.doc_ids)}
+        index.dirty = False
+        return index
+
+
+def record_value(records, record_id, name, default=None):
+    """One field of a record from a RecordStore or a plain {record_id: dict} mapping"""
+    if isinstance(records, RecordStore):
+        return records.value(record_id, name, default)
+    return records[record_id].get(name, default)
+
+
+def read_record_streaming(source, entity_name, field_names):
+    """Stream a record file with iterparse, keeping only the declared fields
+
+    Children of the root are freed as soon as they are complete and reading
+    stops once every declared field has been seen, so large undeclared
+    elements and trailing content never stay in memory. Like root.find(),
+    the first direct child with a field's tag wins.
+    Returns (root_tag, root_id, values); values is empty on a root mismatch.
+    """
+    wanted = set(field_names)
+    values = {}
+    root = None
+    depth = 0
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            if root is None:
+                root = elem
+                if root.tag != entity_name or not wanted:
+                    break
+            continue
+
+        depth -= 1
+        if depth == 1:
+            # A direct child of the root is complete
+            if elem.tag in wanted and elem.tag not in values:
+                values[elem.tag] = elem.text
+            elem.clear()
+            root.remove(elem)
+            if len(values) == len(wanted):
+                break
+
+    if root is None:
+        raise ET.ParseError("no element found")
+    return root.tag, root.get('id'), values
+
+
+def parse_record_file(filepath, entity_name, field_names, file_record_id, preview_limit=None):
+    """Parse a single record file (luassg format)
+
+    Returns (record_id, record_data, messages). record_id and record_data are
+    None when the file has to be skipped; messages holds the warnings and
+    errors to report, so worker processes can hand them back to the caller.
+    Files of STREAMING_PARSE_THRESHOLD bytes or more are read with
+    read_record_streaming. With preview_limit, long field values are cut down
+    (see make_record_preview).
+    """
+    messages = []
+    filename = os.path.basename(filepath)
+    try:
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size >= STREAMING_PARSE_THRESHOLD:
+                root_tag, root_id, values = read_record_streaming(f, entity_name, field_names)
+            else:
+                root = ET.parse(f).getroot()
+                root_tag, root_id = root.tag, root.get('id')
+                values = {}
+                if root_tag == entity_name:
+                    for field_name in field_names:
+                        field_elem = root.find(field_name)
+                        if field_elem is not None:
+                            values[field_name] = field_elem.text
+
+        # Verify root element matches entity name
+        if root_tag != entity_name:
+            messages.append(f"Warning: Root element '{root_tag}' doesn't match entity name '{entity_name}' in {filename}")
+            return None, None, messages
+
+        # Extract ID from root element's id attribute (luassg format)
+        record_id = root_id
+        if not record_id:
+            # Use the ID from filename as fallback
+            record_id = file_record_id
+            messages.append(f"Warning: No id attribute found in {filename}, using filename ID: {record_id}")
+
+        # Extract field values
+        record_data = {'id': record_id}
+        for field_name in field_names:
+            record_data[field_name] = values.get(field_name, '')
+
+        if preview_limit is not None:
+            record_data = make_record_preview(record_data, preview_limit)
+        return record_id, record_data, messages
+    except Exception as e:
+        messages.append(f"Error loading {filepath}: {e}")
+        return None, None, messages
+
+
+def is_cacheable_result(result):
+    """Parsed and skipped (e.g. root mismatch) files can be cached, read errors are retried"""
+    record_id, record_data, messages = result
+    return record_id is not None or not any(message.startswith('Error loading') for message in messages)
+
+
+def process_pool_context():
+    """Multiprocessing context for a process pool started from the current thread
+
+    Forking next to the running GTK main loop is unsafe, so pools started
+    from worker threads (background loads, migrations) use fresh spawned
+    interpreters. None means the platform default.
+    """
+    if threading.current_thread() is threading.main_thread():
+        return None
+    return multiprocessing.get_context('spawn')
+
+
+def parse_record_chunk(chunk):
+    """Parse a chunk of record files of one entity (process pool worker)"""
+    entity_name, field_names, files, preview_limit = chunk
+    return [parse_record_file(filepath, entity_name, field_names, file_record_id, preview_limit)
+            for filepath, file_record_id in files]
+
+
+def iter_import_rows(source_path, file_format=None):
+    """Stream rows of a CSV or JSONL file as (row_number, row_dict, error) tuples
+
+    The format is taken from the file extension unless given ('csv' or
+    'jsonl'). Rows that can't be decoded are yielded with row_dict None and
+    an error message, so one bad line doesn't stop an import.
+    """
+    if file_format is None:
+        extension = os.path.splitext(source_path)[1].lower()
+        file_format = 'csv' if extension == '.csv' else 'jsonl'
+
+    with open(source_path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            reader = csv.DictReader(f)
+            for row_number, row in enumerate(reader, start=1):
+                yield row_number, row, None
+            return
+
+        for row_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield row_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield row_number, None, "Expected a JSON object"
+                continue
+            yield row_number, row, None
+
+
+def quote_identifier(name):
+    """Quote an SQL identifier (entity and field names are user defined)"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def contains_ignore_case(value, text):
+    """Case-insensitive substring test with the semantics of the tab filter"""
+    return value is not None and text in value.lower()
+
+
+class RecordMirror:
+    """Optional SQLite mirror of the entity records for filtering, sorting and counting
+
+    Every entity gets a table with one TEXT column per field plus an FTS5
+    index (trigram tokenizer) over ID and fields. The XML files stay the
+    source of truth: tables are rebuilt from the loaded records whenever the
+    field list or the file fingerprint of an entity changed.
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.create_function('contains_ignore_case', 2, contains_ignore_case, deterministic=True)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS mirror_meta (entity TEXT PRIMARY KEY, signature TEXT, fingerprint TEXT)")
+        self.fts_enabled = self.detect_fts()
+        self.columns = {}
+
+    def detect_fts(self):
+        """Check whether this SQLite build has FTS5 with the trigram tokenizer"""
+        try:
+            self.connection.execute("CREATE VIRTUAL TABLE temp.fts_probe USING fts5(value, tokenize='trigram')")
+            self.connection.execute("DROP TABLE temp.fts_probe")
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def table_names(self, entity_name):
+        """Quoted names of the record table and the FTS index of an entity"""
+        return quote_identifier(f"records_{entity_name}"), quote_identifier(f"records_{entity_name}_fts")
+
+    def is_synced(self, entity_name, field_names, fingerprint=None):
+        """Check whether the mirror of an entity matches its field list (and file fingerprint)"""
+        row = self.connection.execute(
+            "SELECT signature, fingerprint FROM mirror_meta WHERE entity = ?", (entity_name,)).fetchone()
+        if row is None or row[0] != '\x1f'.join(field_names):
+            return False
+        self.columns[entity_name] = ['id'] + list(field_names)
+        return fingerprint is None or row[1] == fingerprint
+
+    def rebuild_entity(self, entity_name, field_names, records, fingerprint):
+        """Recreate the table and FTS index of an entity from (record_id, record_data) pairs"""
+        table, fts = self.table_names(entity_name)
+        columns = ['id'] + list(field_names)
+        quoted = [quote_identifier(column) for column in columns]
+
+        with self.connection:
+            self.drop_tables(entity_name)
+            self.connection.execute(
+                f"CREATE TABLE {table} (rowid INTEGER PRIMARY KEY, "
+                + ", ".join(f"{column} TEXT" + (" UNIQUE" if column == '"id"' else "") for column in quoted) + ")")
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(quoted)}) VALUES ({', '.join('?' * len(columns))})",
+                ([record_id] + [record_data.get(field_name, '') for field_name in field_names]
+                 for record_id, record_data in records))
+            if self.fts_enabled:
+                # Build the index in one pass after the bulk insert
+                self.connection.execute(
+                    f"CREATE VIRTUAL TABLE {fts} USING fts5({', '.join(quoted)}, "
+                    f"content={quote_identifier(f'records_{entity_name}')}, content_rowid='rowid', tokenize='trigram')")
+                self.connection.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+                # Keep the external-content index in step with the table
+                column_list = ", ".join(quoted)
+                insert_new = (f"INSERT INTO {fts}(rowid, {column_list}) VALUES "
+                              f"(new.rowid, {', '.join('new.' + column for column in quoted)});")
+                delete_old = (f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES "
+                              f"('delete', old.rowid, {', '.join('old.' + column for column in quoted)});")
+                for suffix, event, body in (('ai', 'INSERT', insert_new),
+                                            ('ad', 'DELETE', delete_old),
+                                            ('au', 'UPDATE', delete_old + " " + insert_new)):
+                    trigger = quote_identifier(f"records_{entity_name}_{suffix}")
+                    self.connection.execute(f"CREATE TRIGGER {trigger} AFTER {event} ON {table} BEGIN {body} END")
+
+            self.connection.execute(
+                "INSERT OR REPLACE INTO mirror_meta (entity, signature, fingerprint) VALUES (?, ?, ?)",
+                (entity_name, '\x1f'.join(field_names), fingerprint))
+        self.columns[entity_name] = columns
+
+    def mark_synced(self, entity_name, fingerprint):
+        """Store the file fingerprint the mirror of an entity corresponds to"""
+        with self.connection:
+            self.connection.execute("UPDATE mirror_meta SET fingerprint = ? WHERE entity = ?", (fingerprint, entity_name))
+
+    def drop_tables(self, entity_name):
+        """Drop the table and FTS index of an entity (triggers go with the table)"""
+        table, fts = self.table_names(entity_name)
+        self.connection.execute(f"DROP TABLE IF EXISTS {fts}")
+        self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def drop_entity(self, entity_name):
+        """Forget an entity"""
+        with self.connection:
+            self.drop_tables(entity_name)
+            self.connection.execute("DELETE FROM mirror_meta WHERE entity = ?", (entity_name,))
+        self.columns.pop(entity_name, None)
+
+    def upsert(self, entity_name, record_id, record_data):
+        """Insert or update one record"""
+        columns = self.columns[entity_name]
+        table, _ = self.table_names(entity_name)
+        quoted = [quote_identifier(column) for column in columns]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in quoted[1:]) or '"id" = excluded."id"'
+        with self.connection:
+            self.connection.execute(
+                f"INSERT INTO {table} ({', '.join(quoted)}) VALUES ({', '.join('?' * len(columns))}) "
+                f'ON CONFLICT("id") DO UPDATE SET {updates}',
+                [record_id] + [record_data.get(column, '') for column in columns[1:]])
+
+    def delete(self, entity_name, record_id):
+        """Delete one record"""
+        table, _ = self.table_names(entity_name)
+        with self.connection:
+            self.connection.execute(f'DELETE FROM {table} WHERE "id" = ?', (record_id,))
+
+    def where_clause(self, entity_name, field_name, text):
+        """SQL condition and parameters for a case-insensitive substring filter on one column"""
+        if not text:
+            return "", []
+        column = 'id' if field_name in (None, 'ID') else field_name
+        if self.fts_enabled and len(text) >= 3:
+            # Trigram phrase queries are case-insensitive substring matches
+            _, fts = self.table_names(entity_name)
+            phrase = '"' + text.replace('"', '""') + '"'
+            return (f"WHERE rowid IN (SELECT rowid FROM {fts} WHERE {quote_identifier(column)} MATCH ?)",
+                    [phrase])
+        # Too short for trigrams (or no FTS5): scan with the same semantics as the tab filter
+        return f"WHERE contains_ignore_case({quote_identifier(column)}, ?)", [text.lower()]
+
+    def query_ids(self, entity_name, field_name=None, text='', order_by=None, descending=False, limit=None):
+        """Record IDs matching a substring filter, optionally sorted by a column"""
+        table, _ = self.table_names(entity_name)
+        where, params = self.where_clause(entity_name, field_name, text)
+        order = ""
+        if order_by is not None:
+            column = 'id' if order_by == 'ID' else order_by
+            order = f"ORDER BY {quote_identifier(column)} COLLATE NOCASE {'DESC' if descending else 'ASC'}, rowid"
+        sql = f'SELECT "id" FROM {table} {where} {order}'
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [row[0] for row in self.connection.execute(sql, params)]
+
+    def count(self, entity_name, field_name=None, text=''):
+        """Number of records matching a substring filter"""
+        table, _ = self.table_names(entity_name)
+        where, params = self.where_clause(entity_name, field_name, text)
+        return self.connection.execute(f"SELECT COUNT(*) FROM {table} {where}", params).fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+
+class GroupCommitWriter:
+    """Durable, atomic file writes and removals with group commit
+
+    A write goes to a temporary file next to the target and is renamed into
+    place, so a crash leaves either the old or the new file, never a
+    truncated one. Instead of paying fsync() per file and per directory on
+    every write, pending operations are committed in groups: the first
+    thread to submit becomes the leader, waits commit_window seconds for
+    other writers to join, then fsyncs all files of the group, renames them
+    and fsyncs every touched directory once. batch() groups the writes of a
+    single thread (e.g. a bulk save) the same way.
+    """
+
+    def __init__(self, commit_window=0.002, max_batch=512):
+        self.commit_window = commit_window
+        self.max_batch = max_batch
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.pending = []
+        self.committing = False
+        self.local = threading.local()
+        self.stats = {'commits': 0, 'operations': 0}
+
+    def write_file(self, path, data):
+        """Atomically replace path with data (bytes); durable when this returns (or the batch ends)"""
+        directory, filename = os.path.split(path)
+        tmp_path = os.path.join(directory, f".{filename}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        self.submit([('write', path, tmp_path)])
+
+    def remove_file(self, path):
+        """Remove path; durable when this returns (or the batch ends)"""
+        self.submit([('remove', path, None)])
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Group all writes of the current thread inside the block into few commits"""
+        if getattr(self.local, 'operations', None) is not None:
+            # Nested batch: the outer one commits
+            yield
+            return
+        self.local.operations = []
+        try:
+            yield
+        finally:
+            operations, self.local.operations = self.local.operations, None
+            self.commit_operations(operations)
+
+    def submit(self, operations):
+        """Queue operations, or collect them when the current thread is inside batch()"""
+        batch_operations = getattr(self.local, 'operations', None)
+        if batch_operations is None:
+            self.commit_operations(operations)
+            return
+        batch_operations.extend(operations)
+        if len(batch_operations) >= self.max_batch:
+            self.commit_operations(batch_operations[:])
+            del batch_operations[:]
+
+    def commit_operations(self, operations):
+        """Hand operations to the group commit and wait until they are durable"""
+        if not operations:
+            return
+        ticket = {'done': False, 'error': None}
+        with self.condition:
+            self.pending.append((operations, ticket))
+            while not ticket['done']:
+                if self.committing:
+                    self.condition.wait()
+                    continue
+
+                # Become the leader of the next group
+                self.committing = True
+                self.condition.release()
+                try:
+                    if self.commit_window:
+                        time.sleep(self.commit_window)
+                    with self.lock:
+                        group, self.pending = self.pending, []
+                    error = None
+                    try:
+                        self.commit_group([operation for group_operations, _ in group for operation in group_operations])
+                    except Exception as e:
+                        error = e
+                finally:
+                    self.condition.acquire()
+                self.committing = False
+                for _, group_ticket in group:
+                    group_ticket['done'] = True
+                    group_ticket['error'] = error
+                self.condition.notify_all()
+
+        if ticket['error'] is not None:
+            raise ticket['error']
+
+    def commit_group(self, operations):
+        """fsync new file contents, publish them with rename/remove, then fsync the directories"""
+        try:
+            for kind, path, tmp_path in operations:
+                if kind == 'write':
+                    fd = os.open(tmp_path, os.O_RDONLY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+        except Exception:
+            for kind, path, tmp_path in operations:
+                if kind == 'write' and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            raise
+
+        directories = set()
+        for kind, path, tmp_path in operations:
+            if kind == 'write':
+                os.replace(tmp_path, path)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            directories.add(os.path.dirname(path) or '.')
+
+        # Directory fsync makes renames and removals durable (not available on Windows)
+        if hasattr(os, 'O_DIRECTORY'):
+            for directory in directories:
+                fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+        with self.lock:
+            self.stats['commits'] += 1
+            self.stats['operations'] += len(operations)
+
+
+def indent_element(elem, level=0):
+    """Format an XML element tree with tab indentation"""
+    indent = "\n" + level * "\t"
+    if len(elem):
+        if not elem.text or not elem.text.strip():
+            elem.text = indent + "\t"
+        if not elem.tail or not elem.tail.strip():
+            elem.tail = indent
+        for child in elem:
+            indent_element(child, level + 1)
+        if not child.tail or not child.tail.strip():
+            child.tail = indent
+    else:
+        if level and (not elem.tail or not elem.tail.strip()):
+            elem.tail = indent
+
+
+def plan_schema_migration(old_entity, old_fields, new_entity, new_fields, renames=None, defaults=None):
+    """Describe the record file changes of an entity edit as a JSON-serializable plan
+
+    renames maps old field names to new ones (the values are kept), defaults
+    gives the text of added fields. Old fields that are neither kept nor
+    renamed are dropped. The plan also carries the new field definitions,
+    so that a resumed migration can apply them. Renaming onto an existing field name (including
+    swaps and chains) is refused: re-running such a plan on already
+    migrated files would not be idempotent, which resuming relies on.
+    """
+    old_names = [field['name'] for field in old_fields]
+    new_names = [field['name'] for field in new_fields]
+    renames = {old: new for old, new in (renames or {}).items() if old != new}
+    for old, new in renames.items():
+        if old not in old_names:
+            raise ValueError(f"Unknown field: {old}")
+        if new not in new_names:
+            raise ValueError(f"Field {old} is renamed to {new}, which is not in the new field list")
+        if new in old_names:
+            raise ValueError(f"Can't rename {old} to existing field {new}, rename it in a separate step")
+
+    kept = set(renames.values()) | (set(old_names) & set(new_names))
+    return {
+        'old_entity': old_entity,
+        'new_entity': new_entity,
+        'renames': renames,
+        'drop': [name for name in old_names if name not in renames and name not in new_names],
+        'add': {name: (defaults or {}).get(name, '') for name in new_names if name not in kept},
+        'new_fields': [dict(field) for field in new_fields],
+    }
+
+
+def migration_rewrites_files(plan):
+    """Whether a migration plan changes record files at all"""
+    return bool(plan['old_entity'] != plan['new_entity'] or plan['renames'] or plan['drop'] or plan['add'])
+
+
+def migrate_record_root(root, plan):
+    """Apply a migration plan to a parsed record; False when the record belongs to another entity"""
+    if root.tag not in (plan['old_entity'], plan['new_entity']):
+        return False
+    root.tag = plan['new_entity']
+    drop = set(plan['drop'])
+    for child in list(root):
+        if child.tag in drop:
+            root.remove(child)
+        elif child.tag in plan['renames']:
+            child.tag = plan['renames'][child.tag]
+    for field_name, default in plan['add'].items():
+        if root.find(field_name) is None:
+            ET.SubElement(root, field_name).text = default
+    return True
+
+
+def migrate_record_chunk(chunk):
+    """Rewrite a chunk of record files of one entity for a migration plan (process pool worker)
+
+    Returns (migrated filenames, messages). A file is only reported as
+    migrated once its new version is committed.
+    """
+    entity_dir, filenames, plan, durable = chunk
+    writer = GroupCommitWriter(commit_window=0) if durable else None
+    migrated, messages = [], []
+    with writer.batch() if writer is not None else contextlib.nullcontext():
+        for filename in filenames:
+            path = os.path.join(entity_dir, filename)
+            try:
+                tree = ET.parse(path)
+            except FileNotFoundError:
+                # Already moved to its new name by an interrupted run
+                migrated.append(filename)
+                continue
+            except Exception as e:
+                messages.append(f"Error migrating {filename}: {e}")
+                continue
+
+            root = tree.getroot()
+            if not migrate_record_root(root, plan):
+                messages.append(f"Skipping {filename}: root tag {root.tag} doesn't match {plan['old_entity']}")
+                continue
+
+            # Re-indent from scratch so added fields line up with the others
+            for elem in root.iter():
+                if elem.text is not None and not elem.text.strip() and len(elem):
+                    elem.text = None
+                if elem.tail is not None and not elem.tail.strip():
+                    elem.tail = None
+            indent_element(root)
+            xml_bytes = ET.tostring(root, encoding='utf-8', xml_declaration=True)
+
+            record_id = filename[:-4].split('-', 1)[1]
+            new_path = os.path.join(entity_dir, f"{plan['new_entity']}-{record_id}.xml")
+            if writer is not None:
+                # Within one commit the new file is published before the old one is removed
+                writer.write_file(new_path, xml_bytes)
+                if new_path != path:
+                    writer.remove_file(path)
+            else:
+                with open(new_path, 'wb') as f:
+                    f.write(xml_bytes)
+                if new_path != path:
+                    os.remove(path)
+            migrated.append(filename)
+    return migrated, messages
+
+
+def remove_tree_with_progress(path, progress=None, progress_every=500):
+    """Remove a directory tree file by file; progress(removed_files) is called every progress_every files"""
+    removed = 0
+    for directory, _, filenames in os.walk(path, topdown=False):
+        for filename in filenames:
+            try:
+                os.remove(os.path.join(directory, filename))
+            except FileNotFoundError:
+                pass
+            removed += 1
+            if progress is not None and removed % progress_every == 0:
+                progress(removed)
+        os.rmdir(directory)
+    if progress is not None:
+        progress(removed)
+    return removed
+
+
+class RecordListModel(GObject.Object, Gtk.TreeModel):
+    """Flat tree model over in-memory records: values are read only for the rows the view renders
+
+    The model shows a list of record IDs (row_ids), so filtering and sorting
+    replace that list instead of copying every record into a ListStore. Row
+    iters hold the row position, they are invalidated by set_row_ids.
+    row_positions maps each shown record ID to its row, so updating the row
+    of a saved record doesn't scan the rows.
+    """
+
+    def __init__(self, records, field_names):
+        super().__init__()
+        self.records = records
+        self.field_names = list(field_names)
+        self.row_ids = []
+        self.row_positions = {}
+        self.stamp = 1
+
+    def set_row_ids(self, row_ids):
+        """Replace the shown rows (detach the model from its view first, no signals are emitted)"""
+        self.row_ids = row_ids
+        self.row_positions = {record_id: row for row, record_id in enumerate(row_ids)}
+        self.stamp += 1
+
+    def make_iter(self, row):
+        """Tree iter of a row position"""
+        treeiter = Gtk.TreeIter()
+        treeiter.stamp = self.stamp
+        # Offset by one: a NULL user_data pointer reads back as None
+        treeiter.user_data = row + 1
+        return treeiter
+
+    def iter_row(self, treeiter):
+        """Row position of a tree iter"""
+        return treeiter.user_data - 1
+
+    def row_of(self, record_id):
+        """Row position of a shown record, None when it is hidden"""
+        return self.row_positions.get(record_id)
+
+    def update_record(self, record_id):
+        """Tell the view a shown record changed"""
+        row = self.row_of(record_id)
+        if row is not None:
+            self.row_changed(Gtk.TreePath.new_from_indices([row]), self.make_iter(row))
+
+    def append_record(self, record_id):
+        """Show a record as the last row"""
+        self.row_ids.append(record_id)
+        row = len(self.row_ids) - 1
+        self.row_positions[record_id] = row
+        self.row_inserted(Gtk.TreePath.new_from_indices([row]), self.make_iter(row))
+
+    def remove_record(self, record_id):
+        """Stop showing a record"""
+        row = self.row_of(record_id)
+        if row is not None:
+            del self.row_ids[row]
+            del self.row_positions[record_id]
+            # Rows after it move up by one
+            for position in range(row, len(self.row_ids)):
+                self.row_positions[self.row_ids[position]] = position
+            self.row_deleted(Gtk.TreePath.new_from_indices([row]))
+
+    def do_get_flags(self):
+        return Gtk.TreeModelFlags.LIST_ONLY
+
+    def do_get_n_columns(self):
+        return len(self.field_names) + 1
+
+    def do_get_column_type(self, column):
+        return GObject.TYPE_STRING
+
+    def do_get_iter(self, path):
+        indices = path.get_indices()
+        if len(indices) == 1 and 0 <= indices[0] < len(self.row_ids):
+            return True, self.make_iter(indices[0])
+        return False, None
+
+    def do_get_path(self, treeiter):
+        return Gtk.TreePath.new_from_indices([self.iter_row(treeiter)])
+
+    def do_get_value(self, treeiter, column):
+        record_id = self.row_ids[self.iter_row(treeiter)]
+        if column == 0:
+            return record_id
+        if record_id not in self.records:
+            return ''
+        value = record_value(self.records, record_id, self.field_names[column - 1], '')
+        return '' if value is None else value
+
+    def do_iter_next(self, treeiter):
+        row = self.iter_row(treeiter) + 1
+        if row >= len(self.row_ids):
+            return False
+        treeiter.user_data = row + 1
+        return True
+
+    def do_iter_previous(self, treeiter):
+        row = self.iter_row(treeiter) - 1
+        if row < 0:
+            return False
+        treeiter.user_data = row + 1
+        return True
+
+    def do_iter_children(self, parent):
+        if parent is None and self.row_ids:
+            return True, self.make_iter(0)
+        return False, None
+
+    def do_iter_has_child(self, treeiter):
+        return False
+
+    def do_iter_n_children(self, treeiter):
+        return len(self.row_ids) if treeiter is None else 0
+
+    def do_iter_nth_child(self, parent, n):
+        if parent is None and 0 <= n < len(self.row_ids):
+            return True, self.make_iter(n)
+        return False, None
+
+    def do_iter_parent(self, child):
+        return False, None
+
 
 class EntityCRUDApp:
-    def __init__(self):
+    # Worker processes used to parse record files at startup (None means one per CPU)
+    load_workers = None
+    # Serve unchanged record files from the on-disk parsed-record cache
+    use_record_cache = True
+    # Stream external changes of the data directory into the open tabs
+    use_file_watcher = True
+    # Show the window before the records are loaded, then load them on a worker thread
+    async_startup = False
+    # Build entity tabs when they are first selected; tear down tabs unused for idle_tab_seconds (None: never)
+    lazy_tabs = True
+    idle_tab_seconds = None
+    # Write record files through a temp file + rename with group-committed fsyncs
+    durable_writes = True
+    # Guards the lazy creation of the writer: import workers must share one group commit queue
+    durable_writer_lock = threading.Lock()
+    # Keep an SQLite mirror of the records for filter and sort queries
+    use_sqlite_mirror = False
+    # Answer the substring filter of large entities through a persisted trigram index
+    use_trigram_index = True
+    trigram_index_min_records = TRIGRAM_INDEX_MIN_RECORDS
+    # Lazy field loading: keep only field previews in memory, read full values on demand
+    lazy_fields = False
+    field_preview_length = 200
+    # Show large entities through a RecordListModel instead of a ListStore copy of their records
+    use_virtual_model = True
+    virtual_model_min_records = VIRTUAL_MODEL_MIN_RECORDS
+
+    def __init__(self, headless=False, async_startup=None):
         self.entities_file = './entities_description.xml'
         self.data_dir = './data'
         self.entities = {}
@@ -23,11 +1566,26 @@ class EntityCRUDApp:
         if not os.path.exists(self.entities_file):
             self.create_default_entities_file()
 
-        # Load data first
-        self.load_xml_data()
+        if headless:
+            # Command line use (e.g. --export): entity definitions only, no UI
+            self.window = None
+            self.load_entities()
+            return
+
+        startup_start = time.perf_counter()
+        self.startup_metrics = {}
+        if async_startup is None:
+            async_startup = self.async_startup
+
+        # Load data first (only entity definitions for an asynchronous startup)
+        self.load_xml_data(load_records=not async_startup)
+        if async_startup:
+            # Their tabs show a placeholder until the worker publishes their records
+            self.pending_entities = set(self.entities)
 
         # Initialize UI
         self.init_ui()
+        self.watch_first_paint(startup_start)
 
         # Render tabs after UI is initialized
         self.render_xml_data_state()
@@ -35,19 +1593,105 @@ class EntityCRUDApp:
         # Show the window
         self.window.show_all()
 
+        if async_startup:
+            self.start_async_load(startup_start)
+        else:
+            self.report_startup_loaded(startup_start)
+
     def create_default_entities_file(self):
         """Create a default entities XML file if it doesn't exist"""
         root = ET.Element('entities')
         tree = ET.ElementTree(root)
         tree.write(self.entities_file, encoding='utf-8', xml_declaration=True)
 
-    def load_xml_data(self):
+    def load_xml_data(self, load_records=True):
         """Load all data from XML files (entities_description.xml and data files)"""
+        # Records loaded here supersede an asynchronous load still running
+        self.load_generation = getattr(self, 'load_generation', 0) + 1
+        self.pending_entities = set()
+
         # Load entity definitions
         self.load_entities()
 
+        # Finish schema migrations and entity deletions interrupted by a crash
+        self.resume_schema_migrations()
+        if self.recover_interrupted_deletions():
+            self.start_trash_purge()
+
         # Load entity records data
-        self.load_all_entity_data()
+        if load_records:
+            self.load_all_entity_data()
+
+    def watch_first_paint(self, start_time):
+        """Record the time from start_time to the window's first draw in startup_metrics"""
+        handler = {}
+
+        def on_first_draw(widget, cr):
+            self.window.disconnect(handler['id'])
+            self.startup_metrics['first_paint'] = time.perf_counter() - start_time
+            print(f"Startup: first paint after {self.startup_metrics['first_paint']:.3f}s")
+            return False
+
+        handler['id'] = self.window.connect('draw', on_first_draw)
+
+    def report_startup_loaded(self, start_time):
+        """Record the time from start_time until every entity's records are loaded in startup_metrics"""
+        self.startup_metrics['fully_loaded'] = time.perf_counter() - start_time
+        print(f"Startup: fully loaded after {self.startup_metrics['fully_loaded']:.3f}s")
+
+    def start_async_load(self, start_time):
+        """Load the records of pending entities on a worker thread, publishing each entity when it is loaded"""
+        threading.Thread(target=self.load_entities_in_background,
+                         args=(self.load_generation, list(self.pending_entities), start_time),
+                         daemon=True).start()
+
+    def load_entities_in_background(self, generation, entity_names, start_time):
+        """Worker thread: parse entities, smallest first, and hand each one's records to the main loop"""
+        workers = self.load_workers or os.cpu_count() or 1
+
+        def publish(entity_name, records, file_state):
+            GLib.idle_add(self.on_entity_loaded, generation, entity_name, records, file_state, start_time)
+
+        entity_files = {entity_name: self.scan_entity_files(entity_name) for entity_name in entity_names
+                        if entity_name in self.entities}
+        # Small entities become usable first
+        for entity_name in sorted(entity_files, key=lambda name: len(entity_files[name])):
+            if generation != self.load_generation:
+                return
+            if entity_name not in self.entities:
+                # Deleted meanwhile
+                continue
+            self.load_entity_files({entity_name: entity_files[entity_name]}, workers, parallel=None, publish=publish)
+        GLib.idle_add(self.on_async_load_finished, generation, start_time)
+
+    def on_entity_loaded(self, generation, entity_name, records, file_state, start_time):
+        """Main loop: store the records of an entity loaded in the background and build its tab"""
+        if generation != self.load_generation or entity_name not in self.pending_entities:
+            return False
+        self.pending_entities.discard(entity_name)
+        if entity_name not in self.entities:
+            return False
+
+        if list(records.columns)[1:] == [field['name'] for field in self.entities[entity_name]['fields']]:
+            self.store_loaded_entity(entity_name, records, file_state)
+        else:
+            # Fields were edited while the records loaded
+            self.load_entity_data_from_files(entity_name)
+        self.startup_metrics.setdefault('entities', {})[entity_name] = time.perf_counter() - start_time
+
+        if getattr(self, 'notebook', None) is not None:
+            if self.lazy_tabs and not self.tab_is_current(entity_name):
+                # Built when first selected
+                self.rebuild_entity_tab(entity_name, placeholder=True)
+            else:
+                self.rebuild_entity_tab(entity_name)
+        return False
+
+    def on_async_load_finished(self, generation, start_time):
+        """Main loop: all entities of an asynchronous load are published"""
+        if generation == self.load_generation:
+            self.report_startup_loaded(start_time)
+        return False
 
     def load_entities(self):
         """Load entity definitions from XML file"""
@@ -65,70 +1709,596 @@ class EntityCRUDApp:
                     for field_elem in fields_elem.findall('entity_field'):
                         field_name = field_elem.find('field_name').text
                         field_type = field_elem.find('field_type').text
-                        entity_data['fields'].append({
+                        field = {
                             'name': field_name,
                             'type': field_type
-                        })
+                        }
+                        # Optional hint for dictionary encoding: <field_cardinality>low</field_cardinality>
+                        cardinality = field_elem.findtext('field_cardinality')
+                        if cardinality:
+                            field['cardinality'] = cardinality.strip()
+                        entity_data['fields'].append(field)
 
                 self.entities[entity_name] = entity_data
         except Exception as e:
             print(f"Error loading entities: {e}")
             self.entities = {}
 
-    def load_all_entity_data(self):
-        """Load data for all entities from their XML files"""
+        # Version of the definitions in memory, lets the watcher ignore our own writes
+        self.entities_file_state = file_stat_key(self.entities_file)
+
+    def load_all_entity_data(self, workers=None, parallel=None, use_cache=None):
+        """Load data for all entities from their XML files
+
+        Unchanged files are served from the parsed-record cache. The rest are
+        parsed in a process pool when there are enough of them (see
+        PARALLEL_LOAD_THRESHOLD); parallel=True/False forces the parallel or
+        the sequential path. The produced records and warnings are the same
+        either way.
+        """
+        start_time = time.perf_counter()
+
+        if workers is None:
+            workers = self.load_workers or os.cpu_count() or 1
+
+        # Collect record files of every entity in directory order
+        entity_files = {}
         for entity_name in self.entities.keys():
-            self.load_entity_data_from_files(entity_name)
+            entity_files[entity_name] = self.scan_entity_files(entity_name)
+
+        report = self.load_entity_files(entity_files, workers, parallel, use_cache)
+
+        elapsed = time.perf_counter() - start_time
+        record_count = sum(len(entity_data.get('records', {})) for entity_data in self.entities.values())
+        report.update({
+            'entities': len(entity_files),
+            'records': record_count,
+            'seconds': elapsed
+        })
+        self.last_load_report = report
+        print(f"Loaded {record_count} records from {report['files']} files "
+              f"({report['cached']} cached) for {len(entity_files)} entities in {elapsed:.3f}s ({report['mode']})")
+        return report
+
+    def scan_entity_files(self, entity_name):
+        """List record files of an entity, creating its directory if needed"""
+        entity_dir = os.path.join(self.data_dir, entity_name)
+        if not os.path.exists(entity_dir):
+            os.makedirs(entity_dir, exist_ok=True)
+        return list_entity_record_files(entity_dir, entity_name)
+
+    def load_entity_files(self, entity_files, workers=1, parallel=False, use_cache=None, publish=None):
+        """Parse listed record files of entities, using the parsed-record cache when possible
+
+        The records of each entity are passed to publish(entity_name, records,
+        file_state) when given (from a worker thread), else stored right away.
+        """
+        if use_cache is None:
+            use_cache = self.use_record_cache
+
+        # Serve unchanged files from the cache, collect the rest for parsing
+        caches = {}
+        pending = {}
+        for entity_name, record_files in entity_files.items():
+            cache = self.read_record_cache(entity_name) if use_cache else {}
+            caches[entity_name] = cache
+            pending[entity_name] = [
+                (filename, file_record_id) for filename, file_record_id, stat_key in record_files
+                if filename not in cache or cache[filename][0] != stat_key
+            ]
+
+        pending_count = sum(len(files) for files in pending.values())
+        if parallel is None:
+            parallel = workers > 1 and pending_count >= PARALLEL_LOAD_THRESHOLD
+
+        if parallel:
+            parsed = self.load_entity_data_parallel(pending, workers)
+            mode = f"parallel, {workers} workers"
+        else:
+            parsed = {entity_name: self.parse_entity_records(entity_name, record_files)
+                      for entity_name, record_files in pending.items()}
+            mode = "sequential"
+
+        for entity_name, record_files in entity_files.items():
+            cache = caches[entity_name]
+            parsed_results = dict(zip((filename for filename, _ in pending[entity_name]), parsed[entity_name]))
+
+            results = []
+            file_results = {}
+            for filename, file_record_id, stat_key in record_files:
+                if filename in parsed_results:
+                    result = parsed_results[filename]
+                else:
+                    result = cache[filename][1]
+                results.append(result)
+                file_results[filename] = (stat_key, result)
+
+            records = self.build_record_store(entity_name, results)
+
+            # Remember which file versions the in-memory records come from
+            file_state = {
+                filename: (stat_key, result[0]) for filename, (stat_key, result) in file_results.items()
+            }
+
+            # Rewrite the cache when files were parsed, added or removed
+            if use_cache and (parsed_results or len(cache) != len(file_results)):
+                self.write_record_cache(entity_name, file_results)
+
+            (publish or self.store_loaded_entity)(entity_name, records, file_state)
+
+        total_files = sum(len(record_files) for record_files in entity_files.values())
+        return {'mode': mode, 'files': total_files, 'cached': total_files - pending_count}
+
+    def load_entity_data_parallel(self, entity_files, workers):
+        """Parse (filename, file_record_id) record files of all entities in a process pool"""
+        preview_limit = self.record_preview_limit()
+        chunks = []
+        for entity_name, record_files in entity_files.items():
+            entity_dir = os.path.join(self.data_dir, entity_name)
+            field_names = [field['name'] for field in self.entities[entity_name]['fields']]
+            for start in range(0, len(record_files), PARALLEL_LOAD_CHUNK_SIZE):
+                files = [(os.path.join(entity_dir, filename), file_record_id)
+                         for filename, file_record_id in record_files[start:start + PARALLEL_LOAD_CHUNK_SIZE]]
+                chunks.append((entity_name, field_names, files, preview_limit))
+
+        # map() keeps chunk order, so records end up in directory order as before
+        results = {entity_name: [] for entity_name in entity_files}
+        with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context()) as executor:
+            for chunk, chunk_results in zip(chunks, executor.map(parse_record_chunk, chunks)):
+                results[chunk[0]].extend(chunk_results)
+        return results
+
+    def compare_load_strategies(self, workers=None):
+        """Load all entity data sequentially and in parallel and print both timings"""
+        sequential = self.load_all_entity_data(workers=1, parallel=False, use_cache=False)
+        parallel = self.load_all_entity_data(workers=workers, parallel=True, use_cache=False)
+        speedup = sequential['seconds'] / parallel['seconds'] if parallel['seconds'] > 0 else 0.0
+        print(f"Sequential: {sequential['seconds']:.3f}s, {parallel['mode']}: {parallel['seconds']:.3f}s, speedup x{speedup:.2f}")
+        return sequential, parallel
 
     def load_entity_data_from_files(self, entity_name):
         """Load data for a specific entity from XML files (luassg format)"""
+        self.load_entity_files({entity_name: self.scan_entity_files(entity_name)})
+
+    def parse_entity_records(self, entity_name, record_files):
+        """Parse (filename, file_record_id) record files of an entity in the current process"""
         entity_dir = os.path.join(self.data_dir, entity_name)
-        if not os.path.exists(entity_dir):
+        field_names = [field['name'] for field in self.entities[entity_name]['fields']]
+        preview_limit = self.record_preview_limit()
+        return [parse_record_file(os.path.join(entity_dir, filename), entity_name, field_names, file_record_id,
+                                  preview_limit)
+                for filename, file_record_id in record_files]
+
+    def record_preview_limit(self):
+        """Length of field previews kept in memory, None when full values are loaded"""
+        return self.field_preview_length if self.lazy_fields else None
+
+    def record_cache_path(self, entity_name):
+        """Path of the parsed-record cache of an entity"""
+        return os.path.join(self.data_dir, RECORD_CACHE_DIR, f"{entity_name}.pickle")
+
+    def record_cache_signature(self, entity_name):
+        """Cache signature: a cache is only valid for the field list and preview mode it was built with"""
+        return (RECORD_CACHE_VERSION, entity_name,
+                tuple(field['name'] for field in self.entities[entity_name]['fields']),
+                self.record_preview_limit())
+
+    def read_record_cache(self, entity_name):
+        """Read the parsed-record cache of an entity as {filename: (stat_key, result)}"""
+        try:
+            with open(self.record_cache_path(entity_name), 'rb') as f:
+                cache = pickle.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Ignoring unreadable record cache for {entity_name}: {e}")
+            return {}
+
+        if cache.get('signature') != self.record_cache_signature(entity_name):
+            return {}
+        return cache['files']
+
+    def write_record_cache(self, entity_name, file_results):
+        """Write the parsed-record cache of an entity"""
+        # Files modified in the last moments may change again within the same
+        # mtime tick; leave them out so they are re-parsed on the next load
+        racy_cutoff = time.time_ns() - RECORD_CACHE_RACY_NS
+        files = {
+            filename: (stat_key, result)
+            for filename, (stat_key, result) in file_results.items()
+            if stat_key[1] < racy_cutoff and is_cacheable_result(result)
+        }
+
+        cache_path = self.record_cache_path(entity_name)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'signature': self.record_cache_signature(entity_name), 'files': files},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"Error writing record cache for {entity_name}: {e}")
+
+    def entity_records(self, entity_name):
+        """The in-memory records of an entity, an empty RecordStore when none are loaded"""
+        entity_data = self.entities[entity_name]
+        if 'records' not in entity_data:
+            entity_data['records'] = self.new_record_store(entity_name)
+        return entity_data['records']
+
+    def new_record_store(self, entity_name):
+        """Empty RecordStore of an entity, with its category fields dictionary encoded"""
+        return RecordStore(['id'] + [field['name'] for field in self.entities[entity_name]['fields']],
+                           categorical=self.category_field_names(entity_name))
+
+    def read_pagination_categories(self):
+        """(fieldAsCategory, includeCategory entity names) of pagination.xml, (None, []) without one"""
+        pagination_file = os.path.join(self.data_dir, PAGINATION_FILE)
+        stat_key = file_stat_key(pagination_file)
+        cached = getattr(self, 'pagination_categories', None)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+
+        categories = (None, [])
+        if stat_key is not None:
+            try:
+                root = ET.parse(pagination_file).getroot()
+                category_field = (root.findtext('fieldAsCategory') or '').strip() or None
+                categories = (category_field,
+                              [elem.text.strip() for elem in root.iter('includeCategory') if elem.text])
+            except ET.ParseError as e:
+                print(f"Error reading {pagination_file}: {e}")
+        self.pagination_categories = (stat_key, categories)
+        return categories
+
+    def category_field_names(self, entity_name):
+        """Low-cardinality fields of an entity: declared in the definitions or used as pagination category"""
+        field_names = [field['name'] for field in self.entities[entity_name]['fields']]
+        names = [field['name'] for field in self.entities[entity_name]['fields'] if field.get('cardinality') == 'low']
+        category_field, category_entities = self.read_pagination_categories()
+        if category_field in field_names and entity_name in category_entities and category_field not in names:
+            names.append(category_field)
+        return names
+
+    def store_entity_records(self, entity_name, results):
+        """Report parse messages and store parsed records of an entity in memory"""
+        self.set_entity_records(entity_name, self.build_record_store(entity_name, results))
+
+    def store_loaded_entity(self, entity_name, records, file_state):
+        """Store the loaded records of an entity and the file versions they come from"""
+        self.set_entity_records(entity_name, records)
+        self.entities[entity_name]['file_state'] = file_state
+        self.sync_record_mirror(entity_name)
+
+    def build_record_store(self, entity_name, results):
+        """Report parse messages and build the RecordStore of parsed records of an entity"""
+        records = self.new_record_store(entity_name)
+        for record_id, record_data, messages in results:
+            for message in messages:
+                print(message)
+            if record_id is not None:
+                records[record_id] = record_data
+
+        # Encode fields that turn out to repeat a few values
+        if len(records) >= CATEGORY_DETECT_MIN_ROWS:
+            records.detect_categorical(CATEGORY_DETECT_RATIO)
+        return records
+
+    def set_entity_records(self, entity_name, records):
+        """Make a RecordStore the in-memory records of an entity"""
+        self.entities[entity_name]['records'] = records
+        # The trigram index is reloaded (or rebuilt) for the new records on the next filter
+        self.entities[entity_name]['trigram_index'] = None
+        self.invalidate_filter_cache(entity_name)
+
+    def compute_entity_changes(self, entity_name):
+        """Work out which record files of an entity were added, modified or removed since the last load"""
+        entity_dir = os.path.join(self.data_dir, entity_name)
+        field_names = [field['name'] for field in self.entities[entity_name]['fields']]
+        return diff_record_files(entity_dir, entity_name, field_names,
+                                 self.entities[entity_name].get('file_state', {}),
+                                 self.scan_entity_files(entity_name),
+                                 preview_limit=self.record_preview_limit())
+
+    def apply_entity_changes(self, entity_name, changes):
+        """Apply changes from diff_record_files to the records and the tab rows"""
+        records = self.entity_records(entity_name)
+        if changes['results'] or changes['removed_ids']:
+            self.invalidate_filter_cache(entity_name)
+
+        updated_ids = set()
+        for record_id, record_data, messages in changes['results']:
+            for message in messages:
+                print(message)
+            if record_id is not None:
+                updated_ids.add(record_id)
+                records[record_id] = record_data
+                self.upsert_tab_row(entity_name, record_id, record_data)
+                self.mirror_upsert(entity_name, record_id, record_data)
+                self.trigram_index_upsert(entity_name, record_id, record_data)
+
+        for record_id in changes['removed_ids']:
+            if record_id not in updated_ids:
+                records.pop(record_id, None)
+                self.remove_tab_row(entity_name, record_id)
+                self.mirror_delete(entity_name, record_id)
+                self.trigram_index_delete(entity_name, record_id)
+
+        file_state = self.entities[entity_name].setdefault('file_state', {})
+        for filename, entry in changes['state_updates'].items():
+            if entry is None:
+                file_state.pop(filename, None)
+            else:
+                file_state[filename] = entry
+        self.update_row_count(entity_name)
+        return len(updated_ids), len(set(changes['removed_ids']) - updated_ids)
+
+    def refresh_entity_incremental(self, entity_name):
+        """Re-read only changed record files of an entity and patch records and tab rows"""
+        if 'file_state' not in self.entities[entity_name]:
+            # Nothing to diff against yet, do a full load
+            self.load_entity_data_from_files(entity_name)
+            self.populate_entity_tab_data(entity_name)
+            return
+
+        start_time = time.perf_counter()
+        updated, removed = self.apply_entity_changes(entity_name, self.compute_entity_changes(entity_name))
+        elapsed = time.perf_counter() - start_time
+        print(f"Refreshed {entity_name}: {updated} added/modified, {removed} removed in {elapsed:.3f}s")
+
+    def init_file_watch_state(self):
+        """Initialize the bookkeeping of the data directory watcher"""
+        self.file_monitors = {}
+        self.entities_file_monitor = None
+        self.pending_file_changes = {}
+        self.pending_schema_change = False
+        self.file_change_timer = None
+        self.file_change_worker = None
+        self.first_event_time = 0.0
+        self.last_event_time = 0.0
+
+    def update_file_monitors(self):
+        """Watch entities_description.xml and every entity data directory for external changes"""
+        if not self.use_file_watcher:
+            return
+
+        if not hasattr(self, 'file_monitors'):
+            self.init_file_watch_state()
+
+        if self.entities_file_monitor is None:
+            entities_gfile = Gio.File.new_for_path(os.path.abspath(self.entities_file))
+            self.entities_file_monitor = entities_gfile.monitor_file(Gio.FileMonitorFlags.NONE, None)
+            self.entities_file_monitor.connect("changed", self.on_entities_file_changed)
+
+        # Stop watching removed or renamed entities
+        for entity_name in list(self.file_monitors.keys()):
+            if entity_name not in self.entities:
+                self.file_monitors.pop(entity_name).cancel()
+                self.pending_file_changes.pop(entity_name, None)
+
+        for entity_name in self.entities.keys():
+            if entity_name in self.file_monitors or entity_name in getattr(self, 'migrating_entities', ()):
+                # A migrating entity's directory is created by the rename, it's watched once finished
+                continue
+            entity_dir = os.path.join(self.data_dir, entity_name)
             os.makedirs(entity_dir, exist_ok=True)
-            self.entities[entity_name]['records'] = {}
+            dir_gfile = Gio.File.new_for_path(os.path.abspath(entity_dir))
+            monitor = dir_gfile.monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+            monitor.connect("changed", self.on_entity_dir_changed, entity_name)
+            self.file_monitors[entity_name] = monitor
+
+    def on_entities_file_changed(self, monitor, changed_file, other_file, event_type):
+        """Queue a full reload when entities_description.xml is changed by another program"""
+        if file_stat_key(self.entities_file) == self.entities_file_state:
+            # Our own save_entities_to_xml, or nothing changed
+            return
+        self.pending_schema_change = True
+        self.schedule_file_change_flush()
+
+    def on_entity_dir_changed(self, monitor, changed_file, other_file, event_type, entity_name):
+        """Queue changed record files of an entity directory"""
+        if event_type in (Gio.FileMonitorEvent.ATTRIBUTE_CHANGED,
+                          Gio.FileMonitorEvent.PRE_UNMOUNT,
+                          Gio.FileMonitorEvent.UNMOUNTED):
+            return
+        if entity_name in getattr(self, 'migrating_entities', ()):
+            # The migration reloads the entity when it is done
+            return
+        if entity_name in getattr(self, 'importing_entities', ()):
+            # The import puts its records into memory when it is done
+            return
+        if entity_name in getattr(self, 'pending_entities', ()):
+            # Not loaded yet, there are no records to update
             return
 
-        records = {}
-        # Get all XML files in entity directory
-        for filename in os.listdir(entity_dir):
-            if filename.endswith('.xml'):
-                # Check if filename matches pattern: entity-id.xml
-                # Remove .xml extension
-                basename = filename[:-4]
-                if '-' in basename:
-                    file_entity_name, file_record_id = basename.split('-', 1)
+        filenames = set()
+        for gfile in (changed_file, other_file):
+            if gfile is not None and gfile.get_basename().endswith('.xml'):
+                filenames.add(gfile.get_basename())
+        if not filenames:
+            return
 
-                    # Only process files for this entity
-                    if file_entity_name == entity_name:
-                        filepath = os.path.join(entity_dir, filename)
-                        try:
-                            tree = ET.parse(filepath)
-                            root = tree.getroot()
-
-                            # Verify root element matches entity name
-                            if root.tag != entity_name:
-                                print(f"Warning: Root element '{root.tag}' doesn't match entity name '{entity_name}' in {filename}")
-                                continue
-
-                            # Extract ID from root element's id attribute (luassg format)
-                            record_id = root.get('id')
-                            if not record_id:
-                                # Use the ID from filename as fallback
-                                record_id = file_record_id
-                                print(f"Warning: No id attribute found in {filename}, using filename ID: {record_id}")
-
-                            # Extract field values
-                            record_data = {'id': record_id}
-                            for field in self.entities[entity_name]['fields']:
-                                field_name = field['name']
-                                field_elem = root.find(field_name)
-                                record_data[field_name] = field_elem.text if field_elem is not None else ''
-
-                            records[record_id] = record_data
-                        except Exception as e:
-                            print(f"Error loading {filepath}: {e}")
+        self.pending_file_changes.setdefault(entity_name, set()).update(filenames)
+        self.schedule_file_change_flush()
+
+    def schedule_file_change_flush(self):
+        """Start coalescing a burst of file events"""
+        now = time.monotonic()
+        if self.file_change_timer is None:
+            self.first_event_time = now
+            self.file_change_timer = GLib.timeout_add(WATCH_POLL_MS, self.on_file_change_timer)
+        self.last_event_time = now
+
+    def on_file_change_timer(self):
+        """Apply queued file events once the burst is over (or has lasted too long)"""
+        now = time.monotonic()
+        quiet = now - self.last_event_time >= WATCH_QUIET_SECONDS
+        overdue = now - self.first_event_time >= WATCH_MAX_DELAY_SECONDS
+        if self.file_change_worker is not None or not (quiet or overdue):
+            # Keep polling
+            return True
 
-        self.entities[entity_name]['records'] = records
+        self.file_change_timer = None
+        self.flush_file_changes()
+        return False
+
+    def flush_file_changes(self):
+        """Re-parse the queued record files on a worker thread"""
+        if self.pending_schema_change:
+            # Entity definitions changed: reload everything, which also re-syncs the monitors
+            self.pending_schema_change = False
+            self.pending_file_changes = {}
+            print("entities_description.xml changed on disk, reloading")
+            self.on_refresh_all(None)
+            return
+
+        batch = self.pending_file_changes
+        self.pending_file_changes = {}
+
+        # Snapshot everything the worker needs, it must not touch self.entities
+        jobs = []
+        for entity_name, filenames in batch.items():
+            if entity_name not in self.entities:
+                continue
+            file_state = self.entities[entity_name].get('file_state', {})
+            jobs.append((
+                entity_name,
+                os.path.join(self.data_dir, entity_name),
+                [field['name'] for field in self.entities[entity_name]['fields']],
+                {filename: file_state[filename] for filename in filenames if filename in file_state},
+                sorted(filenames),
+                self.record_preview_limit()
+            ))
+        if not jobs:
+            return
+
+        self.file_change_worker = threading.Thread(target=self.compute_watched_changes, args=(jobs,), daemon=True)
+        self.file_change_worker.start()
+
+    def compute_watched_changes(self, jobs):
+        """Worker thread: stat and parse changed record files, then hand the result to the main loop"""
+        changes = {}
+        for entity_name, entity_dir, field_names, old_state, filenames, preview_limit in jobs:
+            current_files = stat_record_files(entity_dir, entity_name, filenames)
+            changes[entity_name] = (field_names, diff_record_files(entity_dir, entity_name, field_names,
+                                                                   old_state, current_files, filenames,
+                                                                   preview_limit))
+        GLib.idle_add(self.apply_watched_changes, changes)
+
+    def apply_watched_changes(self, changes):
+        """Patch records and tab rows with the changes found by the watcher worker (main loop)"""
+        self.file_change_worker = None
+        start_time = time.perf_counter()
+
+        updated_total = removed_total = 0
+        for entity_name, (field_names, entity_changes) in changes.items():
+            if entity_name not in self.entities:
+                continue
+            if field_names != [field['name'] for field in self.entities[entity_name]['fields']]:
+                # Entity was edited meanwhile and has been reloaded already
+                continue
+
+            # Detach the model for big batches so the view redraws once, not per row
+            treeview = self.entities[entity_name].get('treeview')
+            change_count = len(entity_changes['results']) + len(entity_changes['removed_ids'])
+            detached_model = None
+            if treeview is not None and change_count > WATCH_DETACH_THRESHOLD:
+                detached_model = treeview.get_model()
+                treeview.set_model(None)
+
+            updated, removed = self.apply_entity_changes(entity_name, entity_changes)
+            updated_total += updated
+            removed_total += removed
+
+            if detached_model is not None:
+                treeview.set_model(detached_model)
+
+        elapsed = time.perf_counter() - start_time
+        print(f"Applied external changes: {updated_total} added/modified, {removed_total} removed in {elapsed:.3f}s")
+        return False
+
+    def remember_file_state(self, entity_name, record_id):
+        """Record the on-disk version of a record file written or removed by the app"""
+        file_state = self.entities[entity_name].get('file_state')
+        if file_state is None:
+            return
+
+        filename = f"{entity_name}-{record_id}.xml"
+        stat_key = file_stat_key(os.path.join(self.data_dir, entity_name, filename))
+        if stat_key is None:
+            file_state.pop(filename, None)
+        else:
+            file_state[filename] = (stat_key, record_id)
+
+    def get_record_mirror(self):
+        """The SQLite mirror, opened on first use, or None when it is disabled"""
+        if not self.use_sqlite_mirror:
+            return None
+        if getattr(self, 'record_mirror', None) is None:
+            self.record_mirror = RecordMirror(os.path.join(self.data_dir, RECORD_CACHE_DIR, RECORD_MIRROR_FILE))
+        return self.record_mirror
+
+    def file_state_fingerprint(self, entity_name):
+        """Fingerprint of the record file versions the in-memory records come from"""
+        file_state = self.entities[entity_name].get('file_state')
+        if file_state is None:
+            return None
+        return hashlib.sha1(repr(sorted(file_state.items())).encode('utf-8')).hexdigest()
+
+    def sync_record_mirror(self, entity_name):
+        """Rebuild the mirror of an entity from its records if it is missing or stale"""
+        mirror = self.get_record_mirror()
+        if mirror is None:
+            return
+
+        field_names = [field['name'] for field in self.entities[entity_name]['fields']]
+        fingerprint = self.file_state_fingerprint(entity_name)
+        if mirror.is_synced(entity_name, field_names, fingerprint):
+            return
+
+        records = self.entities[entity_name].get('records', {})
+        mirror.rebuild_entity(entity_name, field_names,
+                              ((record_id, self.full_record_data(entity_name, record_id, records[record_id]))
+                               for record_id in list(records) if record_id in records),
+                              fingerprint)
+        print(f"Rebuilt SQLite mirror for {entity_name} ({len(records)} records)")
+
+    def ensure_record_mirror(self, entity_name):
+        """Make sure the mirror has a table with the current fields of an entity before querying it"""
+        mirror = self.get_record_mirror()
+        field_names = [field['name'] for field in self.entities[entity_name]['fields']]
+        if mirror.columns.get(entity_name) != ['id'] + field_names:
+            self.sync_record_mirror(entity_name)
+
+    def full_record_data(self, entity_name, record_id, record_data):
+        """Full field values of a record, reading lazily loaded bodies from the file"""
+        if isinstance(record_data, PartialRecord):
+            return self.get_record_data(entity_name, record_id) or record_data
+        return record_data
+
+    def mirror_upsert(self, entity_name, record_id, record_data):
+        """Write a saved or reloaded record through to the mirror"""
+        mirror = self.get_record_mirror()
+        if mirror is not None and entity_name in mirror.columns:
+            mirror.upsert(entity_name, record_id, self.full_record_data(entity_name, record_id, record_data))
+
+    def mirror_delete(self, entity_name, record_id):
+        """Remove a deleted record from the mirror"""
+        mirror = self.get_record_mirror()
+        if mirror is not None and entity_name in mirror.columns:
+            mirror.delete(entity_name, record_id)
+
+    def close_record_mirror(self):
+        """Store the current file fingerprints in the mirror and close it"""
+        mirror = getattr(self, 'record_mirror', None)
+        if mirror is None:
+            return
+        for entity_name in self.entities.keys():
+            if entity_name in mirror.columns:
+                mirror.mark_synced(entity_name, self.file_state_fingerprint(entity_name))
+        mirror.close()
+        self.record_mirror = None
 
     def save_entities_to_xml(self):
         """Save entities to XML file"""
@@ -146,11 +2316,14 @@ class EntityCRUDApp:
                 field_elem = ET.SubElement(fields_elem, 'entity_field')
                 ET.SubElement(field_elem, 'field_name').text = field['name']
                 ET.SubElement(field_elem, 'field_type').text = field['type']
+                if field.get('cardinality'):
+                    ET.SubElement(field_elem, 'field_cardinality').text = field['cardinality']
 
         # Format XML with indentation
         self.indent_xml(root)
         tree = ET.ElementTree(root)
         tree.write(self.entities_file, encoding='utf-8', xml_declaration=True)
+        self.entities_file_state = file_stat_key(self.entities_file)
 
     def init_ui(self):
         """Initialize the main UI components (window, notebook)"""
@@ -170,7 +2343,7 @@ class EntityCRUDApp:
         # Center the window on screen
         self.window.set_position(Gtk.WindowPosition.CENTER)
 
-        self.window.connect("destroy", Gtk.main_quit)
+        self.window.connect("destroy", self.on_window_destroy)
 
         # Connect window resize event to update table column widths
         self.window.connect("check-resize", self.on_window_resize)
@@ -185,8 +2358,98 @@ class EntityCRUDApp:
 
         # Create notebook for tabs
         self.notebook = Gtk.Notebook()
+        self.notebook.connect("switch-page", self.on_switch_page)
         main_vbox.pack_start(self.notebook, True, True, 0)
 
+        if self.idle_tab_seconds is not None:
+            GLib.timeout_add_seconds(IDLE_TAB_CHECK_SECONDS, self.on_idle_tab_check)
+
+    def trigram_index_path(self, entity_name):
+        """Path of the persisted trigram index of an entity"""
+        return os.path.join(self.data_dir, RECORD_CACHE_DIR, f"{entity_name}.trigrams.pickle")
+
+    def get_trigram_index(self, entity_name):
+        """The trigram index of an entity's loaded records, None for small entities or when disabled
+
+        A persisted index is used when it was saved for the same fields,
+        preview mode and record file versions; otherwise it is rebuilt from
+        the records and saved.
+        """
+        entity_data = self.entities[entity_name]
+        records = entity_data.get('records')
+        if (not self.use_trigram_index or not isinstance(records, RecordStore)
+                or len(records) < self.trigram_index_min_records):
+            return None
+        if entity_data.get('trigram_index') is not None:
+            return entity_data['trigram_index']
+
+        signature = (TRIGRAM_INDEX_VERSION,) + self.record_cache_signature(entity_name)
+        fingerprint = self.file_state_fingerprint(entity_name)
+        index = None
+        try:
+            with open(self.trigram_index_path(entity_name), 'rb') as f:
+                saved = pickle.load(f)
+            if saved['signature'] == signature and fingerprint is not None and saved['fingerprint'] == fingerprint:
+                index = TrigramIndex.from_state(saved['index'])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Ignoring unreadable trigram index for {entity_name}: {e}")
+
+        built = index is None
+        if built:
+            start = time.perf_counter()
+            index = TrigramIndex([None] + [field['name'] for field in entity_data['fields']])
+            for record_id in records:
+                index.add(record_id, records[record_id])
+            print(f"Built trigram index for {entity_name} ({len(records)} records) in {time.perf_counter() - start:.3f}s")
+        entity_data['trigram_index'] = index
+        if built:
+            self.save_trigram_index(entity_name)
+        return index
+
+    def save_trigram_index(self, entity_name):
+        """Persist the trigram index of an entity if it changed since it was loaded or saved"""
+        index = self.entities[entity_name].get('trigram_index')
+        fingerprint = self.file_state_fingerprint(entity_name)
+        if index is None or not index.dirty or fingerprint is None:
+            return
+        index_path = self.trigram_index_path(entity_name)
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            tmp_path = f"{index_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'signature': (TRIGRAM_INDEX_VERSION,) + self.record_cache_signature(entity_name),
+                             'fingerprint': fingerprint, 'index': index.to_state()},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, index_path)
+            index.dirty = False
+        except Exception as e:
+            print(f"Error writing trigram index for {entity_name}: {e}")
+
+    def trigram_index_upsert(self, entity_name, record_id, record_data):
+        """Index a saved or reloaded record, if the entity's index is loaded"""
+        index = self.entities[entity_name].get('trigram_index')
+        if index is not None:
+            preview_limit = self.record_preview_limit()
+            if preview_limit is not None:
+                # Index what the record store holds
+                record_data = make_record_preview(record_data, preview_limit)
+            index.add(record_id, record_data)
+
+    def trigram_index_delete(self, entity_name, record_id):
+        """Remove a deleted record from the entity's index, if it is loaded"""
+        index = self.entities[entity_name].get('trigram_index')
+        if index is not None:
+            index.remove(record_id)
+
+    def on_window_destroy(self, widget):
+        """Close the SQLite mirror (marking it in sync with the files), save changed trigram indexes and quit"""
+        self.close_record_mirror()
+        for entity_name in self.entities.keys():
+            self.save_trigram_index(entity_name)
+        Gtk.main_quit()
+
     def create_menu_bar(self):
         """Create the main menu bar"""
         self.menu_bar = Gtk.MenuBar()
@@ -209,6 +2472,23 @@ class EntityCRUDApp:
         pagination_menu_item.connect("activate", self.on_open_pagination_xml)
         config_menu.append(pagination_menu_item)
 
+        # Data menu
+        data_menu_item = Gtk.MenuItem(label="Data")
+        self.menu_bar.append(data_menu_item)
+
+        data_menu = Gtk.Menu()
+        data_menu_item.set_submenu(data_menu)
+
+        # Bulk import menu item
+        import_menu_item = Gtk.MenuItem(label="Import CSV/JSONL...")
+        import_menu_item.connect("activate", self.on_import_records)
+        data_menu.append(import_menu_item)
+
+        # Bulk export menu item
+        export_menu_item = Gtk.MenuItem(label="Export CSV/JSONL...")
+        export_menu_item.connect("activate", self.on_export_records)
+        data_menu.append(export_menu_item)
+
     def on_window_resize(self, widget):
         """Handle window resize to update table column widths"""
         # Update column widths for all entity tabs
@@ -295,19 +2575,220 @@ class EntityCRUDApp:
             while self.notebook.get_n_pages() > 0:
                 self.notebook.remove_page(0)
 
-        # Create entity tabs
+        # Create entity tabs (placeholders are built when first selected or once their records are loaded)
         for entity_name in self.entities.keys():
-            self.create_entity_tab(entity_name)
+            if self.lazy_tabs or entity_name in getattr(self, 'pending_entities', ()):
+                self.create_placeholder_tab(entity_name)
+            else:
+                self.create_entity_tab(entity_name)
 
         # Always create management tab as the last tab
         self.create_management_tab()
 
+        # Watch the directories of the current entity set
+        self.update_file_monitors()
+
         # Force UI update
         if self.window:
             self.window.queue_draw()
 
-    def create_entity_tab(self, entity_name):
+    def reconcile_notebook(self, previous_entities):
+        """Update the notebook after entities changed, rebuilding only the tabs of changed entities
+
+        previous_entities is a copy of self.entities from before the change.
+        Tabs of entities with the same fields keep their widgets, filter,
+        scroll position and selection; their rows are refilled only when the
+        records changed. Pages of removed or redefined entities are replaced.
+        """
+        if not self.notebook:
+            return
+        start_time = time.perf_counter()
+        pending = getattr(self, 'pending_entities', ())
+
+        kept = set()
+        for entity_name, entity_data in self.entities.items():
+            old_data = previous_entities.get(entity_name)
+            # Placeholders are cheap to recreate
+            if old_data is None or not old_data.get('tab_built') or entity_name in pending:
+                continue
+            if old_data is entity_data:
+                kept.add(entity_name)
+                continue
+            if [field['name'] for field in old_data['fields']] != [field['name'] for field in entity_data['fields']]:
+                continue
+
+            if (old_data.get('records') is not entity_data.get('records')
+                    and 'file_state' in entity_data and old_data.get('file_state') == entity_data['file_state']):
+                # Reloaded from the same file versions: keep the old state (records, indexes, filter caches)
+                old_data['fields'] = entity_data['fields']
+                self.entities[entity_name] = old_data
+            else:
+                records_changed = old_data.get('records') is not entity_data.get('records')
+                for key in ENTITY_TAB_KEYS + ('tab_widget', 'last_used'):
+                    if key in old_data:
+                        entity_data[key] = old_data[key]
+                if records_changed and entity_data.get('tab_built'):
+                    entity_data['restore_view'] = self.capture_tab_view(entity_name)
+                    self.invalidate_filter_cache(entity_name)
+                    self.populate_entity_tab_data(entity_name)
+            kept.add(entity_name)
+
+        # Pages of entities that are gone or were redefined
+        for entity_name, old_data in previous_entities.items():
+            if entity_name not in kept and old_data.get('tab_widget') is not None:
+                position = self.notebook.page_num(old_data['tab_widget'])
+                if position != -1:
+                    self.notebook.remove_page(position)
+                self.discard_tab_state(old_data)
+
+        # New pages, in entity order before the management tab
+        for position, entity_name in enumerate(self.entities):
+            if entity_name in kept:
+                tab_widget = self.entities[entity_name]['tab_widget']
+                if self.notebook.page_num(tab_widget) != position:
+                    self.notebook.reorder_child(tab_widget, position)
+                continue
+            if self.lazy_tabs or entity_name in pending:
+                self.create_placeholder_tab(entity_name, position)
+            else:
+                self.create_entity_tab(entity_name, position)
+            self.entities[entity_name]['tab_widget'].show_all()
+
+        self.populate_management_tab_data()
+        self.update_file_monitors()
+        rebuilt = len(self.entities) - len(kept)
+        print(f"Reconciled tabs: {rebuilt} rebuilt, {len(kept)} kept in {time.perf_counter() - start_time:.3f}s")
+
+    def discard_tab_state(self, entity_data):
+        """Stop the background work of a tab and drop its widgets and models from its entity"""
+        population = entity_data.get('population')
+        if population is not None and population.get('source'):
+            GLib.source_remove(population['source'])
+        if entity_data.get('fuzzy_search') is not None:
+            entity_data['fuzzy_search']['cancelled'].set()
+        if entity_data.get('filter_timeout'):
+            GLib.source_remove(entity_data['filter_timeout'])
+        for key in ENTITY_TAB_KEYS:
+            entity_data.pop(key, None)
+
+    def capture_tab_view(self, entity_name):
+        """Selected record and scroll offset of a built tab"""
+        entity_data = self.entities[entity_name]
+        model, treeiter = entity_data['treeview'].get_selection().get_selected()
+        return {'selected': model[treeiter][0] if treeiter is not None else None,
+                'scroll': entity_data['scrolled_window'].get_vadjustment().get_value()}
+
+    def restore_tab_view(self, entity_name, view):
+        """Select the record and scroll back to the offset of capture_tab_view"""
+        entity_data = self.entities[entity_name]
+        treeview = entity_data['treeview']
+        if view['selected'] is not None and treeview.get_model() is entity_data['filter_model']:
+            treeiter = self.find_tab_row(entity_name, view['selected'])
+            if treeiter is not None:
+                treeview.get_selection().select_iter(treeiter)
+        # After the view has laid out its rows again
+        GLib.idle_add(entity_data['scrolled_window'].get_vadjustment().set_value, view['scroll'])
+
+    def find_tab_row(self, entity_name, record_id):
+        """Iter of a record's row in the (filtered) model of a tab, None when the row is not shown"""
+        entity_data = self.entities[entity_name]
+        model = entity_data['filter_model']
+        if isinstance(model, RecordListModel):
+            row = model.row_of(record_id)
+            return None if row is None else model.make_iter(row)
+        child_iter = entity_data.get('row_iters', {}).get(record_id)
+        if child_iter is None:
+            return None
+        found, treeiter = model.convert_child_iter_to_iter(child_iter)
+        return treeiter if found else None
+
+    def create_placeholder_tab(self, entity_name, position=-1):
+        """Create a lightweight tab for an entity, replaced by the real one when it is needed"""
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
+        box.set_valign(Gtk.Align.CENTER)
+        spinner = Gtk.Spinner()
+        box.pack_start(spinner, False, False, 0)
+        label = Gtk.Label(label=f"Opening {entity_name}...")
+        box.pack_start(label, False, False, 0)
+        if entity_name in getattr(self, 'pending_entities', ()):
+            spinner.start()
+            label.set_text(f"Loading {entity_name} records...")
+        self.entities[entity_name]['tab_widget'] = box
+        self.entities[entity_name]['tab_built'] = False
+
+        if self.notebook:
+            self.notebook.insert_page(box, Gtk.Label(label=entity_name), position)
+
+    def page_entity_name(self, page):
+        """Name of the entity whose tab is a notebook page, None for other pages"""
+        for entity_name, entity_data in self.entities.items():
+            if entity_data.get('tab_widget') is page:
+                return entity_name
+        return None
+
+    def on_switch_page(self, notebook, page, page_num):
+        """Build an entity tab the first time it is selected and note when each tab was last used"""
+        entity_name = self.page_entity_name(page)
+        if entity_name is None:
+            return
+        self.entities[entity_name]['last_used'] = time.monotonic()
+        if not self.entities[entity_name].get('tab_built') and entity_name not in getattr(self, 'pending_entities', ()):
+            # Not while the notebook is switching to the placeholder
+            GLib.idle_add(self.build_placeholder_tab, entity_name)
+
+    def build_placeholder_tab(self, entity_name):
+        """Replace the placeholder tab of an entity with the real one"""
+        if (entity_name in self.entities and not self.entities[entity_name].get('tab_built')
+                and self.tab_is_current(entity_name)):
+            self.rebuild_entity_tab(entity_name)
+        return False
+
+    def tab_is_current(self, entity_name):
+        """Whether the tab of an entity is the selected notebook page"""
+        tab_widget = self.entities[entity_name].get('tab_widget')
+        return (tab_widget is not None and self.notebook is not None
+                and self.notebook.page_num(tab_widget) == self.notebook.get_current_page())
+
+    def on_idle_tab_check(self):
+        """Periodic check: tear down tabs unused for idle_tab_seconds"""
+        if self.idle_tab_seconds is None:
+            return False
+        cutoff = time.monotonic() - self.idle_tab_seconds
+        for entity_name, entity_data in self.entities.items():
+            if (entity_data.get('tab_built') and entity_data.get('last_used', 0) < cutoff
+                    and not self.tab_is_current(entity_name)):
+                self.teardown_entity_tab(entity_name)
+        return True
+
+    def teardown_entity_tab(self, entity_name):
+        """Replace the built tab of an entity with a placeholder, freeing its widgets and models"""
+        self.discard_tab_state(self.entities[entity_name])
+        if getattr(self, 'notebook', None) is not None:
+            self.rebuild_entity_tab(entity_name, placeholder=True)
+        print(f"Closed idle tab {entity_name}")
+
+    def rebuild_entity_tab(self, entity_name, placeholder=False):
+        """Replace the tab of an entity with a new one (or a placeholder) at the same position"""
+        old_widget = self.entities[entity_name].get('tab_widget')
+        position = self.notebook.page_num(old_widget) if old_widget is not None else -1
+        was_current = position != -1 and position == self.notebook.get_current_page()
+
+        # Insert the new page before removing the old one: removing the selected page would select a neighbour
+        if placeholder:
+            self.create_placeholder_tab(entity_name, position)
+        else:
+            self.create_entity_tab(entity_name, position)
+        self.entities[entity_name]['tab_widget'].show_all()
+        if was_current:
+            self.notebook.set_current_page(position)
+        if position != -1:
+            self.notebook.remove_page(self.notebook.page_num(old_widget))
+
+    def create_entity_tab(self, entity_name, position=-1):
         """Create a tab for a specific entity with filtering capability"""
+        # Rows still being added to a previous tab of the entity are not needed anymore
+        self.cancel_tab_population(entity_name)
+
         # Create main container box
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
         main_box.set_margin_start(10)
@@ -383,6 +2864,18 @@ class EntityCRUDApp:
         # Set fixed width for clear button
         clear_filter_btn.set_size_request(80, -1)
 
+        # Fuzzy search: rank records by similarity instead of filtering
+        fuzzy_toggle = Gtk.CheckButton(label="Fuzzy")
+        fuzzy_toggle.set_tooltip_text("Rank records by similarity to the filter text (typos allowed)")
+        fuzzy_toggle.connect("toggled", self.on_fuzzy_toggled, entity_name)
+        filter_grid.attach_next_to(fuzzy_toggle, clear_filter_btn, Gtk.PositionType.RIGHT, 1, 1)
+
+        # Row count, with a spinner while the tab is being filled
+        loading_spinner = Gtk.Spinner()
+        filter_grid.attach_next_to(loading_spinner, fuzzy_toggle, Gtk.PositionType.RIGHT, 1, 1)
+        row_count_label = Gtk.Label()
+        filter_grid.attach_next_to(row_count_label, loading_spinner, Gtk.PositionType.RIGHT, 1, 1)
+
         # Create buttons for CRUD operations
         button_box = Gtk.Box(spacing=10)
         main_box.pack_start(button_box, False, False, 0)
@@ -416,11 +2909,17 @@ class EntityCRUDApp:
             columns.append(field['name'])
 
         types = [str] * len(columns)
-        list_store = Gtk.ListStore(*types)
+        if self.uses_virtual_model(entity_name):
+            # Rows are read from the records as they are drawn; filter and sort remap its row IDs
+            list_store = filter_model = RecordListModel(self.entities[entity_name].get('records', {}), columns[1:])
+            # Fixed row heights: the view doesn't measure (and read) every row
+            treeview.set_fixed_height_mode(True)
+        else:
+            list_store = Gtk.ListStore(*types)
 
-        # Create tree model filter for filtering
-        filter_model = list_store.filter_new()
-        filter_model.set_visible_func(self.filter_function, (entity_name, field_combo, filter_entry))
+            # Create tree model filter for filtering
+            filter_model = list_store.filter_new()
+            filter_model.set_visible_func(self.filter_function, (entity_name, field_combo, filter_entry))
         treeview.set_model(filter_model)
 
         # Create columns (initial widths will be set by update_table_column_widths)
@@ -430,6 +2929,8 @@ class EntityCRUDApp:
             column.set_resizable(True)
             column.set_expand(False)  # Don't expand, use fixed width
             column.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+            column.set_clickable(True)
+            column.connect("clicked", self.on_column_clicked, entity_name, column_name)
             treeview.append_column(column)
 
         # Pack the scrolled window (with table) into main box
@@ -442,7 +2943,17 @@ class EntityCRUDApp:
         self.entities[entity_name]['field_combo'] = field_combo
         self.entities[entity_name]['filter_entry'] = filter_entry
         self.entities[entity_name]['columns'] = columns
+        self.entities[entity_name]['sort_order'] = None
+        self.entities[entity_name]['filter_query'] = None
+        self.entities[entity_name]['filter_matches'] = None
+        self.entities[entity_name]['fuzzy_toggle'] = fuzzy_toggle
+        self.entities[entity_name]['fuzzy_store'] = Gtk.ListStore(*types)
+        self.entities[entity_name]['fuzzy_search'] = None
+        self.entities[entity_name]['loading_spinner'] = loading_spinner
+        self.entities[entity_name]['row_count_label'] = row_count_label
         self.entities[entity_name]['tab_widget'] = main_box
+        self.entities[entity_name]['tab_built'] = True
+        self.entities[entity_name]['last_used'] = time.monotonic()
         self.entities[entity_name]['scrolled_window'] = scrolled_window
 
         # Connect filter entry changes
@@ -465,7 +2976,7 @@ class EntityCRUDApp:
         # Add tab to notebook if it exists
         if self.notebook:
             label = Gtk.Label(label=entity_name)
-            self.notebook.append_page(main_box, label)
+            self.notebook.insert_page(main_box, label, position)
 
     def on_row_double_click(self, treeview, path, column, entity_name):
         """Handle double-click on table row to open edit dialog"""
@@ -481,10 +2992,9 @@ class EntityCRUDApp:
             dialog = RecordDialog(self, entity_name, record_id)
             response = dialog.run()
             if response == Gtk.ResponseType.OK:
-                self.save_record(entity_name, dialog.get_data())
-                # Reload data and refresh UI
-                self.load_entity_data_from_files(entity_name)
-                self.populate_entity_tab_data(entity_name)
+                record_id = self.save_record(entity_name, dialog.get_data())
+                # The saved record is in memory already: update its row only
+                self.refresh_record_row(entity_name, record_id)
             dialog.destroy()
 
     def on_filter_control_resize(self, widget, allocation, entity_name, control_type):
@@ -511,41 +3021,410 @@ class EntityCRUDApp:
 
     def filter_function(self, model, treeiter, data):
         """Filter function for TreeModelFilter"""
-        entity_name, field_combo, filter_entry = data
+        entity_name = data[0]
+        entity_data = self.entities[entity_name]
 
-        # Get filter text
-        filter_text = filter_entry.get_text().strip().lower()
+        # Matches computed up front for the current filter (record store, SQLite mirror)
+        filter_matches = entity_data.get('filter_matches')
+        if filter_matches is not None:
+            return model[treeiter][0] in filter_matches
 
-        # If filter is empty, show all records
-        if not filter_text:
+        # Query resolved once per refilter by resolve_filter_query; no query shows all records
+        query = entity_data.get('filter_query')
+        if query is None:
             return True
+        _, col_index, filter_text = query
 
-        # Get selected field
-        field_name = field_combo.get_active_text()
-
-        # Find the column index for the selected field
-        columns = self.entities[entity_name]['columns']
-        if field_name == "ID":
-            col_index = 0  # ID is first column
-        else:
-            try:
-                col_index = columns.index(field_name)
-            except ValueError:
-                # Field not found, show all
-                return True
-
-        # Get the value from the model
+        # Check if filter text is contained in the value (case-insensitive)
         value = model[treeiter][col_index]
         if value is None:
             return False
-
-        # Check if filter text is contained in the value (case-insensitive)
         return filter_text in value.lower()
 
     def on_filter_changed(self, widget, entity_name):
-        """Handle filter changes"""
+        """Handle filter changes: refilter once, after typing pauses"""
+        if entity_name not in self.entities or 'filter_model' not in self.entities[entity_name]:
+            return
+        entity_data = self.entities[entity_name]
+        if entity_data.get('filter_timeout'):
+            GLib.source_remove(entity_data['filter_timeout'])
+        entity_data['filter_timeout'] = GLib.timeout_add(FILTER_DEBOUNCE_MS, self.on_filter_timeout, entity_name)
+
+    def on_filter_timeout(self, entity_name):
+        """Debounce timer of the tab filter"""
         if entity_name in self.entities and 'filter_model' in self.entities[entity_name]:
-            self.entities[entity_name]['filter_model'].refilter()
+            entity_data = self.entities[entity_name]
+            entity_data['filter_timeout'] = None
+            if entity_data.get('fuzzy_toggle') is not None and entity_data['fuzzy_toggle'].get_active():
+                self.start_fuzzy_search(entity_name)
+            else:
+                self.apply_filter(entity_name)
+        return False
+
+    def on_fuzzy_toggled(self, toggle, entity_name):
+        """Switch a tab between the filtered rows and ranked fuzzy search results"""
+        entity_data = self.entities[entity_name]
+        field_combo = entity_data['field_combo']
+        if toggle.get_active():
+            field_combo.append_text(FUZZY_ALL_FIELDS)
+            entity_data['treeview'].set_model(entity_data['fuzzy_store'])
+            self.start_fuzzy_search(entity_name)
+        else:
+            self.cancel_fuzzy_search(entity_name)
+            # The plain filter matches one field
+            if field_combo.get_active_text() == FUZZY_ALL_FIELDS:
+                field_combo.set_active(0)
+            field_combo.remove(len(entity_data['columns']))
+            entity_data['fuzzy_store'].clear()
+            population = entity_data.get('population')
+            if population is not None:
+                # Still filling: the filtered rows are attached once the fill is done
+                population['detached_model'] = entity_data['filter_model']
+                entity_data['treeview'].set_model(None)
+            else:
+                entity_data['treeview'].set_model(entity_data['filter_model'])
+            self.apply_filter(entity_name)
+
+    def fuzzy_search_columns(self, entity_name, field_name=None):
+        """Snapshot (record_ids, lowercased columns) to search: a field, "ID", or all fields and the ID (None)"""
+        entity_data = self.entities[entity_name]
+        records = entity_data.get('records', {})
+        if field_name is None or field_name == FUZZY_ALL_FIELDS:
+            names = [None] + [field['name'] for field in entity_data['fields']]
+        else:
+            names = [None if field_name == "ID" else field_name]
+
+        if isinstance(records, RecordStore):
+            # List copies: the worker must not see rows change under it
+            return list(records.ids), [list(records.lower_column(name)) for name in names]
+        record_ids = list(records)
+        return record_ids, [[lower_value(record_id if name is None else record_value(records, record_id, name))
+                             for record_id in record_ids] for name in names]
+
+    def start_fuzzy_search(self, entity_name, field_name=None):
+        """Rank the records of a tab against the filter text on a worker thread, replacing a running search"""
+        entity_data = self.entities[entity_name]
+        self.cancel_fuzzy_search(entity_name)
+        query = entity_data['filter_entry'].get_text().strip()
+        if not query:
+            entity_data['fuzzy_store'].clear()
+            return None
+
+        if field_name is None:
+            field_name = entity_data['field_combo'].get_active_text()
+        record_ids, columns = self.fuzzy_search_columns(entity_name, field_name)
+        search = {'query': query, 'cancelled': threading.Event(), 'done': False}
+        entity_data['fuzzy_search'] = search
+
+        def publish(results):
+            GLib.idle_add(self.show_fuzzy_results, entity_name, search, results)
+
+        def run_search():
+            start = time.perf_counter()
+            results = fuzzy_search(query, record_ids, columns, cancelled=search['cancelled'], on_update=publish)
+            if results is not None:
+                search['done'] = True
+                search['seconds'] = time.perf_counter() - start
+                publish(results)
+
+        threading.Thread(target=run_search, daemon=True).start()
+        return search
+
+    def cancel_fuzzy_search(self, entity_name):
+        """Stop the running fuzzy search of a tab, its pending results are dropped"""
+        search = self.entities[entity_name].get('fuzzy_search')
+        if search is not None:
+            search['cancelled'].set()
+            self.entities[entity_name]['fuzzy_search'] = None
+
+    def show_fuzzy_results(self, entity_name, search, results):
+        """Show (intermediate) top results of a fuzzy search, best first, unless it was superseded"""
+        if entity_name not in self.entities or self.entities[entity_name].get('fuzzy_search') is not search:
+            return False
+        entity_data = self.entities[entity_name]
+        records = entity_data.get('records', {})
+        fuzzy_store = entity_data['fuzzy_store']
+        fuzzy_store.clear()
+        for _, record_id in results:
+            if record_id in records:
+                fuzzy_store.append(self.build_tab_row(entity_name, record_id, records[record_id]))
+        return False
+
+    def apply_filter(self, entity_name):
+        """Resolve the filter of a tab and refilter it now"""
+        entity_data = self.entities[entity_name]
+        if entity_data.get('filter_timeout'):
+            GLib.source_remove(entity_data['filter_timeout'])
+            entity_data['filter_timeout'] = None
+        self.resolve_filter_query(entity_name)
+        self.update_filter_matches(entity_name)
+        if isinstance(entity_data['filter_model'], RecordListModel):
+            self.remap_virtual_rows(entity_name)
+        else:
+            entity_data['filter_model'].refilter()
+        self.update_row_count(entity_name)
+
+        # Query plan (or parse error) of structured queries as the entry's tooltip
+        explain = entity_data.get('filter_explain')
+        if explain != entity_data.get('shown_filter_explain'):
+            entity_data['filter_entry'].set_tooltip_text(explain)
+            entity_data['shown_filter_explain'] = explain
+
+    def resolve_filter_query(self, entity_name):
+        """Read the filter widgets once: (field_name, column_index, lowercase text), None for no filter"""
+        entity_data = self.entities[entity_name]
+        filter_text = entity_data['filter_entry'].get_text().strip().lower()
+        field_name = entity_data['field_combo'].get_active_text()
+
+        query = None
+        if filter_text:
+            if field_name == "ID":
+                query = (field_name, 0, filter_text)  # ID is first column
+            elif field_name in entity_data['columns']:
+                query = (field_name, entity_data['columns'].index(field_name), filter_text)
+        entity_data['filter_query'] = query
+
+        # Query language (field:value, AND, NOT, ...): terms without a field use the selected one
+        entity_data['structured_query'] = None
+        entity_data['filter_error'] = None
+        raw_text = entity_data['filter_entry'].get_text().strip()
+        if query is not None and is_structured_query(raw_text):
+            field_names = [field['name'] for field in entity_data['fields']]
+            try:
+                entity_data['structured_query'] = parse_filter_query(
+                    raw_text, field_names, None if field_name == "ID" else field_name)
+            except ValueError as e:
+                entity_data['filter_error'] = str(e)
+        return query
+
+    def update_filter_matches(self, entity_name):
+        """Compute the matching record IDs of the resolved filter, from the filter cache when possible"""
+        entity_data = self.entities[entity_name]
+        entity_data['filter_matches'] = None
+
+        entity_data['filter_explain'] = None
+        query = entity_data.get('filter_query')
+        if query is None:
+            return
+        field_name, _, filter_text = query
+
+        if entity_data.get('filter_error'):
+            entity_data['filter_matches'] = set()
+            entity_data['filter_explain'] = entity_data['filter_error']
+            return
+        terms = entity_data.get('structured_query')
+        if terms is not None:
+            entity_data['filter_matches'], plan = self.run_filter_query(entity_name, terms)
+            entity_data['filter_explain'] = format_query_plan(terms, plan)
+            return
+
+        filter_matches = self.cached_filter_matches(entity_name, field_name, filter_text)
+        if filter_matches is None:
+            filter_matches = self.compute_filter_matches(entity_name, field_name, filter_text)
+            if filter_matches is None:
+                return
+            self.remember_filter_matches(entity_name, field_name, filter_text, filter_matches)
+        entity_data['filter_matches'] = filter_matches
+
+    def compute_filter_matches(self, entity_name, field_name, filter_text):
+        """Matching record IDs through the SQLite mirror or the record store, None for plain record dicts"""
+        entity_data = self.entities[entity_name]
+        mirror = self.get_record_mirror()
+        if mirror is not None:
+            self.ensure_record_mirror(entity_name)
+            return set(mirror.query_ids(entity_name, field_name, filter_text))
+
+        records = entity_data.get('records')
+        if not isinstance(records, RecordStore):
+            return None
+        column_name = None if field_name == "ID" else field_name
+
+        # Large entities: check only the records holding every trigram of the query
+        if not records.is_categorical(column_name):
+            index = self.get_trigram_index(entity_name)
+            candidates = index.candidates(column_name, filter_text) if index is not None else None
+            if candidates is not None:
+                return self.refine_filter_matches(records, column_name, filter_text, candidates)
+
+        # Scan the lowercased column once (encoded columns test each distinct value once)
+        return set(records.ids_containing(column_name, filter_text))
+
+    def refine_filter_matches(self, records, column_name, filter_text, candidates):
+        """The candidate record IDs whose field really contains the filter text"""
+        return {record_id for record_id in candidates
+                if filter_text in lower_value(record_id if column_name is None
+                                              else records.value(record_id, column_name))}
+
+    def cached_filter_matches(self, entity_name, field_name, filter_text):
+        """Serve the filter from the tab's cache of recent results
+
+        A repeated query (e.g. after backspacing) is returned as is. A query
+        containing a cached one can only match a subset of its records, so
+        the smallest such result is re-checked instead of all records.
+        """
+        entity_data = self.entities[entity_name]
+        cache = entity_data.get('filter_cache')
+        if not cache:
+            return None
+        key = (field_name, filter_text)
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        records = entity_data.get('records')
+        if not isinstance(records, RecordStore) or self.get_record_mirror() is not None:
+            # The mirror matches full values, the store may only hold previews
+            return None
+        base = None
+        for (cached_field, cached_text), cached_matches in cache.items():
+            if cached_field == field_name and cached_text in filter_text:
+                if base is None or len(cached_matches) < len(base):
+                    base = cached_matches
+        if base is None:
+            return None
+        filter_matches = self.refine_filter_matches(records, None if field_name == "ID" else field_name,
+                                                    filter_text, base)
+        self.remember_filter_matches(entity_name, field_name, filter_text, filter_matches)
+        return filter_matches
+
+    def remember_filter_matches(self, entity_name, field_name, filter_text, filter_matches):
+        """Add a filter result to the tab's LRU cache"""
+        cache = self.entities[entity_name].get('filter_cache')
+        if cache is None:
+            cache = self.entities[entity_name]['filter_cache'] = OrderedDict()
+        cache[(field_name, filter_text)] = filter_matches
+        cache.move_to_end((field_name, filter_text))
+        while len(cache) > FILTER_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def invalidate_filter_cache(self, entity_name):
+        """Forget cached filter results after records of an entity changed"""
+        self.entities[entity_name]['filter_cache'] = None
+
+    def plan_filter_query(self, entity_name, terms):
+        """Choose how to find the candidate records of a structured query
+
+        Each positive term an index can answer is costed by the rows it
+        leaves to check: dictionary-encoded fields count the rows of the
+        matching codes, the trigram index takes its shortest posting list
+        for the term. The cheapest drives the query; without one every
+        record is scanned. All terms are then checked on the candidates.
+        """
+        records = self.entities[entity_name].get('records', {})
+        store = records if isinstance(records, RecordStore) else None
+        index = self.get_trigram_index(entity_name) if store is not None else None
+
+        plan = {'access': 'scan', 'term': None, 'estimated_rows': len(records),
+                'description': f"scan all {len(records)} records"}
+        for term in terms:
+            if term['negated']:
+                continue
+            option = None
+            if store is not None and store.is_categorical(term['field']):
+                column = store.columns[term['field']]
+                codes = {code for code, value in enumerate(column.values)
+                         if value is not MISSING and match_query_term(term, value)}
+                option = {'access': 'dictionary', 'estimated_rows': sum(column.row_mask(codes)),
+                          'description': f"dictionary codes of {term['field']} "
+                                         f"({len(codes)} of {len(column.values) - 1} values match)"}
+            elif index is not None and term['op'] != 'regex':
+                estimate = index.estimate(term['field'], term['value'])
+                if estimate is not None:
+                    field = 'ID' if term['field'] is None else term['field']
+                    option = {'access': 'trigram', 'estimated_rows': estimate,
+                              'description': f"trigram index on {field} for '{term['value']}'"}
+            if option is not None and option['estimated_rows'] < plan['estimated_rows']:
+                option['term'] = term
+                plan = option
+        plan['cost'] = plan['estimated_rows'] * len(terms)
+        return plan
+
+    def run_filter_query(self, entity_name, terms):
+        """Matching record IDs of a structured query, and its plan with the actual row count and time"""
+        start = time.perf_counter()
+        records = self.entities[entity_name].get('records', {})
+        plan = self.plan_filter_query(entity_name, terms)
+        term = plan['term']
+        if plan['access'] == 'dictionary':
+            candidates = records.ids_matching(term['field'], lambda value: match_query_term(term, value))
+        elif plan['access'] == 'trigram':
+            candidates = self.entities[entity_name]['trigram_index'].candidates(term['field'], term['value'])
+        else:
+            candidates = list(records)
+
+        filter_matches = {
+            record_id for record_id in candidates
+            if query_matches(terms, record_id, lambda name: record_value(records, record_id, name))}
+        plan['rows'] = len(filter_matches)
+        plan['seconds'] = time.perf_counter() - start
+        return filter_matches, plan
+
+    def explain_filter_query(self, entity_name, text, default_field="ID"):
+        """Run a filter query on an entity and describe the chosen plan, its cost and result"""
+        field_names = [field['name'] for field in self.entities[entity_name]['fields']]
+        terms = parse_filter_query(text, field_names, None if default_field == "ID" else default_field)
+        _, plan = self.run_filter_query(entity_name, terms)
+        return format_query_plan(terms, plan)
+
+    def update_filter_match(self, entity_name, record_id, record_data):
+        """Keep the precomputed filter matches in step with an inserted or updated record"""
+        entity_data = self.entities[entity_name]
+        filter_matches = entity_data.get('filter_matches')
+        query = entity_data.get('filter_query')
+        if filter_matches is None or query is None:
+            return
+        field_name, _, filter_text = query
+        terms = entity_data.get('structured_query')
+        if terms is not None:
+            matches = query_matches(terms, record_id, record_data.get)
+        else:
+            value = record_id if field_name == "ID" else record_data.get(field_name)
+            matches = contains_ignore_case(value, filter_text)
+        if matches:
+            filter_matches.add(record_id)
+        else:
+            filter_matches.discard(record_id)
+
+    def on_column_clicked(self, column, entity_name, column_name):
+        """Sort the entity tab by a column, toggling the direction on repeated clicks"""
+        descending = column.get_sort_indicator() and column.get_sort_order() == Gtk.SortType.ASCENDING
+        self.sort_entity_tab(entity_name, column_name, descending)
+
+        for other_column in self.entities[entity_name]['treeview'].get_columns():
+            other_column.set_sort_indicator(other_column is column)
+        column.set_sort_order(Gtk.SortType.DESCENDING if descending else Gtk.SortType.ASCENDING)
+
+    def sorted_record_ids(self, entity_name, column_name, descending=False):
+        """Record IDs of an entity ordered by a column (case-insensitive)"""
+        mirror = self.get_record_mirror()
+        if mirror is not None:
+            self.ensure_record_mirror(entity_name)
+            return mirror.query_ids(entity_name, order_by=column_name, descending=descending)
+
+        records = self.entities[entity_name].get('records', {})
+        if column_name == "ID":
+            return sorted(records, key=str.lower, reverse=descending)
+        return sorted(records, key=lambda record_id: (record_value(records, record_id, column_name) or '').lower(),
+                      reverse=descending)
+
+    def sort_entity_tab(self, entity_name, column_name, descending=False):
+        """Reorder the rows of an entity tab in place"""
+        if 'list_store' not in self.entities[entity_name]:
+            return
+
+        self.entities[entity_name]['sort_order'] = (column_name, descending)
+        if isinstance(self.entities[entity_name]['list_store'], RecordListModel):
+            self.entities[entity_name]['virtual_order'] = None
+            self.remap_virtual_rows(entity_name)
+            return
+
+        list_store = self.entities[entity_name]['list_store']
+        positions = {row[0]: position for position, row in enumerate(list_store)}
+        new_order = [positions.pop(record_id) for record_id in self.sorted_record_ids(entity_name, column_name, descending)
+                     if record_id in positions]
+        # Rows unknown to the sort source keep their relative order at the end
+        new_order.extend(sorted(positions.values()))
+        list_store.reorder(new_order)
 
     def on_clear_filter(self, button, entity_name):
         """Clear the filter for a specific entity"""
@@ -554,22 +3433,265 @@ class EntityCRUDApp:
             # Set dropdown back to ID
             if 'field_combo' in self.entities[entity_name]:
                 self.entities[entity_name]['field_combo'].set_active(0)
+            # Show all rows right away instead of waiting for the debounce
+            if 'filter_model' in self.entities[entity_name]:
+                self.apply_filter(entity_name)
 
     def populate_entity_tab_data(self, entity_name):
         """Populate the entity tab with data from memory"""
         if 'list_store' not in self.entities[entity_name]:
             return
 
+        self.cancel_tab_population(entity_name)
         list_store = self.entities[entity_name]['list_store']
+        if isinstance(list_store, RecordListModel):
+            list_store.records = self.entities[entity_name].get('records', {})
+            self.update_filter_matches(entity_name)
+            self.entities[entity_name]['virtual_order'] = None
+            self.remap_virtual_rows(entity_name)
+            self.finish_tab_population(entity_name)
+            return
+
         list_store.clear()
+        # Rows are filtered as they are appended: match the active filter against the new records first
+        self.update_filter_matches(entity_name)
 
+        # ListStore iters stay valid while their row exists, keep one per record
+        row_iters = {}
+        self.entities[entity_name]['row_iters'] = row_iters
         records = self.entities[entity_name].get('records', {})
-        for record_id, record_data in records.items():
-            row_data = [record_id]
-            for field in self.entities[entity_name]['fields']:
-                field_name = field['name']
-                row_data.append(record_data.get(field_name, ''))
-            list_store.append(row_data)
+        if len(records) < POPULATE_CHUNK_MIN_RECORDS or getattr(self, 'window', None) is None:
+            for record_id, record_data in records.items():
+                row_iters[record_id] = list_store.append(self.build_tab_row(entity_name, record_id, record_data))
+            self.finish_tab_population(entity_name)
+            return
+
+        # Large tab: fill it from idle callbacks with the model detached, so appends don't redraw the view
+        population = {'list_store': list_store, 'record_ids': list(records), 'position': 0,
+                      'start_time': time.perf_counter()}
+        treeview = self.entities[entity_name].get('treeview')
+        if treeview is not None and treeview.get_model() is self.entities[entity_name]['filter_model']:
+            population['detached_model'] = treeview.get_model()
+            treeview.set_model(None)
+        self.entities[entity_name]['population'] = population
+        self.entities[entity_name]['loading_spinner'].start()
+        population['source'] = GLib.idle_add(self.populate_tab_chunk, entity_name, population)
+
+    def populate_tab_chunk(self, entity_name, population):
+        """Idle callback: append rows of a tab being filled until the frame budget is used up"""
+        if entity_name not in self.entities or self.entities[entity_name].get('population') is not population:
+            return False
+        entity_data = self.entities[entity_name]
+        records = entity_data.get('records', {})
+        row_iters = entity_data['row_iters']
+        list_store = population['list_store']
+        record_ids = population['record_ids']
+        position = population['position']
+        deadline = time.perf_counter() + POPULATE_FRAME_BUDGET
+        while position < len(record_ids):
+            # Check the clock every 64 rows
+            for record_id in record_ids[position:position + 64]:
+                # Records saved or removed meanwhile were already applied to the tab
+                if record_id in row_iters or record_id not in records:
+                    continue
+                row_iters[record_id] = list_store.append(self.build_tab_row(entity_name, record_id, records[record_id]))
+            position += 64
+            if time.perf_counter() >= deadline:
+                break
+        population['position'] = position
+
+        if position < len(record_ids):
+            entity_data['row_count_label'].set_text(f"Loading {position:,} / {len(record_ids):,}")
+            return True
+
+        population['source'] = None
+        # Unless the view switched to another model meanwhile (fuzzy search)
+        if population.get('detached_model') is not None and entity_data['treeview'].get_model() is None:
+            entity_data['treeview'].set_model(population['detached_model'])
+        entity_data['population'] = None
+        print(f"Filled tab {entity_name}: {len(record_ids)} rows in {time.perf_counter() - population['start_time']:.3f}s")
+        self.finish_tab_population(entity_name)
+        return False
+
+    def cancel_tab_population(self, entity_name):
+        """Stop filling a tab from idle callbacks (it is being refilled or rebuilt)"""
+        population = self.entities.get(entity_name, {}).get('population')
+        if population is None:
+            return
+        if population.get('source'):
+            GLib.source_remove(population['source'])
+        entity_data = self.entities[entity_name]
+        entity_data['population'] = None
+        treeview = entity_data.get('treeview')
+        if population.get('detached_model') is not None and treeview is not None and treeview.get_model() is None:
+            treeview.set_model(population['detached_model'])
+        if entity_data.get('loading_spinner') is not None:
+            entity_data['loading_spinner'].stop()
+
+    def finish_tab_population(self, entity_name):
+        """Tab filled: stop the loading indicator, show the row count and re-rank fuzzy results"""
+        if self.entities[entity_name].get('loading_spinner') is not None:
+            self.entities[entity_name]['loading_spinner'].stop()
+        self.update_row_count(entity_name)
+        self.restart_fuzzy_search(entity_name)
+        view = self.entities[entity_name].pop('restore_view', None)
+        if view is not None:
+            self.restore_tab_view(entity_name, view)
+
+    def update_row_count(self, entity_name):
+        """Show how many records of a tab the filter shows"""
+        entity_data = self.entities[entity_name]
+        label = entity_data.get('row_count_label')
+        if label is None or entity_data.get('population') is not None:
+            return
+        total = len(entity_data.get('records', {}))
+        model = entity_data['filter_model']
+        shown = len(model.row_ids) if isinstance(model, RecordListModel) else model.iter_n_children(None)
+        label.set_text(f"{total:,} rows" if shown == total else f"{shown:,} of {total:,} rows")
+
+    def restart_fuzzy_search(self, entity_name):
+        """Re-rank fuzzy results against the current records, when the tab is in fuzzy mode"""
+        fuzzy_toggle = self.entities[entity_name].get('fuzzy_toggle')
+        if fuzzy_toggle is not None and fuzzy_toggle.get_active():
+            self.start_fuzzy_search(entity_name)
+
+    def uses_virtual_model(self, entity_name):
+        """Whether a new tab of the entity shows its records through a RecordListModel"""
+        return (self.use_virtual_model
+                and len(self.entities[entity_name].get('records', {})) >= self.virtual_model_min_records)
+
+    def virtual_row_order(self, entity_name):
+        """All record IDs of a virtual tab in display order (the sort order, else record order), cached
+
+        The order is a dict keyed by record ID (values unused), so saved and
+        deleted records are found, appended and removed without a scan.
+        """
+        entity_data = self.entities[entity_name]
+        order = entity_data.get('virtual_order')
+        if order is None:
+            records = entity_data.get('records', {})
+            sort_order = entity_data.get('sort_order')
+            if sort_order is None:
+                order = list(records)
+            else:
+                order = [record_id for record_id in self.sorted_record_ids(entity_name, *sort_order)
+                         if record_id in records]
+                # Records unknown to the sort source go last
+                if len(order) < len(records):
+                    sorted_ids = set(order)
+                    order.extend(record_id for record_id in records if record_id not in sorted_ids)
+            order = dict.fromkeys(order)
+            entity_data['virtual_order'] = order
+        return order
+
+    def virtual_row_visible(self, entity_name, record_id):
+        """Whether the active filter shows a record of a virtual tab"""
+        entity_data = self.entities[entity_name]
+        filter_matches = entity_data.get('filter_matches')
+        if filter_matches is not None:
+            return record_id in filter_matches
+        query = entity_data.get('filter_query')
+        if query is None:
+            return True
+        field_name, _, filter_text = query
+        if field_name == "ID":
+            return filter_text in record_id.lower()
+        return contains_ignore_case(record_value(entity_data.get('records', {}), record_id, field_name), filter_text)
+
+    def remap_virtual_rows(self, entity_name):
+        """Show the filtered records of a virtual tab in display order, replacing its row IDs"""
+        entity_data = self.entities[entity_name]
+        model = entity_data['list_store']
+        order = self.virtual_row_order(entity_name)
+        filter_matches = entity_data.get('filter_matches')
+        if filter_matches is not None:
+            row_ids = [record_id for record_id in order if record_id in filter_matches]
+        elif entity_data.get('filter_query') is None:
+            row_ids = list(order)
+        else:
+            row_ids = [record_id for record_id in order if self.virtual_row_visible(entity_name, record_id)]
+
+        # Swapping rows under an attached view would need a signal per row
+        treeview = entity_data.get('treeview')
+        attached = treeview is not None and treeview.get_model() is model
+        if attached:
+            treeview.set_model(None)
+        model.set_row_ids(row_ids)
+        if attached:
+            treeview.set_model(model)
+
+    def build_tab_row(self, entity_name, record_id, record_data):
+        """Build the ListStore row of a record"""
+        row_data = [record_id]
+        for field in self.entities[entity_name]['fields']:
+            field_name = field['name']
+            row_data.append(record_data.get(field_name, ''))
+        return row_data
+
+    def upsert_tab_row(self, entity_name, record_id, record_data):
+        """Update the tab row of a record in place, or append it if it is new"""
+        if 'list_store' not in self.entities[entity_name]:
+            return
+
+        list_store = self.entities[entity_name]['list_store']
+        if isinstance(list_store, RecordListModel):
+            self.update_filter_match(entity_name, record_id, record_data)
+            self.upsert_virtual_row(entity_name, record_id)
+            return
+
+        row_iters = self.entities[entity_name].setdefault('row_iters', {})
+        row_data = self.build_tab_row(entity_name, record_id, record_data)
+        self.update_filter_match(entity_name, record_id, record_data)
+        treeiter = row_iters.get(record_id)
+        if treeiter is not None:
+            list_store.set_row(treeiter, row_data)
+        else:
+            row_iters[record_id] = list_store.append(row_data)
+
+    def refresh_record_row(self, entity_name, record_id):
+        """Update, add or remove the tab row of one record after it was saved or deleted"""
+        records = self.entities[entity_name].get('records', {})
+        if record_id in records:
+            self.upsert_tab_row(entity_name, record_id, records[record_id])
+        else:
+            self.remove_tab_row(entity_name, record_id)
+        self.update_row_count(entity_name)
+        self.restart_fuzzy_search(entity_name)
+
+    def remove_tab_row(self, entity_name, record_id):
+        """Remove the tab row of a record"""
+        if 'list_store' not in self.entities[entity_name]:
+            return
+
+        list_store = self.entities[entity_name]['list_store']
+        if isinstance(list_store, RecordListModel):
+            order = self.entities[entity_name].get('virtual_order')
+            if order is not None:
+                order.pop(record_id, None)
+            list_store.remove_record(record_id)
+            return
+
+        treeiter = self.entities[entity_name].get('row_iters', {}).pop(record_id, None)
+        if treeiter is not None:
+            list_store.remove(treeiter)
+
+    def upsert_virtual_row(self, entity_name, record_id):
+        """Refresh, show or hide the row of an inserted or updated record in a virtual tab"""
+        entity_data = self.entities[entity_name]
+        model = entity_data['list_store']
+        order = entity_data.get('virtual_order')
+        if order is not None and record_id not in order:
+            # New records go last, like ListStore appends; the next sort places them
+            order[record_id] = None
+
+        shown = model.row_of(record_id) is not None
+        if self.virtual_row_visible(entity_name, record_id):
+            if shown:
+                model.update_record(record_id)
+            else:
+                model.append_record(record_id)
+        elif shown:
+            model.remove_record(record_id)
 
     def create_management_tab(self):
         """Create the management tab for entities"""
@@ -640,29 +3762,16 @@ class EntityCRUDApp:
 
     def indent_xml(self, elem, level=0):
         """Helper function to format XML with indentation"""
-        indent = "\n" + level * "\t"
-        if len(elem):
-            if not elem.text or not elem.text.strip():
-                elem.text = indent + "\t"
-            if not elem.tail or not elem.tail.strip():
-                elem.tail = indent
-            for child in elem:
-                self.indent_xml(child, level + 1)
-            if not child.tail or not child.tail.strip():
-                child.tail = indent
-        else:
-            if level and (not elem.tail or not elem.tail.strip()):
-                elem.tail = indent
+        indent_element(elem, level)
 
     def on_new_record(self, button, entity_name):
         """Handle new record creation"""
         dialog = RecordDialog(self, entity_name, None)
         response = dialog.run()
         if response == Gtk.ResponseType.OK:
-            self.save_record(entity_name, dialog.get_data())
-            # Reload data and refresh UI
-            self.load_entity_data_from_files(entity_name)
-            self.populate_entity_tab_data(entity_name)
+            record_id = self.save_record(entity_name, dialog.get_data())
+            # The saved record is in memory already: add its row only
+            self.refresh_record_row(entity_name, record_id)
         dialog.destroy()
 
     def on_edit_record(self, button, entity_name):
@@ -680,10 +3789,9 @@ class EntityCRUDApp:
             dialog = RecordDialog(self, entity_name, record_id)
             response = dialog.run()
             if response == Gtk.ResponseType.OK:
-                self.save_record(entity_name, dialog.get_data())
-                # Reload data and refresh UI
-                self.load_entity_data_from_files(entity_name)
-                self.populate_entity_tab_data(entity_name)
+                record_id = self.save_record(entity_name, dialog.get_data())
+                # The saved record is in memory already: update its row only
+                self.refresh_record_row(entity_name, record_id)
             dialog.destroy()
         else:
             self.show_message("Please select a record to edit", Gtk.MessageType.WARNING)
@@ -712,9 +3820,8 @@ class EntityCRUDApp:
 
             if response == Gtk.ResponseType.YES:
                 self.delete_record(entity_name, record_id)
-                # Reload data and refresh UI
-                self.load_entity_data_from_files(entity_name)
-                self.populate_entity_tab_data(entity_name)
+                # Remove its row only
+                self.refresh_record_row(entity_name, record_id)
 
             dialog.destroy()
         else:
@@ -722,10 +3829,8 @@ class EntityCRUDApp:
 
     def on_refresh_entity(self, button, entity_name):
         """Refresh specific entity data"""
-        # Reload data from files
-        self.load_entity_data_from_files(entity_name)
-        # Refresh UI
-        self.populate_entity_tab_data(entity_name)
+        # Re-read changed files only and patch the affected rows
+        self.refresh_entity_incremental(entity_name)
 
     def on_new_entity(self, button):
         """Handle new entity creation"""
@@ -734,6 +3839,7 @@ class EntityCRUDApp:
         if response == Gtk.ResponseType.OK:
             entity_name, fields = dialog.get_data()
             if entity_name and entity_name not in self.entities:
+                previous_entities = dict(self.entities)
                 # Add to entities
                 self.entities[entity_name] = {
                     'fields': fields,
@@ -741,13 +3847,197 @@ class EntityCRUDApp:
                 }
                 # Save to XML
                 self.save_entities_to_xml()
-                # Re-render UI tabs only
-                self.render_xml_data_state()
+                # Add its tab
+                self.reconcile_notebook(previous_entities)
                 # Show the updated window
                 if self.window:
                     self.window.show_all()
         dialog.destroy()
 
+    def migration_checkpoint_paths(self, entity_name):
+        """Plan and journal files of a migration, keyed by the (new) entity name"""
+        base = os.path.join(self.data_dir, RECORD_CACHE_DIR, MIGRATION_DIR, entity_name)
+        return base + '.plan.json', base + '.done'
+
+    def save_migration_plan(self, plan):
+        """Checkpoint a migration plan before any record file is touched"""
+        plan_path, _ = self.migration_checkpoint_paths(plan['new_entity'])
+        os.makedirs(os.path.dirname(plan_path), exist_ok=True)
+        plan_bytes = json.dumps(plan, ensure_ascii=False, indent=1).encode('utf-8')
+        writer = self.get_durable_writer()
+        if writer is not None:
+            writer.write_file(plan_path, plan_bytes)
+        else:
+            with open(plan_path, 'wb') as f:
+                f.write(plan_bytes)
+
+    def run_schema_migration(self, plan, workers=None, progress=None):
+        """Rewrite the record files of an entity for a migration plan
+
+        The entity directory is renamed first (atomic), then record files are
+        rewritten in chunks, in a process pool for large entities. Every
+        finished chunk is appended to a journal next to the checkpointed
+        plan, so an interrupted migration resumes where it stopped
+        (resume_schema_migrations). progress(done, total) is called after
+        each chunk. Returns a report with counts, timing and messages.
+        """
+        start = time.perf_counter()
+        old_entity, new_entity = plan['old_entity'], plan['new_entity']
+        plan_path, done_path = self.migration_checkpoint_paths(new_entity)
+        if not os.path.exists(plan_path):
+            self.save_migration_plan(plan)
+
+        old_dir = os.path.join(self.data_dir, old_entity)
+        entity_dir = os.path.join(self.data_dir, new_entity)
+        if old_entity != new_entity and os.path.isdir(old_dir):
+            if os.path.exists(entity_dir):
+                # An empty directory (e.g. created by the file watcher) is replaced
+                try:
+                    os.rmdir(entity_dir)
+                except OSError:
+                    raise ValueError(f"Can't rename {old_entity}: {entity_dir} already exists")
+            os.rename(old_dir, entity_dir)
+            # The parsed-record cache is keyed by entity name
+            try:
+                os.remove(self.record_cache_path(old_entity))
+            except FileNotFoundError:
+                pass
+
+        done = set()
+        if os.path.exists(done_path):
+            with open(done_path, encoding='utf-8') as f:
+                done = set(line.rstrip('\n') for line in f)
+
+        pending = []
+        if os.path.isdir(entity_dir):
+            # After a rename, files still named after the old entity are the ones left to do
+            pending = [filename for filename, _, _ in list_entity_record_files(entity_dir, old_entity)
+                       if filename not in done]
+        chunks = [(entity_dir, pending[start_index:start_index + MIGRATION_CHUNK_SIZE], plan, self.durable_writes)
+                  for start_index in range(0, len(pending), MIGRATION_CHUNK_SIZE)]
+
+        if workers is None:
+            workers = self.load_workers or os.cpu_count() or 1
+        executor = None
+        if workers > 1 and len(pending) >= PARALLEL_LOAD_THRESHOLD:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context())
+        migrated, messages = 0, []
+        try:
+            results = executor.map(migrate_record_chunk, chunks) if executor else map(migrate_record_chunk, chunks)
+            with open(done_path, 'a', encoding='utf-8') as journal:
+                for filenames, chunk_messages in results:
+                    journal.write(''.join(filename + '\n' for filename in filenames))
+                    journal.flush()
+                    if self.durable_writes:
+                        os.fsync(journal.fileno())
+                    migrated += len(filenames)
+                    messages.extend(chunk_messages)
+                    if progress is not None:
+                        progress(migrated, len(pending))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Finished: drop the checkpoint
+        os.remove(done_path)
+        os.remove(plan_path)
+
+        elapsed = time.perf_counter() - start
+        print(f"Migrated {migrated} {old_entity} records to {new_entity} in {elapsed:.3f}s")
+        for message in messages:
+            print(message)
+        return {'entity': new_entity, 'migrated': migrated, 'seconds': elapsed, 'messages': messages}
+
+    def resume_schema_migrations(self):
+        """Finish migrations that were interrupted (e.g. by a crash) before their data is loaded"""
+        migration_dir = os.path.join(self.data_dir, RECORD_CACHE_DIR, MIGRATION_DIR)
+        if not os.path.isdir(migration_dir):
+            return
+        for filename in sorted(os.listdir(migration_dir)):
+            if not filename.endswith('.plan.json'):
+                continue
+            try:
+                with open(os.path.join(migration_dir, filename), encoding='utf-8') as f:
+                    plan = json.load(f)
+                print(f"Resuming migration of {plan['old_entity']} to {plan['new_entity']}")
+                self.apply_migration_definitions(plan)
+                self.run_schema_migration(plan)
+            except Exception as e:
+                print(f"Error resuming migration {filename}: {e}")
+
+    def replace_entity(self, old_entity, new_entity, entity_data):
+        """Put an edited entity in place of the old one: a renamed entity keeps its position (and tab order)"""
+        entities = {}
+        for entity_name, data in self.entities.items():
+            entities[new_entity if entity_name == old_entity else entity_name] = data
+        entities[new_entity] = entity_data
+        self.entities = entities
+
+    def apply_migration_definitions(self, plan):
+        """Save the edited entity definition of a plan, if a crash happened before it was saved"""
+        old_entity, new_entity, new_fields = plan['old_entity'], plan['new_entity'], plan.get('new_fields')
+        if new_fields is None:
+            return
+        if self.entities.get(new_entity, {}).get('fields') == new_fields and (
+                old_entity == new_entity or old_entity not in self.entities):
+            return
+
+        self.replace_entity(old_entity, new_entity, {'fields': new_fields})
+        if old_entity != new_entity and self.get_record_mirror() is not None:
+            self.record_mirror.drop_entity(old_entity)
+        self.save_entities_to_xml()
+
+    def start_schema_migration(self, plan, new_fields):
+        """Switch an entity to its edited definition and migrate its record files in the background"""
+        old_entity, new_entity = plan['old_entity'], plan['new_entity']
+        # The plan is on disk before the definition changes, so a crash in between is resumed
+        self.save_migration_plan(plan)
+        self.migrating_entities = getattr(self, 'migrating_entities', set()) | {old_entity, new_entity}
+
+        previous_entities = dict(self.entities)
+        self.replace_entity(old_entity, new_entity, {'fields': new_fields, 'records': {}})
+        if self.get_record_mirror() is not None:
+            self.record_mirror.drop_entity(old_entity)
+        self.save_entities_to_xml()
+        self.reconcile_notebook(previous_entities)
+        if self.window:
+            self.window.show_all()
+
+        progress_dialog, progress_label = self.create_progress_dialog(f"Migrating {new_entity}")
+
+        def on_progress(done, total):
+            GLib.idle_add(progress_label.set_text, f"{done} of {total} records migrated")
+
+        def run_migration():
+            try:
+                report = self.run_schema_migration(plan, progress=on_progress)
+            except Exception as e:
+                report = {'entity': new_entity, 'failure': str(e)}
+            report['old_entity'] = old_entity
+            GLib.idle_add(self.on_migration_finished, report, progress_dialog)
+
+        threading.Thread(target=run_migration, daemon=True).start()
+
+    def on_migration_finished(self, report, progress_dialog):
+        """Load the migrated records on the main loop and report the result"""
+        progress_dialog.destroy()
+        self.migrating_entities -= {report['old_entity'], report['entity']}
+        if hasattr(self, 'file_monitors'):
+            self.update_file_monitors()
+        if 'failure' in report:
+            self.show_message(f"Migration failed, it will be resumed on the next start: {report['failure']}",
+                              Gtk.MessageType.ERROR)
+            return False
+
+        if report['entity'] in self.entities:
+            self.load_entity_data_from_files(report['entity'])
+            self.populate_entity_tab_data(report['entity'])
+        if report['messages']:
+            shown = "\n".join(report['messages'][:10])
+            self.show_message(f"Migrated {report['migrated']} records, {len(report['messages'])} problems:\n{shown}",
+                              Gtk.MessageType.WARNING)
+        return False
+
     def on_edit_entity(self, button):
         """Handle entity editing"""
         if not hasattr(self, 'management_treeview') or self.management_treeview is None:
@@ -765,39 +4055,35 @@ class EntityCRUDApp:
             if response == Gtk.ResponseType.OK:
                 new_entity_name, new_fields = dialog.get_data()
 
-                # Check if entity name changed
-                if old_entity_name != new_entity_name:
-                    # Rename directory
-                    old_dir = os.path.join(self.data_dir, old_entity_name)
-                    new_dir = os.path.join(self.data_dir, new_entity_name)
-                    if os.path.exists(old_dir) and not os.path.exists(new_dir):
-                        os.rename(old_dir, new_dir)
-
-                        # Rename all files in the directory
-                        if os.path.exists(new_dir):
-                            for filename in os.listdir(new_dir):
-                                if filename.startswith(f"{old_entity_name}-"):
-                                    new_filename = filename.replace(f"{old_entity_name}-", f"{new_entity_name}-", 1)
-                                    old_path = os.path.join(new_dir, filename)
-                                    new_path = os.path.join(new_dir, new_filename)
-                                    os.rename(old_path, new_path)
+                if new_entity_name != old_entity_name and new_entity_name in self.entities:
+                    self.show_message(f"Entity {new_entity_name} already exists", Gtk.MessageType.ERROR)
+                    dialog.destroy()
+                    return
+                try:
+                    plan = plan_schema_migration(old_entity_name, self.entities[old_entity_name]['fields'],
+                                                 new_entity_name, new_fields, dialog.get_field_renames())
+                except ValueError as e:
+                    self.show_message(str(e), Gtk.MessageType.ERROR)
+                    dialog.destroy()
+                    return
+
+                if migration_rewrites_files(plan):
+                    # Renames and field changes rewrite every record file: do it in the background
+                    dialog.destroy()
+                    self.start_schema_migration(plan, new_fields)
+                    return
 
                 # Update entity in memory
-                # Preserve existing records if fields are compatible
-                existing_records = self.entities[old_entity_name].get('records', {}) if old_entity_name in self.entities else {}
-
-                if old_entity_name != new_entity_name:
-                    del self.entities[old_entity_name]
-
-                self.entities[new_entity_name] = {
-                    'fields': new_fields,
-                    'records': existing_records  # Keep existing records
-                }
+                # Same name and field names: keep the records, their file versions and the filter indexes
+                previous_entities = dict(self.entities)
+                entity_data = dict(self.entities[old_entity_name])
+                entity_data['fields'] = new_fields
+                self.replace_entity(old_entity_name, new_entity_name, entity_data)
 
                 # Save to XML
                 self.save_entities_to_xml()
-                # Re-render UI tabs only
-                self.render_xml_data_state()
+                # Update the tabs of changed entities only
+                self.reconcile_notebook(previous_entities)
                 # Show the updated window
                 if self.window:
                     self.window.show_all()
@@ -806,6 +4092,109 @@ class EntityCRUDApp:
         else:
             self.show_message("Please select an entity to edit", Gtk.MessageType.WARNING)
 
+    def trash_path(self):
+        """Directory that deleted entity directories are moved to"""
+        return os.path.join(self.data_dir, RECORD_CACHE_DIR, TRASH_DIR)
+
+    def delete_entity(self, entity_name):
+        """Delete an entity without waiting for its files to be removed
+
+        The entity directory is renamed into the trash (atomic, so the
+        entity is never half deleted), then the definition is removed.
+        Returns the trash directory, or None when the entity had no data;
+        purge_trash() removes it.
+        """
+        trashed_dir = None
+        entity_dir = os.path.join(self.data_dir, entity_name)
+        if os.path.exists(entity_dir):
+            os.makedirs(self.trash_path(), exist_ok=True)
+            trashed_dir = os.path.join(self.trash_path(), f"{entity_name}.{uuid.uuid4().hex}")
+            os.rename(entity_dir, trashed_dir)
+            if self.durable_writes and hasattr(os, 'O_DIRECTORY'):
+                for directory in (self.data_dir, self.trash_path()):
+                    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+
+        # Remove entity from memory
+        del self.entities[entity_name]
+        if self.get_record_mirror() is not None:
+            self.record_mirror.drop_entity(entity_name)
+        try:
+            os.remove(self.record_cache_path(entity_name))
+        except FileNotFoundError:
+            pass
+
+        # Save to XML
+        self.save_entities_to_xml()
+        return trashed_dir
+
+    def purge_trash(self, progress=None):
+        """Remove deleted entity directories; progress(removed_files) reports the running total"""
+        trash_dir = self.trash_path()
+        if not os.path.isdir(trash_dir):
+            return 0
+        removed = 0
+        for name in sorted(os.listdir(trash_dir)):
+            done_before = removed
+            report = None if progress is None else (lambda count: progress(done_before + count))
+            try:
+                removed += remove_tree_with_progress(os.path.join(trash_dir, name), report)
+            except OSError as e:
+                print(f"Error removing deleted entity data {name}: {e}")
+        return removed
+
+    def start_trash_purge(self):
+        """Empty the trash on a worker thread, with a progress dialog when the window is open"""
+        if getattr(self, 'trash_purge_running', False):
+            # Entries trashed after the running purge listed the trash need another pass
+            self.trash_purge_again = True
+            return
+        self.trash_purge_running = True
+        self.trash_purge_again = False
+
+        progress_dialog = progress_label = None
+        if getattr(self, 'window', None) is not None:
+            progress_dialog, progress_label = self.create_progress_dialog("Removing deleted entity data")
+
+        def on_progress(removed):
+            if progress_label is not None:
+                GLib.idle_add(progress_label.set_text, f"{removed} files removed")
+
+        def run_purge():
+            removed = self.purge_trash(on_progress)
+            print(f"Removed {removed} files of deleted entities")
+            GLib.idle_add(self.on_trash_purge_finished, progress_dialog)
+
+        threading.Thread(target=run_purge, daemon=True).start()
+
+    def on_trash_purge_finished(self, progress_dialog):
+        """Close the purge progress dialog, and purge again if entities were deleted meanwhile"""
+        if progress_dialog is not None:
+            progress_dialog.destroy()
+        self.trash_purge_running = False
+        if self.trash_purge_again:
+            self.start_trash_purge()
+        return False
+
+    def recover_interrupted_deletions(self):
+        """Finish entity deletions interrupted between moving the data and saving the definitions"""
+        trash_dir = self.trash_path()
+        if not os.path.isdir(trash_dir) or not os.listdir(trash_dir):
+            return False
+        changed = False
+        for name in os.listdir(trash_dir):
+            entity_name = name.rsplit('.', 1)[0]
+            if entity_name in self.entities and not os.path.exists(os.path.join(self.data_dir, entity_name)):
+                print(f"Finishing interrupted deletion of entity {entity_name}")
+                del self.entities[entity_name]
+                changed = True
+        if changed:
+            self.save_entities_to_xml()
+        return True
+
     def on_delete_entity(self, button):
         """Handle entity deletion"""
         if not hasattr(self, 'management_treeview') or self.management_treeview is None:
@@ -827,36 +4216,32 @@ class EntityCRUDApp:
             response = dialog.run()
 
             if response == Gtk.ResponseType.YES:
-                # Delete entity directory
-                entity_dir = os.path.join(self.data_dir, entity_name)
-                if os.path.exists(entity_dir):
-                    shutil.rmtree(entity_dir)
-
-                # Remove entity from memory
-                del self.entities[entity_name]
-
-                # Save to XML
-                self.save_entities_to_xml()
-                # Re-render UI tabs only
-                self.render_xml_data_state()
+                # The entity disappears at once, its files are removed in the background
+                previous_entities = dict(self.entities)
+                trashed_dir = self.delete_entity(entity_name)
+                # Remove its tab only
+                self.reconcile_notebook(previous_entities)
                 # Show the updated window
                 if self.window:
                     self.window.show_all()
+                if trashed_dir is not None:
+                    self.start_trash_purge()
 
             dialog.destroy()
         else:
             self.show_message("Please select an entity to delete", Gtk.MessageType.WARNING)
 
     def on_refresh_all(self, button):
-        """Refresh all data - reload from XML and re-render UI"""
+        """Refresh all data - reload from XML and update the tabs of changed entities"""
+        previous_entities = dict(self.entities)
         self.load_xml_data()
-        self.render_xml_data_state()
+        self.reconcile_notebook(previous_entities)
         # Show the updated window
         if self.window:
             self.window.show_all()
 
     def save_record(self, entity_name, data):
-        """Save a record to XML file in luassg compatible format"""
+        """Save a record to XML file in luassg compatible format, returns its ID"""
         entity_dir = os.path.join(self.data_dir, entity_name)
         os.makedirs(entity_dir, exist_ok=True)
 
@@ -864,6 +4249,38 @@ class EntityCRUDApp:
         filename = f"{entity_name}-{record_id}.xml"
         filepath = os.path.join(entity_dir, filename)
 
+        self.write_record_file(filepath, self.build_record_xml(entity_name, record_id, data))
+        self.store_saved_record(entity_name, record_id, data)
+        return record_id
+
+    def save_records(self, entity_name, records):
+        """Save many (record_id, data) records, group-committing their fsyncs
+
+        Returns a report with the throughput in records per second.
+        """
+        start_time = time.perf_counter()
+        entity_dir = os.path.join(self.data_dir, entity_name)
+        os.makedirs(entity_dir, exist_ok=True)
+
+        saved = []
+        writer = self.get_durable_writer()
+        with writer.batch() if writer is not None else contextlib.nullcontext():
+            for record_id, data in records:
+                filepath = os.path.join(entity_dir, f"{entity_name}-{record_id}.xml")
+                self.write_record_file(filepath, self.build_record_xml(entity_name, record_id, data))
+                saved.append((record_id, data))
+
+        # Files are in place now, update memory
+        for record_id, data in saved:
+            self.store_saved_record(entity_name, record_id, data)
+
+        elapsed = time.perf_counter() - start_time
+        rate = len(saved) / elapsed if elapsed > 0 else 0.0
+        print(f"Saved {len(saved)} {entity_name} records in {elapsed:.3f}s ({rate:.0f} records/s)")
+        return {'records': len(saved), 'seconds': elapsed, 'records_per_second': rate}
+
+    def build_record_xml(self, entity_name, record_id, data):
+        """Serialize a record to luassg XML (bytes)"""
         # Create root element with entity name and id attribute (luassg format)
         # Example: <product id="firstProduct">
         root = ET.Element(entity_name)
@@ -878,15 +4295,43 @@ class EntityCRUDApp:
 
         # Format XML with indentation
         self.indent_xml(root)
-        tree = ET.ElementTree(root)
 
-        # Write with proper declaration
-        tree.write(filepath, encoding='utf-8', xml_declaration=True)
+        # Serialize with proper declaration
+        return ET.tostring(root, encoding='utf-8', xml_declaration=True)
+
+    def get_durable_writer(self):
+        """The group commit writer, or None when durable writes are disabled"""
+        if not self.durable_writes:
+            return None
+        writer = getattr(self, 'durable_writer', None)
+        if writer is None:
+            with self.durable_writer_lock:
+                if getattr(self, 'durable_writer', None) is None:
+                    self.durable_writer = GroupCommitWriter()
+                writer = self.durable_writer
+        return writer
+
+    def write_record_file(self, filepath, xml_bytes):
+        """Write a record file, atomically and durably unless durable writes are disabled"""
+        writer = self.get_durable_writer()
+        if writer is not None:
+            writer.write_file(filepath, xml_bytes)
+        else:
+            with open(filepath, 'wb') as f:
+                f.write(xml_bytes)
+
+    def store_saved_record(self, entity_name, record_id, data):
+        """Update memory (and the mirror) after a record file was written"""
+        self.remember_file_state(entity_name, record_id)
 
         # Update in-memory data
-        if 'records' not in self.entities[entity_name]:
-            self.entities[entity_name]['records'] = {}
-        self.entities[entity_name]['records'][record_id] = data
+        self.mirror_upsert(entity_name, record_id, data)
+        preview_limit = self.record_preview_limit()
+        if preview_limit is not None:
+            data = make_record_preview(data, preview_limit)
+        self.entity_records(entity_name)[record_id] = data
+        self.trigram_index_upsert(entity_name, record_id, data)
+        self.invalidate_filter_cache(entity_name)
 
     def delete_record(self, entity_name, record_id):
         """Delete a record file"""
@@ -895,21 +4340,372 @@ class EntityCRUDApp:
         filepath = os.path.join(entity_dir, filename)
 
         if os.path.exists(filepath):
-            os.remove(filepath)
+            writer = self.get_durable_writer()
+            if writer is not None:
+                writer.remove_file(filepath)
+            else:
+                os.remove(filepath)
+        self.remember_file_state(entity_name, record_id)
+        self.mirror_delete(entity_name, record_id)
+        self.trigram_index_delete(entity_name, record_id)
+        self.invalidate_filter_cache(entity_name)
 
         # Update in-memory data
         if 'records' in self.entities[entity_name] and record_id in self.entities[entity_name]['records']:
             del self.entities[entity_name]['records'][record_id]
 
+    def map_import_row(self, entity_name, row, column_map=None):
+        """Map a CSV/JSONL row to (record_id, data) for an entity
+
+        column_map maps source columns to field names ('id' for the record
+        ID); without it, columns named like the entity fields (and 'id'/'ID')
+        are used. A UUID is generated when the row has no ID, like save_record.
+        """
+        field_names = [field['name'] for field in self.entities[entity_name]['fields']]
+        if column_map is None:
+            column_map = {name: name for name in field_names}
+            column_map.update({'id': 'id', 'ID': 'id'})
+
+        data = {field_name: '' for field_name in field_names}
+        record_id = None
+        for column, value in row.items():
+            target = column_map.get(column)
+            if target is None:
+                continue
+            value = '' if value is None else str(value)
+            if target == 'id':
+                record_id = value.strip() or None
+            elif target in data:
+                data[target] = value
+
+        if record_id is None:
+            record_id = str(uuid.uuid4())
+        elif '/' in record_id or os.sep in record_id or record_id in ('.', '..'):
+            raise ValueError(f"Record ID '{record_id}' can't be used in a file name")
+
+        data['id'] = record_id
+        return record_id, data
+
+    def import_records(self, entity_name, source_path, column_map=None, file_format=None,
+                       workers=IMPORT_WORKERS, progress=None, apply_to_memory=True):
+        """Bulk import a CSV or JSONL file into an entity with a pool of writer threads
+
+        Rows are streamed and written in chunks of IMPORT_CHUNK_SIZE, each
+        chunk as one group commit, with at most two chunks per worker in
+        flight. progress(rows_done, error_count) is called as chunks finish.
+        With apply_to_memory the records and the tab are updated once at the
+        end; otherwise the caller passes the report to finish_import (used to
+        do that part on the GTK main loop).
+        Returns a report with the imported records, per-row errors and timing.
+        """
+        start_time = time.perf_counter()
+        entity_dir = os.path.join(self.data_dir, entity_name)
+        os.makedirs(entity_dir, exist_ok=True)
+
+        errors = []
+        errors_before_write = []
+        saved = []
+        rows_done = 0
+        in_flight = {}
+
+        def write_chunk(chunk):
+            written, failed = [], []
+            writer = self.get_durable_writer()
+            with writer.batch() if writer is not None else contextlib.nullcontext():
+                for row_number, record_id, data in chunk:
+                    try:
+                        filepath = os.path.join(entity_dir, f"{entity_name}-{record_id}.xml")
+                        self.write_record_file(filepath, self.build_record_xml(entity_name, record_id, data))
+                        written.append((record_id, data))
+                    except Exception as e:
+                        failed.append((row_number, str(e)))
+            return len(chunk), written, failed
+
+        def collect(done_futures):
+            nonlocal rows_done
+            for future in done_futures:
+                try:
+                    chunk_rows, written, failed = future.result()
+                except Exception as e:
+                    # The whole group commit failed
+                    chunk_rows, written, failed = in_flight[future], [], [(None, str(e))]
+                rows_done += chunk_rows
+                saved.extend(written)
+                errors.extend(failed)
+                del in_flight[future]
+            if progress is not None:
+                progress(rows_done + len(errors_before_write), len(errors) + len(errors_before_write))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            chunk = []
+            for row_number, row, error in iter_import_rows(source_path, file_format):
+                if error is None:
+                    try:
+                        record_id, data = self.map_import_row(entity_name, row, column_map)
+                        chunk.append((row_number, record_id, data))
+                    except Exception as e:
+                        error = str(e)
+                if error is not None:
+                    errors_before_write.append((row_number, error))
+
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    if len(in_flight) >= workers * 2:
+                        collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+                    in_flight[executor.submit(write_chunk, chunk)] = len(chunk)
+                    chunk = []
+            if chunk:
+                in_flight[executor.submit(write_chunk, chunk)] = len(chunk)
+            while in_flight:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+
+        errors = sorted(errors_before_write + errors, key=lambda error: error[0] or 0)
+        elapsed = time.perf_counter() - start_time
+        report = {
+            'entity': entity_name,
+            'imported': len(saved),
+            'errors': errors,
+            'seconds': elapsed,
+            'records_per_second': len(saved) / elapsed if elapsed > 0 else 0.0,
+            'saved': saved
+        }
+        print(f"Imported {len(saved)} {entity_name} records from {source_path} in {elapsed:.3f}s "
+              f"({report['records_per_second']:.0f} records/s, {len(errors)} errors)")
+        if apply_to_memory:
+            self.finish_import(report)
+        return report
+
+    def finish_import(self, report):
+        """Put imported records into memory and refresh the entity tab once"""
+        entity_name = report['entity']
+        for record_id, data in report.pop('saved'):
+            self.store_saved_record(entity_name, record_id, data)
+        self.populate_entity_tab_data(entity_name)
+
+    def on_import_records(self, menu_item):
+        """Handle bulk import: pick a CSV/JSONL file and a target entity, import in the background"""
+        if not self.entities:
+            self.show_message("Create an entity first", Gtk.MessageType.WARNING)
+            return
+
+        dialog = Gtk.FileChooserDialog(title="Import CSV/JSONL", transient_for=self.window,
+                                       action=Gtk.FileChooserAction.OPEN)
+        dialog.add_buttons(Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL,
+                           Gtk.STOCK_OPEN, Gtk.ResponseType.OK)
+        file_filter = Gtk.FileFilter()
+        file_filter.set_name("CSV and JSONL files")
+        for pattern in ("*.csv", "*.jsonl", "*.ndjson"):
+            file_filter.add_pattern(pattern)
+        dialog.add_filter(file_filter)
+
+        # Target entity selector
+        entity_box = Gtk.Box(spacing=10)
+        entity_box.pack_start(Gtk.Label(label="Import into entity:"), False, False, 0)
+        entity_combo = Gtk.ComboBoxText()
+        for entity_name in self.entities.keys():
+            entity_combo.append_text(entity_name)
+        entity_combo.set_active(0)
+        entity_box.pack_start(entity_combo, False, False, 0)
+        entity_box.show_all()
+        dialog.set_extra_widget(entity_box)
+
+        response = dialog.run()
+        source_path = dialog.get_filename()
+        entity_name = entity_combo.get_active_text()
+        dialog.destroy()
+        if response != Gtk.ResponseType.OK or not source_path or not entity_name:
+            return
+        self.start_import(entity_name, source_path)
+
+    def start_import(self, entity_name, source_path):
+        """Import a CSV/JSONL file into an entity on a worker thread, with a progress dialog"""
+        progress_dialog, progress_label = self.create_progress_dialog(f"Importing into {entity_name}")
+        # The import writes every file itself and refreshes the tab once at the end: the watcher stays out
+        self.importing_entities = getattr(self, 'importing_entities', set()) | {entity_name}
+
+        def on_progress(rows_done, error_count):
+            GLib.idle_add(progress_label.set_text, f"{rows_done} rows processed, {error_count} errors")
+
+        def run_import():
+            try:
+                report = self.import_records(entity_name, source_path, progress=on_progress, apply_to_memory=False)
+            except Exception as e:
+                report = {'entity': entity_name, 'failure': str(e)}
+            GLib.idle_add(self.on_import_finished, report, progress_dialog)
+
+        threading.Thread(target=run_import, daemon=True).start()
+
+    def on_import_finished(self, report, progress_dialog):
+        """Apply a finished background import on the main loop and report the result"""
+        progress_dialog.destroy()
+        self.importing_entities.discard(report['entity'])
+        if 'failure' in report:
+            self.show_message(f"Import failed: {report['failure']}", Gtk.MessageType.ERROR)
+            return False
+
+        if report['entity'] in self.entities:
+            self.finish_import(report)
+
+        message = f"Imported {report['imported']} records ({report['records_per_second']:.0f} records/s)"
+        if report['errors']:
+            shown = "\n".join(f"Row {row_number}: {error}" for row_number, error in report['errors'][:10])
+            message += f"\n{len(report['errors'])} rows failed:\n{shown}"
+        self.show_message(message, Gtk.MessageType.WARNING if report['errors'] else Gtk.MessageType.INFO)
+        return False
+
+    def iter_export_records(self, entity_name):
+        """Yield (record_id, record_data) of an entity with full field values
+
+        Loaded records come from memory, lazily loaded ones have their bodies
+        read from the file; entities whose data isn't loaded are streamed
+        straight from their record files, one at a time.
+        """
+        records = self.entities[entity_name].get('records')
+        if records is not None:
+            # Snapshot the IDs only: each record's dict is built when it is written
+            for record_id in list(records):
+                record_data = records.get(record_id)
+                if record_data is not None:
+                    yield record_id, self.full_record_data(entity_name, record_id, record_data)
+            return
+
+        entity_dir = os.path.join(self.data_dir, entity_name)
+        if not os.path.isdir(entity_dir):
+            return
+        field_names = [field['name'] for field in self.entities[entity_name]['fields']]
+        for filename, file_record_id, _ in list_entity_record_files(entity_dir, entity_name):
+            record_id, record_data, messages = parse_record_file(
+                os.path.join(entity_dir, filename), entity_name, field_names, file_record_id)
+            for message in messages:
+                print(message)
+            if record_id is not None:
+                yield record_id, record_data
+
+    def export_records(self, dest_path, entity_names=None, fields=None, file_format=None,
+                       filter_field=None, filter_text=''):
+        """Stream records of one or more entities to a JSONL or CSV file
+
+        Memory use doesn't grow with the number of records. fields projects
+        the output columns (the record ID is always included, as 'id'); the
+        optional filter has the semantics of the tab filter: case-insensitive
+        substring match on filter_field ("ID" or a field name).
+        Returns a report with the number of exported records and the timing.
+        """
+        start_time = time.perf_counter()
+        if entity_names is None:
+            entity_names = list(self.entities.keys())
+        if file_format is None:
+            file_format = 'csv' if dest_path.lower().endswith('.csv') else 'jsonl'
+        multiple = len(entity_names) > 1
+
+        # Output columns: projection, or the union of the entities' fields
+        if fields is None:
+            fields = []
+            for entity_name in entity_names:
+                for field in self.entities[entity_name]['fields']:
+                    if field['name'] not in fields:
+                        fields.append(field['name'])
+        columns = (['entity'] if multiple else []) + ['id'] + [name for name in fields if name != 'id']
+        filter_text = (filter_text or '').strip().lower()
+
+        exported = 0
+        with open(dest_path, 'w', newline='', encoding='utf-8') as f:
+            csv_writer = csv.writer(f) if file_format == 'csv' else None
+            if csv_writer is not None:
+                csv_writer.writerow(columns)
+
+            for entity_name in entity_names:
+                entity_fields = [field['name'] for field in self.entities[entity_name]['fields']]
+                filter_column = None
+                if filter_text and (filter_field == "ID" or filter_field in entity_fields):
+                    filter_column = 'id' if filter_field == "ID" else filter_field
+
+                for record_id, record_data in self.iter_export_records(entity_name):
+                    if filter_column is not None:
+                        value = record_id if filter_column == 'id' else record_data.get(filter_column)
+                        if not contains_ignore_case(value, filter_text):
+                            continue
+
+                    row = {'entity': entity_name, 'id': record_id}
+                    for name in fields:
+                        if name != 'id':
+                            row[name] = record_data.get(name, '') or ''
+                    if csv_writer is not None:
+                        csv_writer.writerow([row[name] for name in columns])
+                    else:
+                        f.write(json.dumps({name: row[name] for name in columns}, ensure_ascii=False) + "\n")
+                    exported += 1
+
+        elapsed = time.perf_counter() - start_time
+        print(f"Exported {exported} records from {len(entity_names)} entities to {dest_path} in {elapsed:.3f}s")
+        return {'exported': exported, 'seconds': elapsed}
+
+    def on_export_records(self, menu_item):
+        """Handle bulk export of one entity or all entities to CSV/JSONL"""
+        dialog = Gtk.FileChooserDialog(title="Export CSV/JSONL", transient_for=self.window,
+                                       action=Gtk.FileChooserAction.SAVE)
+        dialog.add_buttons(Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL,
+                           Gtk.STOCK_SAVE, Gtk.ResponseType.OK)
+        dialog.set_do_overwrite_confirmation(True)
+        dialog.set_current_name("export.jsonl")
+
+        entity_box = Gtk.Box(spacing=10)
+        entity_box.pack_start(Gtk.Label(label="Export entity:"), False, False, 0)
+        entity_combo = Gtk.ComboBoxText()
+        entity_combo.append_text("All entities")
+        for entity_name in self.entities.keys():
+            entity_combo.append_text(entity_name)
+        entity_combo.set_active(0)
+        entity_box.pack_start(entity_combo, False, False, 0)
+        entity_box.show_all()
+        dialog.set_extra_widget(entity_box)
+
+        response = dialog.run()
+        dest_path = dialog.get_filename()
+        selected = entity_combo.get_active_text()
+        dialog.destroy()
+        if response != Gtk.ResponseType.OK or not dest_path:
+            return
+
+        entity_names = None if entity_combo.get_active() == 0 else [selected]
+        try:
+            report = self.export_records(dest_path, entity_names)
+        except Exception as e:
+            self.show_message(f"Export failed: {str(e)}", Gtk.MessageType.ERROR)
+            return
+        self.show_message(f"Exported {report['exported']} records to {dest_path}")
+
+    def create_progress_dialog(self, title):
+        """Show a non-modal dialog with a pulsing progress bar; returns (dialog, status_label)"""
+        dialog = Gtk.Dialog(title=title, transient_for=self.window, flags=0)
+        dialog.set_default_size(400, -1)
+        area = dialog.get_content_area()
+        area.set_spacing(10)
+
+        progress_bar = Gtk.ProgressBar()
+        area.pack_start(progress_bar, False, False, 0)
+        status_label = Gtk.Label(label="Starting...")
+        area.pack_start(status_label, False, False, 0)
+        dialog.show_all()
+
+        def pulse():
+            if not dialog.get_visible():
+                return False
+            progress_bar.pulse()
+            return True
+
+        GLib.timeout_add(100, pulse)
+        return dialog, status_label
+
     def get_record_data(self, entity_name, record_id):
         """Get data for a specific record from memory"""
         if entity_name not in self.entities:
             return None
 
-        if 'records' in self.entities[entity_name] and record_id in self.entities[entity_name]['records']:
-            return self.entities[entity_name]['records'][record_id]
+        in_memory = self.entities[entity_name].get('records', {}).get(record_id)
+        if in_memory is not None and not isinstance(in_memory, PartialRecord):
+            return in_memory
 
-        # Fallback to loading from file
+        # Fallback to loading from file, also used to fetch full values of lazily loaded records
         entity_dir = os.path.join(self.data_dir, entity_name)
         filename = f"{entity_name}-{record_id}.xml"
         filepath = os.path.join(entity_dir, filename)
@@ -928,10 +4724,12 @@ class EntityCRUDApp:
                     field_elem = root.find(field_name)
                     data[field_name] = field_elem.text if field_elem is not None else ''
 
-                # Store in memory for future use
-                if 'records' not in self.entities[entity_name]:
-                    self.entities[entity_name]['records'] = {}
-                self.entities[entity_name]['records'][record_id] = data
+                # Store in memory for future use (lazily loaded records keep their preview)
+                if in_memory is None:
+                    preview_limit = self.record_preview_limit()
+                    self.invalidate_filter_cache(entity_name)
+                    self.entity_records(entity_name)[record_id] = (
+                        data if preview_limit is None else make_record_preview(data, preview_limit))
 
                 return data
             except Exception as e:
@@ -1056,6 +4854,8 @@ class EntityDialog(Gtk.Dialog):
         self.parent = parent
         self.entity_name = entity_name
         self.fields = []
+        # Original field name of each row loaded from the entity, to detect renames
+        self.original_names = {}
 
         self.set_default_size(500, 400)
         self.add_buttons(
@@ -1143,6 +4943,7 @@ class EntityDialog(Gtk.Dialog):
 
         # Remove from fields list
         self.fields = [f for f in self.fields if f[0] != field_box]
+        self.original_names.pop(field_box, None)
 
         self.show_all()
 
@@ -1161,6 +4962,7 @@ class EntityDialog(Gtk.Dialog):
                 self.on_add_field(None)
                 field_box, name_entry, type_combo = self.fields[-1]
                 name_entry.set_text(field['name'])
+                self.original_names[field_box] = field['name']
 
                 # Set type
                 if field['type'] == 'multiline':
@@ -1174,20 +4976,61 @@ class EntityDialog(Gtk.Dialog):
         entity_name = self.name_entry.get_text().strip()
         fields = []
 
+        original_fields = {}
+        if self.entity_name in self.parent.entities:
+            original_fields = {field['name']: field for field in self.parent.entities[self.entity_name]['fields']}
+
         for field_box, name_entry, type_combo in self.fields:
             field_name = name_entry.get_text().strip()
             if field_name:
                 field_type = type_combo.get_active_text()
-                fields.append({
+                field = {
                     'name': field_name,
                     'type': field_type
-                })
+                }
+                # Keep the cardinality hint of edited fields
+                original_field = original_fields.get(self.original_names.get(field_box))
+                if original_field is not None and original_field.get('cardinality'):
+                    field['cardinality'] = original_field['cardinality']
+                fields.append(field)
 
         return entity_name, fields
 
+    def get_field_renames(self):
+        """Map original field names to the names they were edited to"""
+        renames = {}
+        for field_box, name_entry, _ in self.fields:
+            original_name = self.original_names.get(field_box)
+            field_name = name_entry.get_text().strip()
+            if original_name and field_name and field_name != original_name:
+                renames[original_name] = field_name
+        return renames
+
 
 def main():
-    app = EntityCRUDApp()
+    parser = argparse.ArgumentParser(description="Entity CRUD Application")
+    parser.add_argument('--export', metavar='OUTPUT',
+                        help="export records to a .jsonl or .csv file without opening the window")
+    parser.add_argument('--entity', action='append',
+                        help="entity to export (repeatable, default: all)")
+    parser.add_argument('--fields', help="comma separated fields to export")
+    parser.add_argument('--filter-field', default="ID", help="field the --filter text applies to")
+    parser.add_argument('--filter', default='', help="case-insensitive substring filter")
+    parser.add_argument('--async-startup', action='store_true',
+                        help="show the window right away and load records in the background")
+    args = parser.parse_args()
+
+    if args.export:
+        app = EntityCRUDApp(headless=True)
+        unknown = [name for name in args.entity or [] if name not in app.entities]
+        if unknown:
+            parser.error(f"unknown entity: {', '.join(unknown)}")
+        fields = args.fields.split(',') if args.fields else None
+        app.export_records(args.export, args.entity, fields=fields,
+                           filter_field=args.filter_field, filter_text=args.filter)
+        return
+
+    app = EntityCRUDApp(async_startup=True if args.async_startup else None)
     Gtk.main()
 
 
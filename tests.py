@@ -4,6 +4,7 @@ import xml.etree.ElementTree as ET
 import os
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from app import EntityCRUDApp
 
 
@@ -516,5 +517,1306 @@ def test_load_luassg_format(temp_app):
     assert record_data['image_src'] == 'https://upload.wikimedia.org/wikipedia/commons/9/9b/Photo_of_a_kitten.jpg'
 
 
+def write_luassg_record(data_dir, entity_name, record_id, fields, root_tag=None):
+    """Helper: write a record file in luassg format and return its path"""
+    entity_dir = os.path.join(data_dir, entity_name)
+    os.makedirs(entity_dir, exist_ok=True)
+
+    root = ET.Element(root_tag or entity_name)
+    root.set('id', record_id)
+    for field_name, value in fields.items():
+        ET.SubElement(root, field_name).text = value
+
+    filepath = os.path.join(entity_dir, f"{entity_name}-{record_id}.xml")
+    ET.ElementTree(root).write(filepath, encoding='utf-8', xml_declaration=True)
+    return filepath
+
+
+class FakeListStore:
+    """Helper: stand-in for Gtk.ListStore (and the filter model over it) with integer iters"""
+    def __init__(self):
+        self.rows = {}
+        self.next_iter = 0
+
+    def clear(self):
+        self.rows = {}
+
+    def append(self, row):
+        self.next_iter += 1
+        self.rows[self.next_iter] = row
+        return self.next_iter
+
+    def set_row(self, treeiter, row):
+        self.rows[treeiter] = row
+
+    def remove(self, treeiter):
+        del self.rows[treeiter]
+
+    def iter_n_children(self, parent):
+        return len(self.rows)
+
+
+class FakeWidget:
+    """Helper: stand-in for a TreeView, Label, Entry, ComboBoxText or Spinner of an entity tab"""
+    def __init__(self, model=None, text=''):
+        self.model = model
+        self.text = text
+        self.items = []
+        self.spinning = False
+
+    def get_model(self):
+        return self.model
+
+    def set_model(self, model):
+        self.model = model
+
+    def set_text(self, text):
+        self.text = text
+
+    def get_text(self):
+        return self.text
+
+    def get_active_text(self):
+        return self.text
+
+    def append_text(self, text):
+        self.items.append(text)
+
+    def remove(self, position):
+        del self.items[position]
+
+    def start(self):
+        self.spinning = True
+
+    def stop(self):
+        self.spinning = False
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    """Helper: thread pool standing in for ProcessPoolExecutor, remembering the mp_context of each pool"""
+    contexts = []
+
+    def __init__(self, max_workers, mp_context=None):
+        self.contexts.append(mp_context)
+        super().__init__(max_workers)
+
+
+class FakeNotebook:
+    """Helper: stand-in for Gtk.Notebook tracking its pages and the selected one"""
+    def __init__(self):
+        self.pages = []
+        self.current = -1
+
+    def insert_page(self, widget, label, position):
+        if position == -1:
+            position = len(self.pages)
+        self.pages.insert(position, widget)
+        if self.current == -1:
+            self.current = position
+        elif position <= self.current:
+            self.current += 1
+
+    def remove_page(self, position):
+        del self.pages[position]
+        if position < self.current:
+            self.current -= 1
+
+    def reorder_child(self, widget, position):
+        self.pages.remove(widget)
+        self.pages.insert(position, widget)
+
+    def page_num(self, widget):
+        return next((i for i, page in enumerate(self.pages) if page is widget), -1)
+
+    def get_current_page(self):
+        return self.current
+
+    def set_current_page(self, position):
+        self.current = position
+
+    def get_n_pages(self):
+        return len(self.pages)
+
+
+def test_parallel_load_matches_sequential(temp_app, capsys):
+    """Test that the process pool loader produces the same records and warnings"""
+    for i in range(30):
+        write_luassg_record(temp_app.data_dir, 'posts', f'post-{i}', {'title': f'Title {i}', 'message': f'Body {i}'})
+    write_luassg_record(temp_app.data_dir, 'posts', 'wrong-root', {'title': 'x'}, root_tag='news')
+
+    capsys.readouterr()
+    temp_app.load_all_entity_data(parallel=False)
+    sequential_output = capsys.readouterr().out
+    sequential_records = {name: dict(data['records']) for name, data in temp_app.entities.items()}
+
+    report = temp_app.load_all_entity_data(workers=2, parallel=True)
+    parallel_output = capsys.readouterr().out
+    parallel_records = {name: dict(data['records']) for name, data in temp_app.entities.items()}
+
+    assert parallel_records == sequential_records
+    assert list(parallel_records['posts']) == list(sequential_records['posts'])
+    assert len(parallel_records['posts']) == 30
+
+    # Same warnings, only the timing line differs
+    assert sequential_output.splitlines()[:-1] == parallel_output.splitlines()[:-1]
+    assert "Root element 'news' doesn't match" in parallel_output
+    assert report['mode'] == 'parallel, 2 workers'
+    assert report['records'] == 30
+
+
+def test_record_cache_serves_unchanged_files(temp_app, monkeypatch):
+    """Test that unchanged record files are loaded from the cache without parsing"""
+    import app
+
+    paths = [write_luassg_record(temp_app.data_dir, 'quotes', f'q{i}', {'phrase': f'Phrase {i}', 'author': 'A'})
+             for i in range(5)]
+    # Backdate files so they are old enough to be cached
+    for path in paths:
+        os.utime(path, (1_000_000_000, 1_000_000_000))
+
+    temp_app.load_entity_data_from_files('quotes')
+    assert os.path.exists(temp_app.record_cache_path('quotes'))
+    expected = dict(temp_app.entities['quotes']['records'])
+
+    parsed_files = []
+    original_parse = app.parse_record_file
+
+    def counting_parse(filepath, *args, **kwargs):
+        parsed_files.append(os.path.basename(filepath))
+        return original_parse(filepath, *args, **kwargs)
+
+    monkeypatch.setattr(app, 'parse_record_file', counting_parse)
+
+    temp_app.load_entity_data_from_files('quotes')
+    assert parsed_files == []
+    assert dict(temp_app.entities['quotes']['records']) == expected
+
+    # A modified file is re-parsed, the others still come from the cache
+    write_luassg_record(temp_app.data_dir, 'quotes', 'q0', {'phrase': 'Changed', 'author': 'B'})
+    temp_app.load_entity_data_from_files('quotes')
+    assert parsed_files == ['quotes-q0.xml']
+    assert temp_app.entities['quotes']['records']['q0']['phrase'] == 'Changed'
+
+    # Changing the field list invalidates the whole cache
+    parsed_files.clear()
+    temp_app.entities['quotes']['fields'].append({'name': 'source', 'type': 'oneline'})
+    temp_app.load_entity_data_from_files('quotes')
+    assert sorted(parsed_files) == sorted(os.path.basename(path) for path in paths)
+    assert temp_app.entities['quotes']['records']['q1']['source'] == ''
+
+
+def test_incremental_refresh_reparses_only_changed_files(temp_app, monkeypatch):
+    """Test that an incremental refresh only parses added and modified files"""
+    import app
+
+    for i in range(4):
+        write_luassg_record(temp_app.data_dir, 'posts', f'p{i}', {'title': f'Title {i}', 'message': 'Body'})
+    temp_app.load_entity_data_from_files('posts')
+
+    parsed_files = []
+    original_parse = app.parse_record_file
+
+    def counting_parse(filepath, *args, **kwargs):
+        parsed_files.append(os.path.basename(filepath))
+        return original_parse(filepath, *args, **kwargs)
+
+    monkeypatch.setattr(app, 'parse_record_file', counting_parse)
+
+    # Nothing changed on disk
+    temp_app.refresh_entity_incremental('posts')
+    assert parsed_files == []
+
+    modified_path = write_luassg_record(temp_app.data_dir, 'posts', 'p1', {'title': 'Edited title', 'message': 'Longer body'})
+    os.utime(modified_path, ns=(0, os.stat(modified_path).st_mtime_ns + 1_000_000))
+    write_luassg_record(temp_app.data_dir, 'posts', 'p9', {'title': 'New', 'message': 'Body'})
+    os.remove(os.path.join(temp_app.data_dir, 'posts', 'posts-p2.xml'))
+
+    temp_app.refresh_entity_incremental('posts')
+
+    assert sorted(parsed_files) == ['posts-p1.xml', 'posts-p9.xml']
+    records = temp_app.entities['posts']['records']
+    assert sorted(records) == ['p0', 'p1', 'p3', 'p9']
+    assert records['p1']['title'] == 'Edited title'
+    assert records['p9']['title'] == 'New'
+
+    # Files written by the app itself are not re-read
+    parsed_files.clear()
+    temp_app.save_record('posts', {'id': 'p3', 'title': 'Saved', 'message': 'Body'})
+    temp_app.refresh_entity_incremental('posts')
+    assert parsed_files == []
+    assert records['p3']['title'] == 'Saved'
+
+
+def test_file_watcher_batches_external_changes(temp_app, monkeypatch):
+    """Test that queued file events are re-parsed off the main thread and applied in one batch"""
+    import app
+
+    for i in range(3):
+        write_luassg_record(temp_app.data_dir, 'quotes', f'q{i}', {'phrase': f'Phrase {i}', 'author': 'A'})
+    temp_app.load_entity_data_from_files('quotes')
+
+    # Run the main-loop callback right away
+    monkeypatch.setattr(app.GLib, 'idle_add', lambda callback, *args: callback(*args))
+
+    temp_app.init_file_watch_state()
+    write_luassg_record(temp_app.data_dir, 'quotes', 'q3', {'phrase': 'Added outside', 'author': 'B'})
+    os.remove(os.path.join(temp_app.data_dir, 'quotes', 'quotes-q0.xml'))
+    temp_app.pending_file_changes = {'quotes': {'quotes-q3.xml', 'quotes-q0.xml', 'notes.txt.xml'}}
+
+    temp_app.flush_file_changes()
+    worker = temp_app.file_change_worker
+    if worker is not None:
+        worker.join(timeout=5)
+
+    records = temp_app.entities['quotes']['records']
+    assert sorted(records) == ['q1', 'q2', 'q3']
+    assert records['q3']['phrase'] == 'Added outside'
+    assert 'quotes-q0.xml' not in temp_app.entities['quotes']['file_state']
+    assert temp_app.pending_file_changes == {}
+
+
+def test_lazy_field_loading_keeps_previews(temp_app):
+    """Test that lazy mode keeps short previews in memory and reads full bodies on demand"""
+    longread = 'Lorem ipsum dolor sit amet. ' * 500
+    write_luassg_record(temp_app.data_dir, 'news', 'n1', {'caption': 'Short caption', 'longread': longread})
+
+    temp_app.lazy_fields = True
+    temp_app.field_preview_length = 50
+    temp_app.load_entity_data_from_files('news')
+
+    in_memory = temp_app.entities['news']['records']['n1']
+    assert in_memory['caption'] == 'Short caption'
+    assert in_memory['longread'] == longread[:50]
+
+    full = temp_app.get_record_data('news', 'n1')
+    assert full['longread'] == longread
+    assert full['caption'] == 'Short caption'
+    # The full body is not kept resident
+    assert temp_app.entities['news']['records']['n1']['longread'] == longread[:50]
+
+    # Saving keeps the preview in memory and the full value on disk
+    temp_app.save_record('news', {'id': 'n1', 'caption': 'Edited', 'longread': longread + 'tail'})
+    assert temp_app.entities['news']['records']['n1']['longread'] == longread[:50]
+    assert temp_app.get_record_data('news', 'n1')['longread'] == longread + 'tail'
+
+
+def test_streaming_reader_matches_tree_parser(temp_app, monkeypatch):
+    """Test that the iterparse reader extracts the same records and warnings as ET.parse"""
+    import app
+
+    entity_dir = os.path.join(temp_app.data_dir, 'news')
+    write_luassg_record(temp_app.data_dir, 'news', 'n1', {'caption': 'Caption', 'longread': 'Body ' * 1000})
+    write_luassg_record(temp_app.data_dir, 'news', 'n2', {'caption': 'Wrong root'}, root_tag='posts')
+    with open(os.path.join(entity_dir, 'news-n3.xml'), 'w') as f:
+        f.write('<news><extra><caption>nested</caption></extra><caption>Top</caption></news>')
+
+    field_names = ['caption', 'longread']
+    files = [('news-n1.xml', 'n1'), ('news-n2.xml', 'n2'), ('news-n3.xml', 'n3')]
+    tree_results = [app.parse_record_file(os.path.join(entity_dir, name), 'news', field_names, file_id)
+                    for name, file_id in files]
+
+    monkeypatch.setattr(app, 'STREAMING_PARSE_THRESHOLD', 0)
+    stream_results = [app.parse_record_file(os.path.join(entity_dir, name), 'news', field_names, file_id)
+                      for name, file_id in files]
+
+    assert stream_results == tree_results
+    assert stream_results[1][0] is None
+    assert "Root element 'posts' doesn't match" in stream_results[1][2][0]
+    # No id attribute: filename ID is used, nested elements are not fields
+    assert stream_results[2][1] == {'id': 'n3', 'caption': 'Top', 'longread': ''}
+    assert 'No id attribute' in stream_results[2][2][0]
+
+    # Reading stops once all declared fields were seen, trailing content is never parsed
+    with open(os.path.join(entity_dir, 'news-n4.xml'), 'w') as f:
+        f.write('<news id="n4"><caption>C</caption><longread>L</longread><broken>')
+    record_id, record_data, messages = app.parse_record_file(
+        os.path.join(entity_dir, 'news-n4.xml'), 'news', field_names, 'n4')
+    assert record_data == {'id': 'n4', 'caption': 'C', 'longread': 'L'}
+    assert messages == []
+
+
+def test_sqlite_mirror_filter_sort_and_write_through(temp_app):
+    """Test the SQLite mirror: rebuild from XML, substring filter, sorting and save/delete sync"""
+    write_luassg_record(temp_app.data_dir, 'quotes', 'q1', {'phrase': 'To be or not to be', 'author': 'Shakespeare'})
+    write_luassg_record(temp_app.data_dir, 'quotes', 'q2', {'phrase': 'I think, therefore I am', 'author': 'descartes'})
+    write_luassg_record(temp_app.data_dir, 'quotes', 'q3', {'phrase': 'Be yourself', 'author': 'Wilde'})
+
+    temp_app.use_sqlite_mirror = True
+    temp_app.load_entity_data_from_files('quotes')
+    mirror = temp_app.get_record_mirror()
+
+    assert sorted(mirror.query_ids('quotes', 'phrase', 'be')) == ['q1', 'q3']
+    assert mirror.query_ids('quotes', 'phrase', 'THEREFORE') == ['q2']
+    assert mirror.query_ids('quotes', 'ID', 'q3') == ['q3']
+    assert mirror.count('quotes', 'author', 'e') == 3
+    assert temp_app.sorted_record_ids('quotes', 'author') == ['q2', 'q1', 'q3']
+    assert temp_app.sorted_record_ids('quotes', 'author', descending=True) == ['q3', 'q1', 'q2']
+
+    temp_app.save_record('quotes', {'id': 'q4', 'phrase': 'Stay hungry', 'author': 'Jobs'})
+    temp_app.save_record('quotes', {'id': 'q1', 'phrase': 'Changed phrase', 'author': 'Shakespeare'})
+    temp_app.delete_record('quotes', 'q3')
+    assert mirror.query_ids('quotes', 'phrase', 'hungry') == ['q4']
+    assert mirror.query_ids('quotes', 'phrase', 'be') == []
+    assert mirror.count('quotes') == 3
+
+    # A closed mirror stays valid, a file changed behind its back makes it stale
+    temp_app.close_record_mirror()
+    temp_app.load_entity_data_from_files('quotes')
+    assert temp_app.get_record_mirror().query_ids('quotes', 'phrase', 'hungry') == ['q4']
+    temp_app.close_record_mirror()
+
+    write_luassg_record(temp_app.data_dir, 'quotes', 'q5', {'phrase': 'Written elsewhere', 'author': 'X'})
+    temp_app.load_entity_data_from_files('quotes')
+    assert temp_app.get_record_mirror().query_ids('quotes', 'phrase', 'elsewhere') == ['q5']
+    temp_app.close_record_mirror()
+
+
+def test_group_commit_writer_batches_fsyncs(temp_app):
+    """Test durable writes: atomic replace, group commit across threads and bulk saves"""
+    import threading
+    from app import GroupCommitWriter
+
+    target_dir = os.path.join(temp_app.data_dir, 'posts')
+    os.makedirs(target_dir, exist_ok=True)
+    writer = GroupCommitWriter(commit_window=0.01)
+
+    def write_many(thread_index):
+        for i in range(10):
+            writer.write_file(os.path.join(target_dir, f'posts-t{thread_index}-{i}.xml'), b'<posts/>')
+
+    threads = [threading.Thread(target=write_many, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert writer.stats['operations'] == 40
+    assert writer.stats['commits'] < 40
+    # Only final files, no temporary leftovers
+    assert sorted(os.listdir(target_dir)) == sorted(f'posts-t{t}-{i}.xml' for t in range(4) for i in range(10))
+
+    # Bulk save goes through a single-thread batch
+    report = temp_app.save_records('quotes', [(f'b{i}', {'phrase': f'Phrase {i}', 'author': 'A'}) for i in range(50)])
+    assert report['records'] == 50
+    assert report['records_per_second'] > 0
+    assert temp_app.get_durable_writer().stats['commits'] == 1
+    assert len(os.listdir(os.path.join(temp_app.data_dir, 'quotes'))) == 50
+    assert temp_app.entities['quotes']['records']['b7']['phrase'] == 'Phrase 7'
+
+    temp_app.delete_record('quotes', 'b7')
+    assert not os.path.exists(os.path.join(temp_app.data_dir, 'quotes', 'quotes-b7.xml'))
+
+
+def test_durable_writer_is_shared_between_threads(temp_app, monkeypatch):
+    """Test that threads asking for the writer at the same time get a single group commit writer"""
+    import app
+    import threading
+    import time
+
+    created = []
+
+    class SlowWriter(app.GroupCommitWriter):
+        def __init__(self):
+            time.sleep(0.01)
+            super().__init__()
+            created.append(self)
+
+    monkeypatch.setattr(app, 'GroupCommitWriter', SlowWriter)
+    writers = []
+    threads = [threading.Thread(target=lambda: writers.append(temp_app.get_durable_writer())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1 and all(writer is created[0] for writer in writers)
+
+
+def test_bulk_import_csv_and_jsonl(temp_app, tmp_path):
+    """Test streaming bulk import with column mapping, generated IDs and per-row errors"""
+    csv_path = tmp_path / 'quotes.csv'
+    csv_path.write_text('id,phrase,author,ignored\nq1,To be,Shakespeare,x\n,Generated id,Anon,y\nbad/id,Broken,Z,z\n',
+                        encoding='utf-8')
+    progress_calls = []
+    report = temp_app.import_records('quotes', str(csv_path), workers=2,
+                                     progress=lambda done, failed: progress_calls.append((done, failed)))
+
+    assert report['imported'] == 2
+    assert [row_number for row_number, _ in report['errors']] == [3]
+    assert progress_calls[-1] == (3, 1)
+    records = temp_app.entities['quotes']['records']
+    assert records['q1']['phrase'] == 'To be'
+    generated_id = next(record_id for record_id in records if record_id != 'q1')
+    assert records[generated_id]['author'] == 'Anon'
+    assert os.path.exists(os.path.join(temp_app.data_dir, 'quotes', f'quotes-{generated_id}.xml'))
+
+    jsonl_path = tmp_path / 'posts.jsonl'
+    jsonl_path.write_text('{"key": "p1", "headline": "Hello", "body": "World"}\nnot json\n[1, 2]\n',
+                          encoding='utf-8')
+    report = temp_app.import_records('posts', str(jsonl_path),
+                                     column_map={'key': 'id', 'headline': 'title', 'body': 'message'})
+    assert report['imported'] == 1
+    assert [row_number for row_number, _ in report['errors']] == [2, 3]
+
+    tree = ET.parse(os.path.join(temp_app.data_dir, 'posts', 'posts-p1.xml'))
+    assert tree.getroot().get('id') == 'p1'
+    assert tree.getroot().find('title').text == 'Hello'
+    assert tree.getroot().find('message').text == 'World'
+
+
+def test_background_import_is_ignored_by_file_watcher(temp_app, monkeypatch):
+    """Test that watcher events for files written by a running import are dropped"""
+    import threading
+    import app
+
+    class FakeFile:
+        def __init__(self, name):
+            self.name = name
+
+        def get_basename(self):
+            return self.name
+
+    temp_app.init_file_watch_state()
+    temp_app.window = None
+    monkeypatch.setattr(app.GLib, 'idle_add', lambda callback, *args: callback(*args))
+    original_write = temp_app.write_record_file
+    seen_during_import = []
+
+    def write_and_notify(filepath, root):
+        original_write(filepath, root)
+        seen_during_import.append('quotes' in temp_app.importing_entities)
+        temp_app.on_entity_dir_changed(None, FakeFile(os.path.basename(filepath)), None, 'created', 'quotes')
+    monkeypatch.setattr(temp_app, 'write_record_file', write_and_notify)
+
+    csv_path = os.path.join(temp_app.data_dir, 'import.csv')
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write('id,phrase,author\nq1,To be,Shakespeare\nq2,Be yourself,Wilde\n')
+    temp_app.start_import('quotes', csv_path)
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and thread.daemon:
+            thread.join(timeout=5)
+
+    assert seen_during_import == [True, True]
+    assert temp_app.pending_file_changes == {}
+    assert 'quotes' not in temp_app.importing_entities
+    assert sorted(temp_app.entities['quotes']['records']) == ['q1', 'q2']
+
+
+def test_streaming_export_jsonl_and_csv(temp_app, tmp_path, monkeypatch):
+    """Test export from memory and straight from files, with projection and tab filter semantics"""
+    import csv
+    import json
+
+    write_luassg_record(temp_app.data_dir, 'quotes', 'q1', {'phrase': 'To be or not to be', 'author': 'Shakespeare'})
+    write_luassg_record(temp_app.data_dir, 'quotes', 'q2', {'phrase': 'Be yourself', 'author': 'Wilde'})
+    write_luassg_record(temp_app.data_dir, 'posts', 'p1', {'title': 'Hello', 'message': 'World'})
+    temp_app.load_entity_data_from_files('quotes')
+
+    jsonl_path = str(tmp_path / 'quotes.jsonl')
+    report = temp_app.export_records(jsonl_path, ['quotes'], fields=['author'],
+                                     filter_field='phrase', filter_text='  BE YOURSELF ')
+    assert report['exported'] == 1
+    with open(jsonl_path, encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == [{'id': 'q2', 'author': 'Wilde'}]
+
+    # posts data isn't loaded: it is streamed from the files
+    del temp_app.entities['posts']['records']
+    csv_path = str(tmp_path / 'all.csv')
+    report = temp_app.export_records(csv_path, ['quotes', 'posts'])
+    assert report['exported'] == 3
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0].keys()) == ['entity', 'id', 'phrase', 'author', 'title', 'message']
+    posts_row = next(row for row in rows if row['entity'] == 'posts')
+    assert posts_row['title'] == 'Hello'
+    assert posts_row['phrase'] == ''
+
+    # Loaded records are built one at a time, as they are written
+    built = []
+    records = temp_app.entities['quotes']['records']
+    get_record = type(records).__getitem__
+    monkeypatch.setattr(type(records), '__getitem__',
+                        lambda store, record_id: built.append(record_id) or get_record(store, record_id))
+    exported = temp_app.iter_export_records('quotes')
+    record_id, record_data = next(exported)
+    assert built == [record_id] and record_data['id'] == record_id
+
+
+def test_schema_migration_renames_and_resumes(temp_app):
+    """Test entity/field rename with dropped and added fields, resumed after an interrupted run"""
+    from app import plan_schema_migration, migrate_record_chunk
+
+    for index in range(5):
+        write_luassg_record(temp_app.data_dir, 'quotes', f'q{index}',
+                            {'phrase': f'Phrase {index}', 'author': f'Author {index}'})
+    old_fields = temp_app.entities['quotes']['fields']
+    new_fields = [{'name': 'text', 'type': 'oneline'}, {'name': 'source', 'type': 'oneline'}]
+    plan = plan_schema_migration('quotes', old_fields, 'sayings', new_fields,
+                                 renames={'phrase': 'text'}, defaults={'source': 'unknown'})
+    assert plan['drop'] == ['author']
+    assert plan['add'] == {'source': 'unknown'}
+    with pytest.raises(ValueError):
+        plan_schema_migration('quotes', old_fields, 'quotes', old_fields,
+                              renames={'phrase': 'author', 'author': 'phrase'})
+
+    # Simulate a run interrupted after the first file
+    temp_app.save_migration_plan(plan)
+    os.rename(os.path.join(temp_app.data_dir, 'quotes'), os.path.join(temp_app.data_dir, 'sayings'))
+    migrate_record_chunk((os.path.join(temp_app.data_dir, 'sayings'), ['quotes-q0.xml'], plan, True))
+
+    temp_app.resume_schema_migrations()
+    plan_path, done_path = temp_app.migration_checkpoint_paths('sayings')
+    assert not os.path.exists(plan_path) and not os.path.exists(done_path)
+    assert sorted(os.listdir(os.path.join(temp_app.data_dir, 'sayings'))) == [
+        f'sayings-q{index}.xml' for index in range(5)]
+
+    root = ET.parse(os.path.join(temp_app.data_dir, 'sayings', 'sayings-q3.xml')).getroot()
+    assert root.tag == 'sayings' and root.get('id') == 'q3'
+    assert [child.tag for child in root] == ['text', 'source']
+    assert root.find('text').text == 'Phrase 3'
+    assert root.find('source').text == 'unknown'
+
+    # The crash happened before the edited definition was saved, resuming saves it
+    temp_app.load_entities()
+    assert list(temp_app.entities) == ['posts', 'news', 'sayings']
+    assert temp_app.entities['sayings']['fields'] == new_fields
+    temp_app.load_entity_data_from_files('sayings')
+    assert temp_app.entities['sayings']['records']['q0'] == {'id': 'q0', 'text': 'Phrase 0', 'source': 'unknown'}
+
+
+def test_schema_migration_rename_with_file_watcher(temp_app, monkeypatch):
+    """Test that a rename started from the GUI isn't blocked by the watcher creating the new directory"""
+    import app
+    import threading
+    from app import plan_schema_migration
+
+    for index in range(3):
+        write_luassg_record(temp_app.data_dir, 'quotes', f'q{index}', {'phrase': f'P{index}', 'author': 'A'})
+    temp_app.load_entity_data_from_files('quotes')
+
+    def fake_create_placeholder_tab(entity_name, position=-1):
+        temp_app.entities[entity_name]['tab_widget'] = app.Gtk.Box()
+        temp_app.notebook.insert_page(temp_app.entities[entity_name]['tab_widget'], None, position)
+
+    threads = []
+    original_thread = threading.Thread
+    monkeypatch.setattr(app.threading, 'Thread', lambda *args, **kwargs: threads.append(
+        original_thread(*args, **kwargs)) or threads[-1])
+    monkeypatch.setattr(app.GLib, 'idle_add', lambda func, *args: func(*args))
+    monkeypatch.setattr(temp_app, 'create_placeholder_tab', fake_create_placeholder_tab)
+    monkeypatch.setattr(temp_app, 'populate_management_tab_data', lambda: None)
+    monkeypatch.setattr(temp_app, 'populate_entity_tab_data', lambda entity_name: None)
+    contexts = []
+    monkeypatch.setattr(RecordingExecutor, 'contexts', contexts)
+    monkeypatch.setattr(app, 'ProcessPoolExecutor', RecordingExecutor)
+    monkeypatch.setattr(app, 'PARALLEL_LOAD_THRESHOLD', 3)
+    temp_app.load_workers = 2
+    temp_app.window = None
+    temp_app.lazy_tabs = True
+    temp_app.notebook = FakeNotebook()
+    temp_app.init_file_watch_state()
+    temp_app.update_file_monitors()
+    assert 'quotes' in temp_app.file_monitors
+
+    new_fields = [{'name': 'text', 'type': 'oneline'}, {'name': 'author', 'type': 'oneline'}]
+    plan = plan_schema_migration('quotes', temp_app.entities['quotes']['fields'], 'sayings', new_fields,
+                                 renames={'phrase': 'text'})
+    temp_app.start_schema_migration(plan, new_fields)
+    assert 'sayings' not in temp_app.file_monitors
+    threads[-1].join()
+
+    assert not temp_app.migrating_entities
+    # The records were rewritten in a process pool started from the migration thread: no fork
+    assert len(contexts) == 1 and contexts[0].get_start_method() == 'spawn'
+    assert not os.path.exists(os.path.join(temp_app.data_dir, 'quotes'))
+    assert sorted(temp_app.entities['sayings']['records']) == ['q0', 'q1', 'q2']
+    assert set(temp_app.file_monitors) == {'posts', 'news', 'sayings'}
+    plan_path, _ = temp_app.migration_checkpoint_paths('sayings')
+    assert not os.path.exists(plan_path)
+
+    # Editing an entity keeps its position in the definitions and the tabs
+    posts_fields = [{'name': 'headline', 'type': 'oneline'}, {'name': 'message', 'type': 'text'}]
+    plan = plan_schema_migration('posts', temp_app.entities['posts']['fields'], 'posts', posts_fields,
+                                 renames={'title': 'headline'})
+    temp_app.start_schema_migration(plan, posts_fields)
+    threads[-1].join()
+    assert list(temp_app.entities) == ['posts', 'news', 'sayings']
+    assert temp_app.notebook.page_num(temp_app.entities['posts']['tab_widget']) == 0
+
+    # An empty directory left in place of the new name is replaced by the rename
+    os.makedirs(os.path.join(temp_app.data_dir, 'authors'))
+    plan = plan_schema_migration('sayings', new_fields, 'authors', new_fields)
+    assert temp_app.run_schema_migration(plan)['migrated'] == 3
+    assert len(os.listdir(os.path.join(temp_app.data_dir, 'authors'))) == 3
+
+
+def test_edit_entity_without_migration_keeps_loaded_state(temp_app, monkeypatch):
+    """Test that an edit that rewrites no files keeps the records, file versions and filter indexes"""
+    import app
+
+    class FakeEntityDialog:
+        def __init__(self, parent, entity_name):
+            pass
+
+        def run(self):
+            return app.Gtk.ResponseType.OK
+
+        def get_data(self):
+            return 'quotes', [{'name': 'phrase', 'type': 'text'}, {'name': 'author', 'type': 'oneline'}]
+
+        def get_field_renames(self):
+            return {}
+
+        def destroy(self):
+            pass
+
+    class FakeSelection:
+        def get_selected(self):
+            return {'row': ['quotes']}, 'row'
+
+    class FakeTreeView:
+        def get_selection(self):
+            return FakeSelection()
+
+    write_luassg_record(temp_app.data_dir, 'quotes', 'q1', {'phrase': 'P', 'author': 'A'})
+    temp_app.load_entity_data_from_files('quotes')
+    entity_data = temp_app.entities['quotes']
+    entity_data.update(trigram_index=object(), filter_cache=object())
+    kept = {key: entity_data[key] for key in ('records', 'file_state', 'trigram_index', 'filter_cache')}
+    monkeypatch.setattr(app, 'EntityDialog', FakeEntityDialog)
+    temp_app.management_treeview = FakeTreeView()
+    temp_app.notebook = None
+    temp_app.window = None
+
+    temp_app.on_edit_entity(None)
+    assert list(temp_app.entities) == ['posts', 'news', 'quotes']
+    assert temp_app.entities['quotes']['fields'][0] == {'name': 'phrase', 'type': 'text'}
+    assert all(temp_app.entities['quotes'][key] is value for key, value in kept.items())
+
+
+def test_delete_entity_moves_data_aside_and_purges(temp_app):
+    """Test that deletion is immediate, survives an interrupted run and purges the data later"""
+    for index in range(3):
+        write_luassg_record(temp_app.data_dir, 'quotes', f'q{index}', {'phrase': 'P', 'author': 'A'})
+    temp_app.load_entity_data_from_files('quotes')
+
+    trashed_dir = temp_app.delete_entity('quotes')
+    assert 'quotes' not in temp_app.entities
+    assert not os.path.exists(os.path.join(temp_app.data_dir, 'quotes'))
+    assert len(os.listdir(trashed_dir)) == 3
+    temp_app.load_entities()
+    assert 'quotes' not in temp_app.entities
+
+    # Crash after the directory was moved aside but before the definitions were saved
+    write_luassg_record(temp_app.data_dir, 'posts', 'p1', {'title': 'T', 'message': 'M'})
+    os.rename(os.path.join(temp_app.data_dir, 'posts'), os.path.join(temp_app.trash_path(), 'posts.0123abcd'))
+    temp_app.load_entities()
+    assert 'posts' in temp_app.entities
+    assert temp_app.recover_interrupted_deletions()
+    temp_app.load_entities()
+    assert sorted(temp_app.entities) == ['news']
+
+    progress_calls = []
+    assert temp_app.purge_trash(progress_calls.append) == 4
+    assert progress_calls[-1] == 4
+    assert os.listdir(temp_app.trash_path()) == []
+
+
+def test_record_store_mapping_view(temp_app):
+    """Test the column-wise record store against the plain dict layout it replaces"""
+    from app import RecordStore, PartialRecord
+
+    store = RecordStore(['id', 'phrase', 'author'])
+    store['q1'] = {'id': 'q1', 'phrase': 'To be', 'author': 'Shakespeare'}
+    store['q2'] = {'phrase': 'No id', 'note': 'extra key'}
+    store['q3'] = PartialRecord({'id': 'q3', 'phrase': 'Long tex', 'author': 'A'})
+    assert store['q1'] == {'id': 'q1', 'phrase': 'To be', 'author': 'Shakespeare'}
+    assert store['q2'] == {'phrase': 'No id', 'note': 'extra key'}
+    assert isinstance(store['q3'], PartialRecord)
+    assert store.value('q1', 'author') == 'Shakespeare'
+    assert store.value('q2', 'author', '') == ''
+
+    store['q1'] = {'id': 'q1', 'phrase': 'Changed', 'author': 'Shakespeare'}
+    del store['q2']
+    assert list(store) == ['q1', 'q3'] and len(store) == 2 and 'q2' not in store
+    store.compact()
+    assert dict(store.items()) == {'q1': {'id': 'q1', 'phrase': 'Changed', 'author': 'Shakespeare'},
+                                   'q3': {'id': 'q3', 'phrase': 'Long tex', 'author': 'A'}}
+    assert store.rows == {'q1': 0, 'q3': 1} and store.partial_rows == {1}
+
+    # Loading fills a store, saving and deleting go through it
+    write_luassg_record(temp_app.data_dir, 'quotes', 'q1', {'phrase': 'To be', 'author': 'Shakespeare'})
+    temp_app.load_entity_data_from_files('quotes')
+    assert isinstance(temp_app.entities['quotes']['records'], RecordStore)
+    temp_app.save_record('quotes', {'id': 'q2', 'phrase': 'Be yourself', 'author': 'Wilde'})
+    assert temp_app.get_record_data('quotes', 'q2')['author'] == 'Wilde'
+    temp_app.delete_record('quotes', 'q1')
+    assert list(temp_app.entities['quotes']['records']) == ['q2']
+
+
+def test_category_fields_are_dictionary_encoded(temp_app):
+    """Test dictionary encoding of pagination.xml category fields, declared and detected ones"""
+    from app import RecordStore, DictionaryColumn, CATEGORY_DETECT_MIN_ROWS
+
+    with open(os.path.join(temp_app.data_dir, 'pagination.xml'), 'w') as f:
+        f.write('<pagination><fieldAsCategory>author</fieldAsCategory>'
+                '<createPagingFor><includeCategory>quotes</includeCategory></createPagingFor></pagination>')
+    temp_app.entities['posts']['fields'][0]['cardinality'] = 'low'
+    assert temp_app.category_field_names('quotes') == ['author']
+    assert temp_app.category_field_names('posts') == ['title']
+    assert temp_app.category_field_names('news') == []
+
+    for index in range(6):
+        write_luassg_record(temp_app.data_dir, 'quotes', f'q{index}',
+                            {'phrase': f'Phrase {index}', 'author': ['Wilde', 'Twain'][index % 2]})
+    temp_app.load_entity_data_from_files('quotes')
+    records = temp_app.entities['quotes']['records']
+    assert records.is_categorical('author') and not records.is_categorical('phrase')
+    assert records['q3'] == {'id': 'q3', 'phrase': 'Phrase 3', 'author': 'Twain'}
+    assert sorted(records.ids_matching('author', lambda value: value == 'Wilde')) == ['q0', 'q2', 'q4']
+    assert sorted(records.ids_matching('author', lambda value: 'wa' in value.lower())) == ['q1', 'q3', 'q5']
+
+    # The hint survives saving the definitions
+    temp_app.save_entities_to_xml()
+    temp_app.load_entities()
+    assert temp_app.entities['posts']['fields'][0] == {'name': 'title', 'type': 'oneline', 'cardinality': 'low'}
+
+    # Detection on larger stores, codes widen past 256 values
+    store = RecordStore(['id', 'status', 'title'])
+    for index in range(CATEGORY_DETECT_MIN_ROWS):
+        store[f'r{index}'] = {'id': f'r{index}', 'status': ['draft', 'published'][index % 2], 'title': f'T{index}'}
+    assert store.detect_categorical(0.01) == ['status']
+    column = DictionaryColumn(str(value) for value in range(300))
+    assert column.codes.typecode == 'H' and column[299] == '299'
+
+
+def test_debounced_filter_uses_lowercase_column_cache(temp_app, monkeypatch):
+    """Test that typing refilters once per pause and matches through the lowercased column"""
+    import app
+
+    class FakeFilterModel:
+        refilters = 0
+
+        def refilter(self):
+            self.refilters += 1
+
+    timers = []
+    removed = []
+
+    def fake_timeout_add(interval, callback, *args):
+        timers.append((callback, args))
+        return len(timers)
+
+    monkeypatch.setattr(app.GLib, 'timeout_add', fake_timeout_add)
+    monkeypatch.setattr(app.GLib, 'source_remove', removed.append)
+
+    for index, phrase in enumerate(['Lorem ipsum', 'LOREM dolor', 'Sit amet']):
+        write_luassg_record(temp_app.data_dir, 'quotes', f'q{index}', {'phrase': phrase, 'author': 'A'})
+    temp_app.load_entity_data_from_files('quotes')
+    entity_data = temp_app.entities['quotes']
+    entity_data.update({'filter_entry': FakeWidget(), 'field_combo': FakeWidget(text='phrase'),
+                        'columns': ['ID', 'phrase', 'author'], 'filter_model': FakeFilterModel()})
+
+    for text in ('l', 'lo', 'lor ', ' LOREM'):
+        entity_data['filter_entry'].text = text
+        temp_app.on_filter_changed(None, 'quotes')
+    assert len(timers) == 4 and removed == [1, 2, 3]
+    assert entity_data['filter_model'].refilters == 0
+
+    callback, args = timers[-1]
+    assert callback(*args) is False
+    assert entity_data['filter_model'].refilters == 1
+    assert entity_data['filter_query'] == ('phrase', 1, 'lorem')
+    assert entity_data['filter_matches'] == {'q0', 'q1'}
+
+    # The lowercase cache follows record changes
+    records = entity_data['records']
+    records['q2'] = {'id': 'q2', 'phrase': 'Lorem again', 'author': 'A'}
+    del records['q0']
+    assert sorted(records.ids_containing('phrase', 'lorem')) == ['q1', 'q2']
+    assert records.ids_containing(None, 'q1') == ['q1']
+    temp_app.update_filter_match('quotes', 'q3', {'phrase': 'More lorem'})
+    assert 'q3' in entity_data['filter_matches']
+
+
+def test_trigram_index_filters_and_persists(temp_app, capsys):
+    """Test trigram candidate filtering, write-through maintenance and reuse of the saved index"""
+    from app import TrigramIndex
+
+    index = TrigramIndex([None, 'phrase'])
+    index.add('q1', {'phrase': 'Lorem ipsum'})
+    index.add('q2', {'phrase': 'Dolor sit'})
+    index.add('q1', {'phrase': 'Lorem dolor'})
+    assert index.candidates('phrase', 'lorem') == ['q1']
+    assert sorted(index.candidates('phrase', 'dolor')) == ['q1', 'q2']
+    assert index.candidates('phrase', 'ipsum') == []
+    assert index.candidates('phrase', 'lo') is None
+    index.compact()
+    assert index.doc_ids == ['q2', 'q1'] and sorted(index.candidates('phrase', 'dolor')) == ['q1', 'q2']
+
+    temp_app.trigram_index_min_records = 0
+    for index_number, phrase in enumerate(['Lorem ipsum', 'LOREM dolor', 'Sit amet']):
+        write_luassg_record(temp_app.data_dir, 'quotes', f'q{index_number}', {'phrase': phrase, 'author': 'A'})
+    temp_app.load_entity_data_from_files('quotes')
+    entity_data = temp_app.entities['quotes']
+    entity_data['filter_query'] = ('phrase', 1, 'lorem')
+    temp_app.update_filter_matches('quotes')
+    assert entity_data['filter_matches'] == {'q0', 'q1'}
+    assert 'Built trigram index for quotes' in capsys.readouterr().out
+    assert os.path.exists(temp_app.trigram_index_path('quotes'))
+
+    temp_app.save_record('quotes', {'id': 'q3', 'phrase': 'More lorem', 'author': 'B'})
+    temp_app.delete_record('quotes', 'q0')
+    temp_app.update_filter_matches('quotes')
+    assert entity_data['filter_matches'] == {'q1', 'q3'}
+    entity_data['filter_query'] = ('ID', 0, 'q3')
+    temp_app.update_filter_matches('quotes')
+    assert entity_data['filter_matches'] == {'q3'}
+
+    # Saved at exit, reused by the next load of the same files
+    temp_app.save_trigram_index('quotes')
+    temp_app.load_entity_data_from_files('quotes')
+    capsys.readouterr()
+    entity_data['filter_query'] = ('phrase', 1, 'lorem')
+    temp_app.update_filter_matches('quotes')
+    assert entity_data['filter_matches'] == {'q1', 'q3'}
+    assert 'Built trigram index' not in capsys.readouterr().out
+
+
+def test_filter_cache_refines_and_invalidates(temp_app):
+    """Test that typing refines cached results, backspacing hits the cache and saves invalidate it"""
+    for index_number, phrase in enumerate(['Lorem ipsum', 'Lore of old', 'Sit amet', 'LOREM dolor']):
+        write_luassg_record(temp_app.data_dir, 'quotes', f'q{index_number}', {'phrase': phrase, 'author': 'A'})
+    temp_app.load_entity_data_from_files('quotes')
+    entity_data = temp_app.entities['quotes']
+
+    computed = []
+    original_compute = temp_app.compute_filter_matches
+
+    def counting_compute(entity_name, field_name, filter_text):
+        computed.append(filter_text)
+        return original_compute(entity_name, field_name, filter_text)
+
+    temp_app.compute_filter_matches = counting_compute
+
+    def filter_by(text):
+        entity_data['filter_query'] = ('phrase', 1, text)
+        temp_app.update_filter_matches('quotes')
+        return entity_data['filter_matches']
+
+    assert filter_by('lor') == {'q0', 'q1', 'q3'}
+    assert filter_by('lore') == {'q0', 'q1', 'q3'}
+    assert filter_by('lorem') == {'q0', 'q3'}
+    assert filter_by('lore') == {'q0', 'q1', 'q3'}
+    assert computed == ['lor']
+    assert list(entity_data['filter_cache']) == [('phrase', 'lor'), ('phrase', 'lorem'), ('phrase', 'lore')]
+
+    temp_app.save_record('quotes', {'id': 'q4', 'phrase': 'Lorem again', 'author': 'B'})
+    assert entity_data['filter_cache'] is None
+    assert filter_by('lorem') == {'q0', 'q3', 'q4'}
+    assert computed == ['lor', 'lorem']
+
+
+def test_filter_query_language_planner_and_explain(temp_app):
+    """Test parsing, evaluation, index selection and explain output of structured filter queries"""
+    from app import parse_filter_query, is_structured_query
+
+    assert not is_structured_query('plain text with spaces')
+    terms = parse_filter_query('phrase:foo AND author:"bar baz" AND NOT id:abc* /x.z/ =Exact http://site',
+                               ['phrase', 'author'], 'phrase')
+    assert [(term['field'], term['op'], term['value'], term['negated']) for term in terms] == [
+        ('phrase', 'substring', 'foo', False), ('author', 'substring', 'bar baz', False),
+        (None, 'prefix', 'abc', True), ('phrase', 'regex', 'x.z', False), ('phrase', 'exact', 'exact', False),
+        ('phrase', 'substring', 'http://site', False)]
+    with pytest.raises(ValueError):
+        parse_filter_query('foo NOT', ['phrase'], 'phrase')
+
+    temp_app.trigram_index_min_records = 0
+    temp_app.entities['quotes']['fields'][1]['cardinality'] = 'low'
+    quotes = [('q1', 'To be or not to be', 'Shakespeare'), ('q2', 'Be yourself', 'Wilde'),
+              ('q3', 'Be the change', 'Gandhi'), ('x4', 'Lorem ipsum dolor', 'Cicero'),
+              ('x5', 'To be continued', 'Wilde')]
+    for record_id, phrase, author in quotes:
+        write_luassg_record(temp_app.data_dir, 'quotes', record_id, {'phrase': phrase, 'author': author})
+    temp_app.load_entity_data_from_files('quotes')
+
+    def run(text, default_field='phrase'):
+        field_names = ['phrase', 'author']
+        matches, plan = temp_app.run_filter_query('quotes', parse_filter_query(text, field_names, default_field))
+        return sorted(matches), plan['access']
+
+    assert run('be AND NOT author:wilde') == (['q1', 'q3'], 'scan')
+    assert run('author:=wilde') == (['q2', 'x5'], 'dictionary')
+    assert run('"lorem ipsum"') == (['x4'], 'trigram')
+    assert run('id:q* AND to*') == (['q1'], 'scan')
+    assert run('/^be (the|your)/') == (['q2', 'q3'], 'scan')
+
+    explain = temp_app.explain_filter_query('quotes', 'phrase:continued author:wilde')
+    assert explain.startswith("Plan: trigram index on phrase for 'continued' (~1 rows to check)")
+    assert "Check: phrase contains 'continued' AND author contains 'wilde'" in explain
+    assert 'Result: 1 rows' in explain
+
+
+def test_fuzzy_search_ranks_streams_and_cancels(temp_app):
+    """Test ranking of typo-tolerant fuzzy search, top-K updates and cancellation"""
+    import threading
+    import app
+    from app import fuzzy_search, token_similarity
+
+    assert token_similarity('shakespear', 'shakespeare') == 1.0
+    assert token_similarity('shakspeare', 'shakespeare') > 0.9
+    assert token_similarity('wilde', 'gandhi') == 0.0
+
+    quotes = [('q1', 'To be or not to be', 'Shakespeare'), ('q2', 'Be yourself', 'Wilde'),
+              ('q3', 'Be the change', 'Gandhi'), ('q4', 'Lorem ipsum dolor', 'Cicero')]
+    for record_id, phrase, author in quotes:
+        write_luassg_record(temp_app.data_dir, 'quotes', record_id, {'phrase': phrase, 'author': author})
+    temp_app.load_entity_data_from_files('quotes')
+
+    record_ids, columns = temp_app.fuzzy_search_columns('quotes', app.FUZZY_ALL_FIELDS)
+    assert len(columns) == 3
+    results = fuzzy_search('shakspeare', record_ids, columns)
+    assert [record_id for _, record_id in results] == ['q1']
+    results = fuzzy_search('be yourslef', record_ids, columns)
+    assert results[0][1] == 'q2' and results[0][0] < 1.0
+    assert [record_id for _, record_id in fuzzy_search('lorem ipsum', record_ids, columns)] == ['q4']
+
+    record_ids, columns = temp_app.fuzzy_search_columns('quotes', 'author')
+    assert fuzzy_search('ghandi', record_ids, columns)[0][1] == 'q3'
+
+    many_ids = ['r%d' % i for i in range(12000)]
+    many_texts = ['item number %d' % i for i in range(12000)]
+    updates = []
+    results = fuzzy_search('item', many_ids, [many_texts], limit=5, on_update=updates.append)
+    assert [record_id for _, record_id in results] == ['r0', 'r1', 'r2', 'r3', 'r4']
+    assert all(len(update) <= 5 for update in updates)
+
+    cancelled = threading.Event()
+    cancelled.set()
+    assert fuzzy_search('item', many_ids, [many_texts], cancelled=cancelled) is None
+
+
+def test_virtual_record_model_remaps_rows(temp_app):
+    """Test the lazy record model of large tabs: on-demand values, filter/sort remapping and row updates"""
+    from app import RecordListModel
+
+    quotes = [('q1', 'To be or not to be', 'Shakespeare'), ('q2', 'Be yourself', 'Wilde'),
+              ('q3', 'Be the change', 'Gandhi'), ('q4', 'Lorem ipsum dolor', 'Cicero')]
+    for record_id, phrase, author in quotes:
+        write_luassg_record(temp_app.data_dir, 'quotes', record_id, {'phrase': phrase, 'author': author})
+    temp_app.load_entity_data_from_files('quotes')
+    temp_app.virtual_model_min_records = 4
+    assert temp_app.uses_virtual_model('quotes')
+
+    entity_data = temp_app.entities['quotes']
+    model = RecordListModel(entity_data['records'], ['phrase', 'author'])
+    entity_data.update(list_store=model, filter_model=model, sort_order=None, filter_query=None, filter_matches=None)
+    temp_app.populate_entity_tab_data('quotes')
+    assert sorted(model.row_ids) == ['q1', 'q2', 'q3', 'q4']
+
+    assert model.do_get_n_columns() == 3
+    assert model.do_iter_n_children(None) == 4
+    found, treeiter = model.do_iter_nth_child(None, model.row_ids.index('q2'))
+    assert found and model.do_get_value(treeiter, 0) == 'q2'
+    assert model.do_get_value(treeiter, 2) == 'Wilde'
+    found, treeiter = model.do_iter_children(None)
+    rows = [model.do_get_value(treeiter, 0)]
+    while model.do_iter_next(treeiter):
+        rows.append(model.do_get_value(treeiter, 0))
+    assert rows == model.row_ids
+
+    temp_app.sort_entity_tab('quotes', 'author')
+    assert model.row_ids == ['q4', 'q3', 'q1', 'q2']
+    entity_data['filter_query'] = ('phrase', 1, 'be')
+    temp_app.update_filter_matches('quotes')
+    temp_app.remap_virtual_rows('quotes')
+    assert model.row_ids == ['q3', 'q1', 'q2']
+
+    temp_app.upsert_tab_row('quotes', 'q5', {'phrase': 'Let it be', 'author': 'Beatles'})
+    temp_app.upsert_tab_row('quotes', 'q3', {'phrase': 'Change', 'author': 'Gandhi'})
+    assert model.row_ids == ['q1', 'q2', 'q5']
+    temp_app.remove_tab_row('quotes', 'q1')
+    assert model.row_ids == ['q2', 'q5']
+    assert model.row_positions == {'q2': 0, 'q5': 1} and model.row_of('q1') is None
+    assert list(entity_data['virtual_order']) == ['q4', 'q3', 'q2', 'q5']
+
+
+def test_tab_population_runs_in_idle_chunks(temp_app, monkeypatch):
+    """Test chunked tab filling: detached model, progress label, upserts while loading and cancellation"""
+    import app
+
+    for i in range(200):
+        write_luassg_record(temp_app.data_dir, 'quotes', 'q%03d' % i, {'phrase': 'p%d' % i, 'author': 'a'})
+    temp_app.load_entity_data_from_files('quotes')
+
+    callbacks = []
+    monkeypatch.setattr(app, 'POPULATE_CHUNK_MIN_RECORDS', 100)
+    monkeypatch.setattr(app, 'POPULATE_FRAME_BUDGET', 0)
+    monkeypatch.setattr(app.GLib, 'idle_add', lambda func, *args: callbacks.append((func, args)) or len(callbacks))
+    monkeypatch.setattr(app.GLib, 'source_remove', lambda source: None)
+    temp_app.window = object()
+
+    store = FakeListStore()
+    treeview = FakeWidget(store)
+    entity_data = temp_app.entities['quotes']
+    entity_data.update(list_store=store, filter_model=store, treeview=treeview, row_count_label=FakeWidget(),
+                       loading_spinner=FakeWidget(), filter_query=None, filter_matches=None)
+    temp_app.populate_entity_tab_data('quotes')
+    assert treeview.model is None and entity_data['loading_spinner'].spinning
+    assert store.rows == {} and len(callbacks) == 1
+
+    func, args = callbacks[0]
+    assert func(*args) is True
+    assert len(store.rows) == 64 and entity_data['row_count_label'].text == 'Loading 64 / 200'
+    # A record saved while loading is not appended twice
+    temp_app.upsert_tab_row('quotes', 'q150', entity_data['records']['q150'])
+    while func(*args):
+        pass
+    assert len(store.rows) == 200 and len({row[0] for row in store.rows.values()}) == 200
+    assert treeview.model is store and not entity_data['loading_spinner'].spinning
+    assert entity_data['row_count_label'].text == '200 rows'
+
+    # Refilling cancels the running population, whose callbacks then stop
+    temp_app.populate_entity_tab_data('quotes')
+    first_population = callbacks[-1]
+    temp_app.populate_entity_tab_data('quotes')
+    assert first_population[0](*first_population[1]) is False
+    assert treeview.model is None
+    temp_app.cancel_tab_population('quotes')
+    assert treeview.model is store and entity_data['population'] is None
+
+    # Toggling fuzzy search during a fill: the fill doesn't put the filtered rows back over the fuzzy results
+    class FakeToggle:
+        active = False
+
+        def get_active(self):
+            return self.active
+
+    monkeypatch.setattr(temp_app, 'start_fuzzy_search', lambda entity_name: None)
+    monkeypatch.setattr(temp_app, 'apply_filter', lambda entity_name: None)
+    fuzzy_store = FakeListStore()
+    toggle = FakeToggle()
+    field_combo = FakeWidget(text='phrase')
+    field_combo.items = ['ID', 'phrase', 'author']
+    entity_data.update(field_combo=field_combo, fuzzy_store=fuzzy_store, columns=['ID', 'phrase', 'author'])
+    temp_app.populate_entity_tab_data('quotes')
+    toggle.active = True
+    temp_app.on_fuzzy_toggled(toggle, 'quotes')
+    func, args = callbacks[-1]
+    while func(*args):
+        pass
+    assert treeview.model is fuzzy_store
+
+    # Switching back while filling keeps the view detached until the fill is done
+    temp_app.populate_entity_tab_data('quotes')
+    toggle.active = False
+    temp_app.on_fuzzy_toggled(toggle, 'quotes')
+    assert treeview.model is None
+    func, args = callbacks[-1]
+    while func(*args):
+        pass
+    assert treeview.model is store and len(store.rows) == 200
+    assert field_combo.items == ['ID', 'phrase', 'author']
+
+    # Cancelling a fill leaves the fuzzy results shown
+    temp_app.populate_entity_tab_data('quotes')
+    toggle.active = True
+    temp_app.on_fuzzy_toggled(toggle, 'quotes')
+    temp_app.cancel_tab_population('quotes')
+    assert treeview.model is fuzzy_store
+
+
+def test_async_startup_publishes_entities(temp_app, monkeypatch):
+    """Test background loading: entities published smallest first, metrics, and superseded loads"""
+    import app
+
+    for i in range(3):
+        write_luassg_record(temp_app.data_dir, 'quotes', 'q%d' % i, {'phrase': 'p%d' % i, 'author': 'a'})
+    write_luassg_record(temp_app.data_dir, 'news', 'n1', {'caption': 'Hello', 'longread': 'World'})
+
+    published = []
+    monkeypatch.setattr(app.GLib, 'idle_add', lambda func, *args: func(*args))
+    original = temp_app.on_entity_loaded
+    monkeypatch.setattr(temp_app, 'on_entity_loaded', lambda generation, entity_name, *args: (
+        published.append(entity_name), original(generation, entity_name, *args)))
+
+    temp_app.load_xml_data(load_records=False)
+    assert 'records' not in temp_app.entities['quotes']
+    temp_app.startup_metrics = {}
+    temp_app.pending_entities = set(temp_app.entities)
+    start_time = app.time.perf_counter()
+    temp_app.load_entities_in_background(temp_app.load_generation, sorted(temp_app.pending_entities), start_time)
+
+    assert published == ['posts', 'news', 'quotes']
+    assert not temp_app.pending_entities
+    assert sorted(temp_app.entities['quotes']['records']) == ['q0', 'q1', 'q2']
+    assert 'quotes-q0.xml' in temp_app.entities['quotes']['file_state']
+    assert set(temp_app.startup_metrics['entities']) == {'posts', 'news', 'quotes'}
+    assert temp_app.startup_metrics['fully_loaded'] >= temp_app.startup_metrics['entities']['quotes']
+
+    # A synchronous reload supersedes a background load still running
+    generation = temp_app.load_generation
+    temp_app.pending_entities = {'news'}
+    temp_app.load_xml_data()
+    records = temp_app.entities['news']['records']
+    assert original(generation, 'news', app.RecordStore(['id', 'caption', 'longread']), {}, start_time) is False
+    assert temp_app.entities['news']['records'] is records
+
+
+def test_background_load_uses_spawned_process_pool(temp_app, monkeypatch):
+    """Test that a large entity loaded on the worker thread is parsed in a spawn-context process pool"""
+    import app
+    import threading
+
+    contexts = []
+    monkeypatch.setattr(RecordingExecutor, 'contexts', contexts)
+    for i in range(4):
+        write_luassg_record(temp_app.data_dir, 'quotes', 'q%d' % i, {'phrase': 'p%d' % i, 'author': 'a'})
+    monkeypatch.setattr(app, 'ProcessPoolExecutor', RecordingExecutor)
+    monkeypatch.setattr(app, 'PARALLEL_LOAD_THRESHOLD', 4)
+    monkeypatch.setattr(app.GLib, 'idle_add', lambda func, *args: func(*args))
+    temp_app.load_workers = 2
+    temp_app.use_record_cache = False
+
+    temp_app.load_xml_data(load_records=False)
+    temp_app.startup_metrics = {}
+    temp_app.pending_entities = set(temp_app.entities)
+    worker = threading.Thread(target=temp_app.load_entities_in_background,
+                              args=(temp_app.load_generation, ['quotes'], app.time.perf_counter()))
+    worker.start()
+    worker.join()
+
+    assert len(contexts) == 1 and contexts[0].get_start_method() == 'spawn'
+    assert sorted(temp_app.entities['quotes']['records']) == ['q0', 'q1', 'q2', 'q3']
+
+
+def test_entity_tabs_are_built_lazily_and_torn_down(temp_app, monkeypatch):
+    """Test placeholder tabs built on first selection and idle tabs replaced by placeholders again"""
+    import app
+
+    built = []
+
+    def fake_create_entity_tab(entity_name, position=-1):
+        built.append(entity_name)
+        temp_app.entities[entity_name].update(tab_widget=app.Gtk.Box(), tab_built=True, list_store=[], last_used=0)
+        temp_app.notebook.insert_page(temp_app.entities[entity_name]['tab_widget'], None, position)
+
+    idle_calls = []
+    monkeypatch.setattr(app.GLib, 'idle_add', lambda func, *args: idle_calls.append((func, args)))
+    monkeypatch.setattr(temp_app, 'create_entity_tab', fake_create_entity_tab)
+    temp_app.notebook = FakeNotebook()
+    temp_app.window = None
+    for entity_name in temp_app.entities:
+        temp_app.create_placeholder_tab(entity_name)
+    assert built == [] and temp_app.notebook.get_n_pages() == 3
+
+    # Selecting a placeholder builds that tab (from an idle callback), in place
+    temp_app.notebook.set_current_page(1)
+    temp_app.on_switch_page(temp_app.notebook, temp_app.notebook.pages[1], 1)
+    for func, args in idle_calls:
+        func(*args)
+    assert built == ['news']
+    assert temp_app.notebook.page_num(temp_app.entities['news']['tab_widget']) == 1
+    assert temp_app.notebook.get_current_page() == 1 and temp_app.notebook.get_n_pages() == 3
+
+    # Idle tabs other than the selected one are torn down
+    temp_app.notebook.set_current_page(0)
+    temp_app.idle_tab_seconds = 10
+    temp_app.on_idle_tab_check()
+    assert not temp_app.entities['news']['tab_built'] and 'list_store' not in temp_app.entities['news']
+    assert temp_app.notebook.page_num(temp_app.entities['news']['tab_widget']) == 1
+    assert temp_app.notebook.get_n_pages() == 3
+
+
+def test_notebook_reconciliation_keeps_unchanged_tabs(temp_app, monkeypatch):
+    """Test that entity changes and Refresh All only replace the tabs of changed entities"""
+    import app
+
+    def fake_create_entity_tab(entity_name, position=-1):
+        temp_app.entities[entity_name].update(tab_widget=app.Gtk.Box(), tab_built=True, filter_query='kept')
+        temp_app.notebook.insert_page(temp_app.entities[entity_name]['tab_widget'], None, position)
+
+    populated = []
+    monkeypatch.setattr(temp_app, 'create_entity_tab', fake_create_entity_tab)
+    monkeypatch.setattr(temp_app, 'populate_entity_tab_data', populated.append)
+    monkeypatch.setattr(temp_app, 'capture_tab_view', lambda entity_name: {'selected': 'n1', 'scroll': 10.0})
+    monkeypatch.setattr(temp_app, 'update_file_monitors', lambda: None)
+    temp_app.notebook = FakeNotebook()
+    temp_app.lazy_tabs = False
+    write_luassg_record(temp_app.data_dir, 'news', 'n1', {'caption': 'Hello', 'longread': 'World'})
+    temp_app.load_xml_data()
+    for entity_name in temp_app.entities:
+        temp_app.create_entity_tab(entity_name)
+    management_page = app.Gtk.Box()
+    temp_app.notebook.insert_page(management_page, None, -1)
+    widgets = {entity_name: entity_data['tab_widget'] for entity_name, entity_data in temp_app.entities.items()}
+    news_records = temp_app.entities['news']['records']
+
+    # Refresh All without file changes keeps every tab and the loaded records
+    previous_entities = dict(temp_app.entities)
+    temp_app.load_xml_data()
+    temp_app.reconcile_notebook(previous_entities)
+    assert temp_app.notebook.pages == [widgets['posts'], widgets['news'], widgets['quotes'], management_page]
+    assert temp_app.entities['news']['records'] is news_records
+    assert temp_app.entities['news']['filter_query'] == 'kept' and populated == []
+
+    # Changed records refill the kept tab, restoring its selection and scroll position afterwards
+    write_luassg_record(temp_app.data_dir, 'news', 'n2', {'caption': 'Second', 'longread': 'Post'})
+    previous_entities = dict(temp_app.entities)
+    temp_app.load_xml_data()
+    temp_app.reconcile_notebook(previous_entities)
+    assert populated == ['news'] and temp_app.entities['news']['tab_widget'] is widgets['news']
+    assert temp_app.entities['news']['restore_view'] == {'selected': 'n1', 'scroll': 10.0}
+
+    # A new entity adds one page before the management tab, a deleted one removes only its page
+    previous_entities = dict(temp_app.entities)
+    temp_app.entities['authors'] = {'fields': [{'name': 'name', 'type': 'text'}], 'records': {}}
+    temp_app.reconcile_notebook(previous_entities)
+    assert temp_app.notebook.pages[:3] == [widgets['posts'], widgets['news'], widgets['quotes']]
+    assert temp_app.notebook.pages[3] is temp_app.entities['authors']['tab_widget']
+    assert temp_app.notebook.pages[4] is management_page
+
+    previous_entities = dict(temp_app.entities)
+    del temp_app.entities['posts']
+    temp_app.reconcile_notebook(previous_entities)
+    assert temp_app.notebook.pages[:2] == [widgets['news'], widgets['quotes']]
+    assert 'tab_built' not in previous_entities['posts']
+
+    # Redefined fields replace the page in place
+    previous_entities = dict(temp_app.entities)
+    temp_app.entities['quotes'] = {'fields': [{'name': 'phrase', 'type': 'text'}], 'records': {}}
+    temp_app.reconcile_notebook(previous_entities)
+    assert temp_app.notebook.pages[1] is temp_app.entities['quotes']['tab_widget'] is not widgets['quotes']
+    assert len(temp_app.notebook.pages) == 4
+
+
+def test_save_and_delete_update_single_rows(temp_app, monkeypatch):
+    """Test that saving or deleting a record patches its tab row without rescanning the directory"""
+    write_luassg_record(temp_app.data_dir, 'news', 'n1', {'caption': 'Hello', 'longread': 'World'})
+    temp_app.load_entity_data_from_files('news')
+    store = FakeListStore()
+    entity_data = temp_app.entities['news']
+    entity_data.update(list_store=store, filter_model=store, filter_query=None, filter_matches=None)
+    temp_app.populate_entity_tab_data('news')
+    n1_iter = entity_data['row_iters']['n1']
+
+    def no_rescan(entity_name):
+        raise AssertionError("directory rescanned")
+    monkeypatch.setattr(temp_app, 'scan_entity_files', no_rescan)
+
+    record_id = temp_app.save_record('news', {'id': 'n1', 'caption': 'Changed', 'longread': 'World'})
+    temp_app.refresh_record_row('news', record_id)
+    assert entity_data['row_iters']['n1'] == n1_iter
+    assert store.rows[n1_iter] == ['n1', 'Changed', 'World']
+
+    new_id = temp_app.save_record('news', {'caption': 'Fresh', 'longread': 'Post'})
+    temp_app.refresh_record_row('news', new_id)
+    assert store.rows[entity_data['row_iters'][new_id]] == [new_id, 'Fresh', 'Post']
+    assert len(store.rows) == 2
+
+    temp_app.delete_record('news', 'n1')
+    temp_app.refresh_record_row('news', 'n1')
+    assert 'n1' not in entity_data['row_iters'] and list(store.rows.values()) == [[new_id, 'Fresh', 'Post']]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, '-v'])